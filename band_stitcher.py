@@ -0,0 +1,114 @@
+"""
+Módulo para costura de screenshots em faixas gravadas em disco, com uso de memória limitado.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+from typing import List, Optional, Tuple
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+class StitchedImage:
+    """
+    Imagem de página completa formada por faixas horizontais gravadas em disco.
+
+    Substitui um objeto PIL Image gigante: apenas uma faixa por vez precisa
+    estar carregada em memória para gerar o PDF.
+    """
+
+    def __init__(self, width: int, height: int, bands: List[Tuple[str, int, int]], temp_dir: str):
+        """
+        Inicializa a imagem costurada.
+
+        Args:
+            width: Largura total em pixels
+            height: Altura total em pixels
+            bands: Lista de (caminho do PNG, posição y, altura) em ordem vertical
+            temp_dir: Diretório temporário que contém as faixas
+        """
+        self.width = width
+        self.height = height
+        self.bands = bands
+        self.temp_dir = temp_dir
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """Dimensões (largura, altura), no mesmo formato de PIL Image.size."""
+        return (self.width, self.height)
+
+    def close(self):
+        """Remove as faixas temporárias do disco."""
+        if self.temp_dir and os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+        self.bands = []
+        self.temp_dir = ""
+
+
+class BandStitcher:
+    """Costura tiles verticais gravando cada trecho novo como uma faixa PNG em disco."""
+
+    def __init__(self, width: int, height: int, temp_dir: Optional[str] = None):
+        """
+        Inicializa o costurador.
+
+        Args:
+            width: Largura total da página em pixels
+            height: Altura total da página em pixels
+            temp_dir: Diretório base para as faixas (padrão: diretório temporário do sistema)
+        """
+        self.width = width
+        self.height = height
+        self.temp_dir = tempfile.mkdtemp(prefix="printtopdf_faixas_", dir=temp_dir)
+        self.bands: List[Tuple[str, int, int]] = []
+        self._written = 0  # Linhas já gravadas a partir do topo da página
+
+    def add(self, tile: Image.Image, y: int) -> int:
+        """
+        Adiciona um tile capturado na posição vertical y.
+
+        Apenas as linhas ainda não gravadas são salvas, de modo que tiles
+        sobrepostos não duplicam conteúdo.
+
+        Args:
+            tile: Imagem do trecho visível da página
+            y: Posição vertical do topo do tile na página
+
+        Returns:
+            Número de linhas novas gravadas
+        """
+        start = max(y, self._written)
+        end = min(y + tile.height, self.height)
+        if end <= start:
+            return 0
+
+        band = tile.crop((0, start - y, min(tile.width, self.width), end - y))
+        if band.mode != 'RGB':
+            band = band.convert('RGB')
+
+        band_path = os.path.join(self.temp_dir, f"faixa_{len(self.bands):05d}.png")
+        band.save(band_path, format='PNG')
+        band.close()
+
+        self.bands.append((band_path, start, end - start))
+        self._written = end
+        logger.debug(f"Faixa gravada: y={start}px, altura={end - start}px")
+        return end - start
+
+    def finish(self) -> StitchedImage:
+        """
+        Conclui a costura.
+
+        Returns:
+            Imagem costurada com as faixas gravadas
+        """
+        return StitchedImage(self.width, self._written, self.bands, self.temp_dir)
+
+    def abort(self):
+        """Descarta as faixas gravadas até o momento."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        self.bands = []
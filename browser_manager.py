@@ -0,0 +1,182 @@
+"""
+Módulo com o gerenciador de ciclo de vida dos navegadores, que mantém sessões aquecidas entre domínios.
+"""
+
+import logging
+import threading
+from typing import Callable, Hashable, List, Tuple
+
+from selenium import webdriver
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserManager:
+    """
+    Mantém navegadores abertos entre domínios e pré-inicializa sessões em segundo plano.
+
+    Cada navegador é associado a uma chave de inicialização (navegador, modo
+    headless, configurações fixas no lançamento); só navegadores com a mesma
+    chave são reaproveitados.
+    """
+
+    def __init__(self, max_idle: int = 1):
+        """
+        Inicializa o gerenciador.
+
+        Args:
+            max_idle: Número máximo de navegadores ociosos mantidos abertos
+        """
+        self.max_idle = max(0, max_idle)
+        self._idle: List[Tuple[Hashable, webdriver.Remote]] = []
+        self._launching: List[Tuple[Hashable, threading.Thread]] = []
+        self._lock = threading.Condition()
+        self._closed = False
+
+    def _quit(self, driver: webdriver.Remote):
+        """
+        Encerra um navegador, ignorando erros.
+
+        Args:
+            driver: Navegador a encerrar
+        """
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Erro ao fechar o navegador: {str(e)}")
+
+    def acquire(self, key: Hashable, factory: Callable[[], webdriver.Remote]) -> webdriver.Remote:
+        """
+        Obtém um navegador: ocioso, em pré-inicialização ou recém-criado.
+
+        Args:
+            key: Chave de inicialização exigida
+            factory: Função que cria um novo navegador com essa chave
+
+        Returns:
+            Navegador pronto para uso
+        """
+        with self._lock:
+            while True:
+                for index, (idle_key, driver) in enumerate(self._idle):
+                    if idle_key == key:
+                        del self._idle[index]
+                        logger.info("Reutilizando navegador aquecido")
+                        return driver
+
+                # Aguardar uma pré-inicialização em andamento com a mesma chave
+                if not any(launch_key == key for launch_key, _ in self._launching):
+                    break
+                self._lock.wait()
+
+        return factory()
+
+    def release(self, key: Hashable, driver: webdriver.Remote):
+        """
+        Devolve um navegador (com o estado já limpo) para reutilização.
+
+        Args:
+            key: Chave de inicialização do navegador
+            driver: Navegador devolvido
+        """
+        evicted = []
+        with self._lock:
+            if self._closed or self.max_idle == 0:
+                evicted.append(driver)
+            else:
+                self._idle.append((key, driver))
+                while len(self._idle) > self.max_idle:
+                    evicted.append(self._idle.pop(0)[1])
+            self._lock.notify_all()
+
+        for old_driver in evicted:
+            self._quit(old_driver)
+
+    def discard(self, driver: webdriver.Remote):
+        """
+        Encerra um navegador que não deve ser reutilizado.
+
+        Args:
+            driver: Navegador a descartar
+        """
+        self._quit(driver)
+
+    def prelaunch(self, key: Hashable, factory: Callable[[], webdriver.Remote], count: int = 1):
+        """
+        Inicia navegadores em segundo plano até haver `count` sessões disponíveis com a chave.
+
+        Navegadores ociosos com outra chave são encerrados, pois não serão usados
+        pelo próximo domínio.
+
+        Args:
+            key: Chave de inicialização do próximo domínio
+            factory: Função que cria um novo navegador com essa chave
+            count: Número de sessões desejadas
+        """
+        evicted = []
+        with self._lock:
+            if self._closed:
+                return
+
+            evicted = [driver for idle_key, driver in self._idle if idle_key != key]
+            self._idle = [(idle_key, driver) for idle_key, driver in self._idle if idle_key == key]
+
+            available = len(self._idle) + sum(1 for launch_key, _ in self._launching if launch_key == key)
+            missing = min(count, self.max_idle) - available
+
+            for _ in range(max(0, missing)):
+                thread = threading.Thread(
+                    target=self._launch, args=(key, factory), name="pre-inicializacao", daemon=True
+                )
+                self._launching.append((key, thread))
+                thread.start()
+
+        for driver in evicted:
+            self._quit(driver)
+
+        if missing > 0:
+            logger.info(f"Pré-inicializando {missing} navegador(es) em segundo plano")
+
+    def _launch(self, key: Hashable, factory: Callable[[], webdriver.Remote]):
+        """
+        Cria um navegador em segundo plano e o disponibiliza como ocioso.
+
+        Args:
+            key: Chave de inicialização
+            factory: Função que cria o navegador
+        """
+        driver = None
+        try:
+            driver = factory()
+        except Exception as e:
+            logger.warning(f"Erro ao pré-inicializar navegador: {str(e)}")
+
+        with self._lock:
+            self._launching = [
+                (launch_key, thread) for launch_key, thread in self._launching
+                if thread is not threading.current_thread()
+            ]
+            if driver is not None and not self._closed:
+                self._idle.append((key, driver))
+                driver = None
+            self._lock.notify_all()
+
+        # Gerenciador fechado durante a inicialização
+        if driver is not None:
+            self._quit(driver)
+
+    def close(self):
+        """Encerra todos os navegadores ociosos e aguarda as pré-inicializações pendentes."""
+        with self._lock:
+            self._closed = True
+            launching = [thread for _, thread in self._launching]
+
+        for thread in launching:
+            thread.join()
+
+        with self._lock:
+            idle = [driver for _, driver in self._idle]
+            self._idle = []
+
+        for driver in idle:
+            self._quit(driver)
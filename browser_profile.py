@@ -0,0 +1,238 @@
+"""
+Módulo com os perfis persistentes do navegador, que mantêm o cache HTTP em disco entre páginas e execuções.
+"""
+
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from typing import List, Optional, Set, Tuple
+
+from process_utils import pid_alive
+
+logger = logging.getLogger(__name__)
+
+# Arquivo que marca um perfil em uso, com o PID do processo que o reservou
+LOCK_SUFFIX = ".lock"
+
+# Tempo para que uma reserva recém-criada receba o PID antes de ser considerada abandonada (segundos)
+LOCK_WRITE_GRACE = 10
+
+# Arquivo atualizado sempre que o perfil é devolvido, usado na remoção dos menos recentes
+LAST_USED_FILENAME = ".ultimo_uso"
+
+# Travas criadas pelo próprio navegador enquanto ele usa o perfil (Chrome e Firefox)
+BROWSER_LOCK_NAMES = ("SingletonLock", "lock")
+
+
+def _read_lock(lock_path: str) -> Optional[str]:
+    """
+    Lê o PID gravado em uma reserva de perfil.
+
+    Args:
+        lock_path: Arquivo da reserva
+
+    Returns:
+        PID (texto vazio se a reserva não tem um PID válido), ou None se ela
+        ainda pode estar sendo gravada ou não pôde ser lida
+    """
+    try:
+        with open(lock_path, 'r') as f:
+            content = f.read().strip()
+        age = time.time() - os.path.getmtime(lock_path)
+    except OSError:
+        return None
+    if content.isdigit() and int(content) > 0:
+        return content
+    # Reserva recém-criada, cujo PID ainda não foi gravado
+    return "" if age > LOCK_WRITE_GRACE else None
+
+
+def _directory_size(path: str) -> int:
+    """
+    Calcula o tamanho total dos arquivos de um diretório.
+
+    Args:
+        path: Diretório
+
+    Returns:
+        Tamanho em bytes
+    """
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class ProfileStore:
+    """
+    Conjunto de perfis persistentes do navegador, seguro para uso entre threads e processos.
+
+    Cada chave (domínio ou 'worker') tem quantos perfis forem necessários para
+    os navegadores abertos ao mesmo tempo, pois um perfil só pode ser usado por
+    um navegador por vez. O cache HTTP de cada perfil é limitado pelo próprio
+    navegador; quando o conjunto inteiro passa do limite total, os perfis usados
+    há mais tempo são removidos.
+    """
+
+    def __init__(self, root_dir: str, browser: str, cache_mb: int = 256, max_total_mb: int = 4096):
+        """
+        Inicializa o conjunto de perfis.
+
+        Args:
+            root_dir: Diretório raiz dos perfis
+            browser: Navegador ('chrome' ou 'firefox'); os perfis não são compartilhados entre eles
+            cache_mb: Limite do cache HTTP em disco de cada perfil (MB)
+            max_total_mb: Limite total do conjunto de perfis (MB)
+        """
+        self.root_dir = os.path.join(root_dir, browser.lower())
+        self.cache_mb = cache_mb
+        self.max_total_mb = max_total_mb
+        self._in_use: Set[str] = set()
+        self._lock = threading.Lock()
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def _try_lock(self, profile_path: str) -> bool:
+        """
+        Reserva um perfil, removendo reservas de processos que já terminaram.
+
+        Args:
+            profile_path: Diretório do perfil
+
+        Returns:
+            True se o perfil foi reservado
+        """
+        lock_path = profile_path + LOCK_SUFFIX
+        for _ in range(2):
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                owner = _read_lock(lock_path)
+                if owner is None or (owner and pid_alive(int(owner))):
+                    return False
+                # Só quem conseguir renomear a reserva abandonada a remove; se outro
+                # processo já a substituiu por uma nova, a nova é devolvida intacta
+                stale_path = f"{lock_path}.{os.getpid()}.{uuid.uuid4().hex}.stale"
+                try:
+                    os.rename(lock_path, stale_path)
+                except OSError:
+                    return False
+                if _read_lock(stale_path) != owner:
+                    try:
+                        os.rename(stale_path, lock_path)
+                    except OSError:
+                        pass
+                    return False
+                logger.info(f"Removendo reserva abandonada do perfil {profile_path}")
+                try:
+                    os.remove(stale_path)
+                except OSError:
+                    pass
+                continue
+            with os.fdopen(fd, 'w') as f:
+                f.write(str(os.getpid()))
+            return True
+        return False
+
+    def acquire(self, key: str) -> str:
+        """
+        Obtém um perfil livre para a chave, criando um novo se todos estiverem em uso.
+
+        Args:
+            key: Domínio ou 'worker'
+
+        Returns:
+            Diretório do perfil
+        """
+        key_dir = os.path.join(self.root_dir, re.sub(r'[^\w.-]', '_', key))
+        os.makedirs(key_dir, exist_ok=True)
+
+        with self._lock:
+            slot = 0
+            while True:
+                profile_path = os.path.join(key_dir, str(slot))
+                if profile_path not in self._in_use and self._try_lock(profile_path):
+                    self._in_use.add(profile_path)
+                    break
+                slot += 1
+
+        os.makedirs(profile_path, exist_ok=True)
+        logger.info(f"Usando o perfil persistente {profile_path}")
+        return profile_path
+
+    def release(self, profile_path: str):
+        """
+        Devolve um perfil e aplica o limite total do conjunto.
+
+        Args:
+            profile_path: Diretório do perfil
+        """
+        try:
+            with open(os.path.join(profile_path, LAST_USED_FILENAME), 'w') as f:
+                f.write(str(time.time()))
+        except OSError:
+            pass
+
+        with self._lock:
+            self._in_use.discard(profile_path)
+            try:
+                os.remove(profile_path + LOCK_SUFFIX)
+            except OSError:
+                pass
+
+        self._evict()
+
+    def _profiles(self) -> List[Tuple[float, str]]:
+        """
+        Lista os perfis existentes.
+
+        Returns:
+            Lista de (instante do último uso, diretório), do menos para o mais recente
+        """
+        profiles = []
+        for key in os.listdir(self.root_dir):
+            key_dir = os.path.join(self.root_dir, key)
+            if not os.path.isdir(key_dir):
+                continue
+            for slot in os.listdir(key_dir):
+                profile_path = os.path.join(key_dir, slot)
+                if not os.path.isdir(profile_path):
+                    continue
+                try:
+                    last_used = os.path.getmtime(os.path.join(profile_path, LAST_USED_FILENAME))
+                except OSError:
+                    last_used = os.path.getmtime(profile_path)
+                profiles.append((last_used, profile_path))
+        return sorted(profiles)
+
+    def _evict(self):
+        """Remove os perfis usados há mais tempo enquanto o conjunto passar do limite total."""
+        profiles = self._profiles()
+        sizes = {profile_path: _directory_size(profile_path) for _, profile_path in profiles}
+        total = sum(sizes.values())
+        limit = self.max_total_mb * 1024 * 1024
+
+        for _, profile_path in profiles:
+            if total <= limit:
+                break
+            # Perfis reservados ou ainda abertos por um navegador não são removidos
+            if any(os.path.lexists(os.path.join(profile_path, name)) for name in BROWSER_LOCK_NAMES):
+                continue
+            if profile_path in self._in_use or not self._try_lock(profile_path):
+                continue
+            try:
+                shutil.rmtree(profile_path, ignore_errors=True)
+                total -= sizes[profile_path]
+                logger.info(f"Perfil {profile_path} removido ({sizes[profile_path] / (1024 * 1024):.0f}MB) para respeitar o limite de {self.max_total_mb}MB")
+            finally:
+                try:
+                    os.remove(profile_path + LOCK_SUFFIX)
+                except OSError:
+                    pass
@@ -0,0 +1,801 @@
+"""
+Módulo com o proxy de cache local compartilhado por todos os navegadores da execução.
+"""
+
+import datetime
+import hashlib
+import http.client
+import ipaddress
+import json
+import logging
+import os
+import select
+import socket
+import ssl
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from preflight import DEFAULT_USER_AGENT
+
+# Dependência opcional: sem ela o tráfego HTTPS passa pelo proxy sem cache (túnel)
+try:
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.x509.oid import NameOID
+except ImportError:
+    x509 = None
+
+logger = logging.getLogger(__name__)
+
+# Cabeçalhos de conexão, válidos apenas entre dois nós e nunca repassados nem armazenados
+HOP_BY_HOP_HEADERS = {
+    "connection", "proxy-connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailer", "trailers", "transfer-encoding", "upgrade"
+}
+
+# Cabeçalhos condicionais do navegador; numa falta de cache a resposta completa é
+# buscada para poder ser armazenada
+CONDITIONAL_HEADERS = {"if-none-match", "if-modified-since", "if-match", "if-unmodified-since", "if-range"}
+
+# Codificações pedidas à origem, independentes do navegador, para que a mesma
+# resposta armazenada sirva para Chrome e Firefox
+UPSTREAM_ACCEPT_ENCODING = "gzip, deflate"
+
+# Status armazenáveis
+CACHEABLE_STATUS = {200, 203, 301, 308}
+
+# Tamanho máximo de uma resposta armazenada
+MAX_CACHEABLE_BYTES = 50 * 1024 * 1024
+
+# Recursos estáticos, cuja validade pode ser estendida por --proxy-static-ttl
+STATIC_EXTENSIONS = (
+    '.css', '.js', '.mjs', '.woff', '.woff2', '.ttf', '.otf', '.eot',
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.svg', '.ico'
+)
+STATIC_CONTENT_TYPES = ("text/css", "text/javascript", "application/javascript", "font/", "image/")
+
+# Limite da validade heurística (10% da idade desde Last-Modified)
+MAX_HEURISTIC_LIFETIME = 24 * 3600
+
+# Método usado pelos processos de captura para pedir a pré-carga de uma URL
+PREFETCH_METHOD = "PREFETCH"
+
+
+def is_static_asset(url: str, content_type: str = "") -> bool:
+    """
+    Verifica se a resposta é um recurso estático (CSS, JS, fontes, imagens).
+
+    Args:
+        url: URL do recurso
+        content_type: Cabeçalho Content-Type da resposta
+
+    Returns:
+        True se for um recurso estático
+    """
+    if urlparse(url).path.lower().endswith(STATIC_EXTENSIONS):
+        return True
+    content_type = content_type.lower()
+    return any(content_type.startswith(prefix) for prefix in STATIC_CONTENT_TYPES)
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[float]:
+    """Converte uma data HTTP em timestamp, ou None se inválida."""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def freshness_lifetime(headers: Dict[str, str], url: str, static_ttl: float = 0) -> Optional[float]:
+    """
+    Calcula por quanto tempo uma resposta pode ser servida do cache sem revalidação.
+
+    Segue o Cache-Control (no-store, private, no-cache, s-maxage, max-age), o
+    Expires e, na falta deles, a validade heurística baseada em Last-Modified.
+    Recursos estáticos recebem static_ttl no lugar da validade indicada pela
+    origem. Respostas com Vary além de Accept-Encoding não são armazenadas,
+    pois a chave do cache não distingue as variantes.
+
+    Args:
+        headers: Cabeçalhos da resposta (nomes em minúsculas)
+        url: URL do recurso
+        static_ttl: Validade imposta aos recursos estáticos em segundos (0 = seguir os cabeçalhos)
+
+    Returns:
+        Validade em segundos (0 = revalidar a cada uso), ou None se a resposta não deve ser armazenada
+    """
+    directives = {}
+    for part in headers.get("cache-control", "").lower().split(','):
+        name, _, value = part.strip().partition('=')
+        if name:
+            directives[name] = value.strip('"')
+
+    if "no-store" in directives or "private" in directives:
+        return None
+
+    # Accept-Encoding é o mesmo em todas as buscas (UPSTREAM_ACCEPT_ENCODING)
+    varied = {name.strip().lower() for name in headers.get("vary", "").split(',')} - {"", "accept-encoding"}
+    if varied:
+        return None
+
+    if static_ttl > 0 and is_static_asset(url, headers.get("content-type", "")):
+        return static_ttl
+
+    has_validators = "etag" in headers or "last-modified" in headers
+
+    if "no-cache" in directives:
+        return 0 if has_validators else None
+
+    age = 0.0
+    try:
+        age = float(headers.get("age", 0))
+    except ValueError:
+        pass
+
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                return max(0.0, float(directives[name]) - age)
+            except ValueError:
+                break
+
+    date = _parse_http_date(headers.get("date")) or time.time()
+    if "expires" in headers:
+        expires = _parse_http_date(headers["expires"])
+        return max(0.0, expires - date) if expires else 0
+
+    last_modified = _parse_http_date(headers.get("last-modified"))
+    if last_modified:
+        return min(max(0.0, (date - last_modified) * 0.1), MAX_HEURISTIC_LIFETIME)
+
+    return 0 if has_validators else None
+
+
+class DiskCache:
+    """
+    Armazenamento em disco das respostas, com remoção das menos usadas (LRU) acima do limite.
+
+    Cada resposta ocupa dois arquivos: o corpo e os metadados (status,
+    cabeçalhos, validade). O índice de uso fica em memória e é reconstruído
+    a partir das datas dos arquivos ao iniciar.
+    """
+
+    def __init__(self, cache_dir: str, max_mb: int):
+        """
+        Inicializa o armazenamento, indexando as respostas já gravadas.
+
+        Args:
+            cache_dir: Diretório do cache
+            max_mb: Tamanho máximo em MB
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_mb * 1024 * 1024
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+        entries = []
+        for root, _, files in os.walk(cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    meta_path = os.path.join(root, name)
+                    key = name[:-5]
+                    try:
+                        size = os.path.getsize(meta_path) + os.path.getsize(os.path.join(root, key + ".body"))
+                        entries.append((os.path.getmtime(meta_path), key, size))
+                    except OSError:
+                        continue
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total += size
+        if entries:
+            logger.info(f"Cache do proxy: {len(entries)} respostas ({self._total / (1024 * 1024):.0f}MB) em {cache_dir}")
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        directory = os.path.join(self.cache_dir, key[:2])
+        return os.path.join(directory, key + ".json"), os.path.join(directory, key + ".body")
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        """
+        Lê uma resposta armazenada e a marca como usada.
+
+        Args:
+            key: Chave da resposta
+
+        Returns:
+            Tupla (metadados, corpo), ou None se não estiver no cache
+        """
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, 'r') as f:
+                entry = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+
+        with self._lock:
+            if key in self._index:
+                self._index.move_to_end(key)
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+        return entry, body
+
+    def put(self, key: str, entry: Dict[str, Any], body: Optional[bytes] = None):
+        """
+        Grava (ou atualiza) uma resposta e remove as menos usadas acima do limite.
+
+        Args:
+            key: Chave da resposta
+            entry: Metadados
+            body: Corpo (None = manter o corpo já gravado, na revalidação)
+        """
+        meta_path, body_path = self._paths(key)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+
+        if body is not None:
+            temp_body = f"{body_path}.{threading.get_ident()}.tmp"
+            with open(temp_body, 'wb') as f:
+                f.write(body)
+            os.replace(temp_body, body_path)
+
+        temp_meta = f"{meta_path}.{threading.get_ident()}.tmp"
+        with open(temp_meta, 'w') as f:
+            json.dump(entry, f)
+        os.replace(temp_meta, meta_path)
+
+        try:
+            size = os.path.getsize(meta_path) + os.path.getsize(body_path)
+        except OSError:
+            return
+
+        evicted = []
+        with self._lock:
+            self._total += size - self._index.pop(key, 0)
+            self._index[key] = size
+            while self._total > self.max_bytes and len(self._index) > 1:
+                old_key, old_size = self._index.popitem(last=False)
+                self._total -= old_size
+                evicted.append(old_key)
+
+        for old_key in evicted:
+            for path in self._paths(old_key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        if evicted:
+            logger.debug(f"Cache do proxy: {len(evicted)} respostas removidas para respeitar o limite")
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    """Atende as requisições dos navegadores (HTTP, CONNECT e pedidos de pré-carga)."""
+
+    protocol_version = "HTTP/1.1"
+    tunnel_host: Optional[str] = None
+
+    def log_message(self, format, *args):
+        logger.debug(f"Proxy: {format % args}")
+
+    def do_CONNECT(self):
+        self.server.proxy.handle_connect(self)
+
+    def do_GET(self):
+        self.server.proxy.handle_request(self)
+
+    do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = do_OPTIONS = do_GET
+
+    def do_PREFETCH(self):
+        self.server.proxy.handle_prefetch(self)
+
+
+class _TunnelHandler(_ProxyHandler):
+    """Atende as requisições HTTPS decifradas dentro de um túnel CONNECT."""
+
+    def __init__(self, request, client_address, server, tunnel_host: str):
+        self.tunnel_host = tunnel_host
+        super().__init__(request, client_address, server)
+
+
+class CachingProxy:
+    """
+    Proxy HTTP de encaminhamento com cache em disco, compartilhado por todos os navegadores.
+
+    Respeita os cabeçalhos de cache da origem (com validade estendida opcional
+    para recursos estáticos), revalida respostas vencidas com ETag e
+    Last-Modified e reúne requisições simultâneas da mesma URL em uma única
+    busca. O HTTPS só é armazenado quando o pacote opcional 'cryptography'
+    está instalado: o proxy gera uma autoridade certificadora local e decifra
+    o tráfego (os navegadores aceitam o certificado via acceptInsecureCerts);
+    sem ele, as conexões HTTPS passam por um túnel sem cache.
+    """
+
+    def __init__(self, cache_dir: str, max_mb: int = 2048, static_ttl: float = 86400, timeout: float = 60):
+        """
+        Inicializa o proxy (sem iniciá-lo).
+
+        Args:
+            cache_dir: Diretório do cache em disco
+            max_mb: Tamanho máximo do cache em MB
+            static_ttl: Validade imposta aos recursos estáticos em segundos (0 = seguir os cabeçalhos)
+            timeout: Tempo limite das requisições à origem em segundos
+        """
+        self.cache_dir = cache_dir
+        self.cache = DiskCache(os.path.join(cache_dir, "respostas"), max_mb)
+        self.static_ttl = static_ttl
+        self.timeout = timeout
+        self.intercepts_https = x509 is not None
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "prefetched": 0, "served_bytes": 0}
+
+        self._http = requests.Session()
+        self._http.trust_env = False
+        # Buscas em andamento: {chave: [lock, número de requisições usando o lock]}
+        self._inflight: Dict[str, List[Any]] = {}
+        self._lock = threading.Lock()
+        self._contexts: Dict[str, ssl.SSLContext] = {}
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="pre-carga")
+        self._server: Optional[ThreadingHTTPServer] = None
+
+        if self.intercepts_https:
+            self._load_certificate_authority()
+        else:
+            logger.warning(
+                "Pacote 'cryptography' ausente (extra 'proxy-https'): o HTTPS passa pelo proxy sem cache"
+            )
+
+    @property
+    def url(self) -> str:
+        """Endereço do proxy (host:porta)."""
+        host, port = self._server.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Inicia o proxy em uma thread em segundo plano.
+
+        Args:
+            host: Endereço de escuta
+            port: Porta (0 = escolhida pelo sistema)
+
+        Returns:
+            Endereço do proxy (host:porta)
+        """
+        self._server = ThreadingHTTPServer((host, port), _ProxyHandler)
+        self._server.daemon_threads = True
+        self._server.proxy = self
+        threading.Thread(target=self._server.serve_forever, name="proxy-cache", daemon=True).start()
+        logger.info(f"Proxy de cache iniciado em {self.url} (cache em {self.cache_dir})")
+        return self.url
+
+    def close(self):
+        """Encerra o proxy e registra as estatísticas de uso do cache."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self._prefetch_executor.shutdown(wait=False, cancel_futures=True)
+        self._http.close()
+        logger.info(
+            f"Proxy de cache: {self.stats['hits']} acertos, {self.stats['misses']} faltas, "
+            f"{self.stats['revalidated']} revalidações, {self.stats['prefetched']} pré-cargas, "
+            f"{self.stats['served_bytes'] / (1024 * 1024):.1f}MB servidos do cache"
+        )
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.stats[name] += amount
+
+    # Certificados (interceptação de HTTPS)
+
+    def _load_certificate_authority(self):
+        """Carrega (ou gera na primeira execução) a autoridade certificadora local."""
+        key_path = os.path.join(self.cache_dir, "ca.key")
+        cert_path = os.path.join(self.cache_dir, "ca.pem")
+        os.makedirs(os.path.join(self.cache_dir, "certificados"), exist_ok=True)
+
+        if os.path.exists(key_path) and os.path.exists(cert_path):
+            with open(key_path, 'rb') as f:
+                self._ca_key = serialization.load_pem_private_key(f.read(), password=None)
+            with open(cert_path, 'rb') as f:
+                self._ca_cert = x509.load_pem_x509_certificate(f.read())
+        else:
+            self._ca_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+            name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "PrintToPDF proxy local")])
+            now = datetime.datetime.now(datetime.timezone.utc)
+            self._ca_cert = (
+                x509.CertificateBuilder()
+                .subject_name(name)
+                .issuer_name(name)
+                .public_key(self._ca_key.public_key())
+                .serial_number(x509.random_serial_number())
+                .not_valid_before(now - datetime.timedelta(days=1))
+                .not_valid_after(now + datetime.timedelta(days=3650))
+                .add_extension(x509.BasicConstraints(ca=True, path_length=0), critical=True)
+                .sign(self._ca_key, hashes.SHA256())
+            )
+            fd = os.open(key_path, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self._ca_key.private_bytes(
+                    serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL, serialization.NoEncryption()
+                ))
+            with open(cert_path, 'wb') as f:
+                f.write(self._ca_cert.public_bytes(serialization.Encoding.PEM))
+
+        # Uma única chave para todos os certificados de site, gerada uma vez por execução
+        self._site_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self._site_key_path = os.path.join(self.cache_dir, "certificados", "site.key")
+        fd = os.open(self._site_key_path, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self._site_key.private_bytes(
+                serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL, serialization.NoEncryption()
+            ))
+
+    def _context_for(self, host: str) -> ssl.SSLContext:
+        """
+        Obtém o contexto TLS com um certificado para o host, assinado pela autoridade local.
+
+        Args:
+            host: Host do túnel
+
+        Returns:
+            Contexto TLS de servidor
+        """
+        with self._lock:
+            context = self._contexts.get(host)
+            if context:
+                return context
+
+            try:
+                alternative_name = x509.IPAddress(ipaddress.ip_address(host))
+            except ValueError:
+                alternative_name = x509.DNSName(host)
+            now = datetime.datetime.now(datetime.timezone.utc)
+            certificate = (
+                x509.CertificateBuilder()
+                .subject_name(x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, host[:64])]))
+                .issuer_name(self._ca_cert.subject)
+                .public_key(self._site_key.public_key())
+                .serial_number(x509.random_serial_number())
+                .not_valid_before(now - datetime.timedelta(days=1))
+                .not_valid_after(now + datetime.timedelta(days=365))
+                .add_extension(x509.SubjectAlternativeName([alternative_name]), critical=False)
+                .sign(self._ca_key, hashes.SHA256())
+            )
+            cert_path = os.path.join(
+                self.cache_dir, "certificados", hashlib.sha256(host.encode()).hexdigest()[:32] + ".pem"
+            )
+            with open(cert_path, 'wb') as f:
+                f.write(certificate.public_bytes(serialization.Encoding.PEM))
+
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(cert_path, self._site_key_path)
+            context.set_alpn_protocols(["http/1.1"])
+            self._contexts[host] = context
+            return context
+
+    # Atendimento das requisições
+
+    def handle_connect(self, handler: _ProxyHandler):
+        """
+        Atende um CONNECT: decifra o túnel (com 'cryptography') ou repassa os bytes.
+
+        Args:
+            handler: Requisição CONNECT do navegador
+        """
+        host, _, port = handler.path.rpartition(':')
+        host = host.strip('[]')
+        port = int(port or 443)
+
+        if self.intercepts_https:
+            handler.send_response_only(200, "Connection Established")
+            handler.end_headers()
+            try:
+                tls_socket = self._context_for(host).wrap_socket(handler.connection, server_side=True)
+            except (ssl.SSLError, OSError) as e:
+                logger.debug(f"Proxy: falha no TLS com o navegador para {host}: {str(e)}")
+                handler.close_connection = True
+                return
+            tunnel_host = host if port == 443 else f"{host}:{port}"
+            try:
+                _TunnelHandler(tls_socket, handler.client_address, handler.server, tunnel_host)
+            finally:
+                tls_socket.close()
+            handler.close_connection = True
+            return
+
+        try:
+            upstream = socket.create_connection((host, port), timeout=self.timeout)
+        except OSError as e:
+            handler.send_error(502, f"Falha ao conectar a {host}:{port}: {str(e)}")
+            return
+        handler.send_response_only(200, "Connection Established")
+        handler.end_headers()
+        self._relay(handler.connection, upstream)
+        handler.close_connection = True
+
+    def _relay(self, client: socket.socket, upstream: socket.socket):
+        """Repassa os bytes entre o navegador e a origem até uma das pontas fechar."""
+        sockets = [client, upstream]
+        try:
+            while True:
+                readable, _, failed = select.select(sockets, [], sockets, self.timeout)
+                if failed or not readable:
+                    return
+                for source in readable:
+                    data = source.recv(65536)
+                    if not data:
+                        return
+                    (upstream if source is client else client).sendall(data)
+        except OSError:
+            return
+        finally:
+            upstream.close()
+
+    def _cache_key(self, method: str, url: str, origin: Optional[str]) -> str:
+        return hashlib.sha256(f"{method} {url} {origin or ''}".encode()).hexdigest()
+
+    def handle_request(self, handler: _ProxyHandler):
+        """
+        Atende uma requisição HTTP (ou HTTPS decifrada), usando o cache quando possível.
+
+        Args:
+            handler: Requisição do navegador
+        """
+        if handler.tunnel_host:
+            url = f"https://{handler.tunnel_host}{handler.path}"
+        else:
+            url = handler.path
+        if not url.startswith(("http://", "https://")):
+            handler.send_error(400, "O proxy exige URLs absolutas")
+            return
+
+        request_headers = {name.lower(): value for name, value in handler.headers.items()}
+        length = int(request_headers.get("content-length", 0) or 0)
+        body = handler.rfile.read(length) if length else None
+
+        if "upgrade" in request_headers:
+            handler.send_error(501, "WebSocket não é suportado pelo proxy de cache")
+            return
+
+        cacheable = handler.command == "GET" and "authorization" not in request_headers
+        if not cacheable:
+            self._forward(handler, url, request_headers, body)
+            return
+
+        key = self._cache_key("GET", url, request_headers.get("origin"))
+        with self._key_lock(key):
+            cached = self.cache.get(key)
+            if cached and cached[0].get("fresh_until", 0) > time.time():
+                self._count("hits")
+                self._count("served_bytes", len(cached[1]))
+                self._send_cached(handler, cached[0], cached[1], request_headers)
+                return
+
+            entry, response_body = self._fetch(url, request_headers, cached)
+        if entry is None:
+            handler.send_error(502, f"Falha ao buscar {url}")
+            return
+        self._send_cached(handler, entry, response_body, request_headers)
+
+    @contextmanager
+    def _key_lock(self, key: str) -> Iterator[None]:
+        """
+        Reúne as buscas simultâneas da mesma resposta sob um único lock.
+
+        O lock é removido quando a última requisição que o usa termina.
+
+        Args:
+            key: Chave da resposta
+        """
+        with self._lock:
+            slot = self._inflight.setdefault(key, [threading.Lock(), 0])
+            slot[1] += 1
+        try:
+            with slot[0]:
+                yield
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if slot[1] == 0:
+                    del self._inflight[key]
+
+    def _upstream_headers(self, request_headers: Dict[str, str]) -> Dict[str, str]:
+        headers = {
+            name: value for name, value in request_headers.items()
+            if name not in HOP_BY_HOP_HEADERS and name not in CONDITIONAL_HEADERS
+        }
+        headers["accept-encoding"] = UPSTREAM_ACCEPT_ENCODING
+        return headers
+
+    def _fetch(
+        self,
+        url: str,
+        request_headers: Dict[str, str],
+        cached: Optional[Tuple[Dict[str, Any], bytes]] = None
+    ) -> Tuple[Optional[Dict[str, Any]], bytes]:
+        """
+        Busca a resposta na origem (revalidando a armazenada, se houver) e a armazena.
+
+        Args:
+            url: URL do recurso
+            request_headers: Cabeçalhos da requisição (nomes em minúsculas)
+            cached: Resposta armazenada vencida, revalidada com ETag/Last-Modified
+
+        Returns:
+            Tupla (metadados, corpo), ou (None, b'') se a origem falhar
+        """
+        headers = self._upstream_headers(request_headers)
+        if cached:
+            if cached[0].get("etag"):
+                headers["if-none-match"] = cached[0]["etag"]
+            if cached[0].get("last_modified"):
+                headers["if-modified-since"] = cached[0]["last_modified"]
+
+        try:
+            response = self._http.get(url, headers=headers, stream=True, allow_redirects=False, timeout=self.timeout)
+            body = response.raw.read(decode_content=False)
+        except (requests.RequestException, http.client.HTTPException, OSError) as e:
+            logger.debug(f"Proxy: falha ao buscar {url}: {str(e)}")
+            return None, b''
+
+        key = self._cache_key("GET", url, request_headers.get("origin"))
+        response_headers = [
+            [name, value] for name, value in response.raw.headers.items()
+            if name.lower() not in HOP_BY_HOP_HEADERS and name.lower() != "content-length"
+        ]
+        lowered = {name.lower(): value for name, value in response_headers}
+
+        if cached and response.status_code == 304:
+            # Resposta armazenada continua válida: atualizar a validade
+            entry = cached[0]
+            lifetime = freshness_lifetime({**entry.get("lookup", {}), **lowered}, url, self.static_ttl)
+            entry["fresh_until"] = time.time() + (lifetime or 0)
+            self.cache.put(key, entry)
+            self._count("revalidated")
+            return entry, cached[1]
+
+        self._count("misses")
+        entry = {"url": url, "status": response.status_code, "reason": response.reason, "headers": response_headers}
+        lifetime = freshness_lifetime(lowered, url, self.static_ttl)
+        storable = (
+            response.status_code in CACHEABLE_STATUS
+            and len(body) <= MAX_CACHEABLE_BYTES
+            and lifetime is not None
+        )
+        if storable:
+            entry.update({
+                "fresh_until": time.time() + (lifetime or 0),
+                "etag": lowered.get("etag"),
+                "last_modified": lowered.get("last-modified"),
+                "lookup": {name: lowered[name] for name in ("cache-control", "content-type", "expires") if name in lowered}
+            })
+            # Os cookies seguem apenas para quem fez a requisição; a cópia armazenada,
+            # servida aos outros navegadores, não os leva
+            stored = dict(entry, headers=[[name, value] for name, value in response_headers if name.lower() != "set-cookie"])
+            self.cache.put(key, stored, body)
+        return entry, body
+
+    def _send_cached(
+        self,
+        handler: _ProxyHandler,
+        entry: Dict[str, Any],
+        body: bytes,
+        request_headers: Dict[str, str]
+    ):
+        """Envia ao navegador uma resposta (armazenada ou recém-buscada)."""
+        etag = entry.get("etag")
+        if etag and request_headers.get("if-none-match") == etag:
+            handler.send_response_only(304)
+            for name, value in entry["headers"]:
+                if name.lower() in ("etag", "cache-control", "expires", "last-modified"):
+                    handler.send_header(name, value)
+            handler.send_header("Content-Length", "0")
+            handler.end_headers()
+            return
+
+        handler.send_response_only(entry["status"], entry.get("reason"))
+        for name, value in entry["headers"]:
+            handler.send_header(name, value)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        if handler.command != "HEAD":
+            handler.wfile.write(body)
+
+    def _forward(self, handler: _ProxyHandler, url: str, request_headers: Dict[str, str], body: Optional[bytes]):
+        """Repassa à origem uma requisição que não passa pelo cache."""
+        headers = {name: value for name, value in request_headers.items() if name not in HOP_BY_HOP_HEADERS}
+        try:
+            response = self._http.request(
+                handler.command, url, headers=headers, data=body, stream=True,
+                allow_redirects=False, timeout=self.timeout
+            )
+            response_body = response.raw.read(decode_content=False)
+        except (requests.RequestException, http.client.HTTPException, OSError) as e:
+            handler.send_error(502, f"Falha ao buscar {url}: {str(e)}")
+            return
+
+        handler.send_response_only(response.status_code, response.reason)
+        for name, value in response.raw.headers.items():
+            if name.lower() not in HOP_BY_HOP_HEADERS and name.lower() != "content-length":
+                handler.send_header(name, value)
+        handler.send_header("Content-Length", str(len(response_body)))
+        handler.end_headers()
+        if handler.command != "HEAD":
+            handler.wfile.write(response_body)
+
+    # Pré-carga
+
+    def prefetch(self, url: str):
+        """
+        Busca em segundo plano o HTML de uma página que será capturada em seguida.
+
+        A resposta segue as mesmas regras de armazenamento das demais: páginas
+        com no-store, private ou Vary por outros cabeçalhos não são aproveitadas.
+
+        Args:
+            url: URL da página
+        """
+        if url.startswith("https://") and not self.intercepts_https:
+            return
+        self._prefetch_executor.submit(self._prefetch, url)
+
+    def _prefetch(self, url: str):
+        request_headers = {
+            "user-agent": DEFAULT_USER_AGENT,
+            "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"
+        }
+        key = self._cache_key("GET", url, None)
+        with self._key_lock(key):
+            cached = self.cache.get(key)
+            if cached and cached[0].get("fresh_until", 0) > time.time():
+                return
+            entry, _ = self._fetch(url, request_headers)
+        if entry is not None:
+            self._count("prefetched")
+            logger.debug(f"Proxy: {url} pré-carregada")
+
+    def handle_prefetch(self, handler: _ProxyHandler):
+        """
+        Atende um pedido de pré-carga vindo de um processo de captura.
+
+        Args:
+            handler: Requisição PREFETCH com a URL da página
+        """
+        self.prefetch(handler.path)
+        handler.send_response_only(202)
+        handler.send_header("Content-Length", "0")
+        handler.end_headers()
+
+
+def request_prefetch(proxy_url: str, url: str):
+    """
+    Pede ao proxy de cache a pré-carga de uma página (de qualquer processo da execução).
+
+    Args:
+        proxy_url: Endereço do proxy (host:porta)
+        url: URL da página
+    """
+    host, _, port = proxy_url.rpartition(':')
+    connection = http.client.HTTPConnection(host, int(port), timeout=5)
+    try:
+        connection.request(PREFETCH_METHOD, url)
+        connection.getresponse().read()
+    except (OSError, http.client.HTTPException) as e:
+        logger.debug(f"Erro ao pedir a pré-carga de {url}: {str(e)}")
+    finally:
+        connection.close()
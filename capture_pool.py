@@ -0,0 +1,132 @@
+"""
+Módulo com o pool de crawlers para captura paralela de páginas de um mesmo domínio.
+"""
+
+import logging
+import queue
+import threading
+from typing import Any, Callable, List, Optional
+
+from crawler import WebCrawler
+
+logger = logging.getLogger(__name__)
+
+
+class CapturePool:
+    """Pool de instâncias de WebCrawler alimentadas por uma fila de trabalho compartilhada."""
+
+    def __init__(self, crawler_factory: Callable[[], WebCrawler], workers: int = 1):
+        """
+        Inicializa o pool de captura.
+
+        Args:
+            crawler_factory: Função que cria um novo WebCrawler (um por worker)
+            workers: Número de navegadores executando em paralelo
+        """
+        self.crawler_factory = crawler_factory
+        self.workers = max(1, workers)
+        # Os crawlers são criados sob demanda dentro de cada worker e mantidos
+        # entre chamadas de map() para reaproveitar os navegadores já abertos
+        self._crawlers: List[Optional[WebCrawler]] = [None] * self.workers
+        self._lock = threading.Lock()
+
+    def _get_crawler(self, slot: int) -> WebCrawler:
+        """
+        Obtém (ou cria) o crawler associado a um worker.
+
+        Args:
+            slot: Índice do worker
+
+        Returns:
+            Crawler exclusivo do worker
+        """
+        crawler = self._crawlers[slot]
+        if crawler is None:
+            crawler = self.crawler_factory()
+            self._crawlers[slot] = crawler
+        return crawler
+
+    def map(
+        self,
+        task: Callable[[WebCrawler, Any], Any],
+        items: List[Any],
+        on_done: Optional[Callable[[int, Any], None]] = None
+    ) -> List[Any]:
+        """
+        Executa uma tarefa para cada item usando os crawlers do pool.
+
+        Os resultados são devolvidos na mesma ordem dos itens de entrada,
+        independentemente da ordem em que as capturas terminam.
+
+        Args:
+            task: Função chamada como task(crawler, item)
+            items: Itens a processar (por exemplo, URLs do sitemap)
+            on_done: Callback opcional chamado como on_done(indice, resultado)
+
+        Returns:
+            Lista de resultados na ordem dos itens. Exceções levantadas pela
+            tarefa são devolvidas no lugar do resultado.
+        """
+        if not items:
+            return []
+
+        work_queue: "queue.Queue[int]" = queue.Queue()
+        for index in range(len(items)):
+            work_queue.put(index)
+
+        results: List[Any] = [None] * len(items)
+        completed = [False] * len(items)
+        startup_errors: List[Exception] = []
+
+        def worker(slot: int) -> None:
+            try:
+                crawler = self._get_crawler(slot)
+            except Exception as e:
+                logger.error(f"Worker {slot} não conseguiu iniciar o navegador: {str(e)}")
+                with self._lock:
+                    startup_errors.append(e)
+                return
+
+            while True:
+                try:
+                    index = work_queue.get_nowait()
+                except queue.Empty:
+                    return
+
+                try:
+                    result = task(crawler, items[index])
+                except Exception as e:
+                    logger.error(f"Erro no worker {slot} ao processar item {index}: {str(e)}")
+                    result = e
+
+                with self._lock:
+                    results[index] = result
+                    completed[index] = True
+                    if on_done:
+                        on_done(index, result)
+
+        threads = [
+            threading.Thread(target=worker, args=(slot,), name=f"captura-{slot}", daemon=True)
+            for slot in range(min(self.workers, len(items)))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Itens que sobraram na fila porque nenhum worker conseguiu iniciar
+        for index, done in enumerate(completed):
+            if not done:
+                error = startup_errors[0] if startup_errors else RuntimeError("Item não processado")
+                results[index] = error
+                if on_done:
+                    on_done(index, error)
+
+        return results
+
+    def close(self):
+        """Fecha todos os navegadores do pool."""
+        for slot, crawler in enumerate(self._crawlers):
+            if crawler is not None:
+                crawler.close()
+                self._crawlers[slot] = None
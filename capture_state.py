@@ -0,0 +1,138 @@
+"""
+Módulo com o estado das capturas por URL, usado na recaptura incremental.
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Nome do arquivo de estado dentro da pasta de cada domínio
+STATE_FILENAME = "estado_capturas.json"
+
+
+class CaptureState:
+    """
+    Estado persistente das capturas de um domínio, seguro para uso entre threads.
+
+    Para cada URL guarda o <lastmod> do sitemap, os validadores HTTP (ETag e
+    Last-Modified), o hash do conteúdo e o PDF gerado, permitindo decidir se a
+    página mudou desde a última execução.
+    """
+
+    def __init__(self, path: str):
+        """
+        Inicializa o estado, carregando o arquivo se ele existir.
+
+        Args:
+            path: Caminho do arquivo JSON de estado
+        """
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.entries = json.load(f).get("urls", {})
+                logger.info(f"Estado de capturas carregado: {len(self.entries)} URLs em {path}")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Estado de capturas ilegível em {path}, recapturando tudo: {str(e)}")
+                self.entries = {}
+
+    def cached_pdf(self, url: str, lastmod: Optional[str] = None, headers: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """
+        Verifica se a página não mudou desde a última captura.
+
+        A página é considerada inalterada quando ao menos um sinal (lastmod,
+        ETag ou Last-Modified) pode ser comparado com o estado salvo e nenhum
+        dos sinais comparáveis mudou.
+
+        Args:
+            url: URL da página
+            lastmod: Valor de <lastmod> no sitemap
+            headers: Validadores HTTP obtidos no pre-flight
+
+        Returns:
+            Caminho do PDF existente se a página não mudou, ou None se deve ser recapturada
+        """
+        with self._lock:
+            entry = self.entries.get(url)
+        if not entry or not entry.get("pdf_path") or not os.path.exists(entry["pdf_path"]):
+            return None
+
+        current = {"lastmod": lastmod}
+        current.update({name.lower(): value for name, value in (headers or {}).items()})
+
+        compared = 0
+        for key in ("lastmod", "etag", "last-modified"):
+            if current.get(key) and entry.get(key):
+                if current[key] != entry[key]:
+                    return None
+                compared += 1
+
+        return entry["pdf_path"] if compared else None
+
+    def record(
+        self,
+        url: str,
+        pdf_path: str,
+        content_hash: Optional[str] = None,
+        lastmod: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        """
+        Registra uma captura concluída.
+
+        Outras URLs que apontavam para o mesmo PDF com outro conteúdo (duplicatas
+        de uma versão anterior da página) perdem o hash, que não vale mais para o arquivo.
+
+        Args:
+            url: URL da página
+            pdf_path: PDF gerado
+            content_hash: Hash do conteúdo normalizado da página
+            lastmod: Valor de <lastmod> no sitemap
+            headers: Validadores HTTP obtidos no pre-flight
+        """
+        entry = {
+            "lastmod": lastmod,
+            "content_hash": content_hash,
+            "pdf_path": pdf_path,
+            "captured_at": datetime.now().isoformat(timespec='seconds')
+        }
+        entry.update({name.lower(): value for name, value in (headers or {}).items()})
+
+        with self._lock:
+            for other in self.entries.values():
+                if other.get("pdf_path") == pdf_path and other.get("content_hash") != content_hash:
+                    other["content_hash"] = None
+            self.entries[url] = entry
+
+    def content_hashes(self) -> Dict[str, str]:
+        """
+        Lista o conteúdo já capturado cujos PDFs ainda existem.
+
+        Returns:
+            Dicionário {hash do conteúdo: caminho do PDF}
+        """
+        with self._lock:
+            entries = list(self.entries.values())
+        return {
+            entry["content_hash"]: entry["pdf_path"]
+            for entry in entries
+            if entry.get("content_hash") and entry.get("pdf_path") and os.path.exists(entry["pdf_path"])
+        }
+
+    def save(self):
+        """Salva o estado em disco, substituindo o arquivo de forma atômica."""
+        with self._lock:
+            data = {"updated_at": datetime.now().isoformat(timespec='seconds'), "urls": dict(self.entries)}
+
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, self.path)
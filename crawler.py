@@ -2,12 +2,16 @@
 Versão melhorada do módulo de crawler para garantir carregamento completo da página antes de capturar screenshots.
 """
 
+import base64
+import json
 import logging
+import os
 import time
 import tempfile
 import hashlib
 from urllib.parse import urlparse, urljoin, urldefrag
-from typing import List, Set, Optional, Tuple, Dict
+from typing import List, Set, Optional, Tuple, Dict, Union
+from dataclasses import dataclass
 from datetime import datetime
 
 import requests
@@ -19,13 +23,290 @@ from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from selenium.common.exceptions import WebDriverException, TimeoutException, JavascriptException
 from selenium.webdriver.common.by import By
+from selenium.webdriver.common.print_page_options import PrintOptions
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from PIL import Image
 from io import BytesIO
 
+from band_stitcher import BandStitcher, StitchedImage
+from network_filter import BlockList, build_pac_url, url_matches
+from browser_manager import BrowserManager
+from browser_profile import ProfileStore
+from recycle_policy import RecyclePolicy
+from page_watchdog import DRIVER_POPEN_KW, PageWatchdog
+from tab_session import TabSession
+from metrics import METRICS
+from stage_timings import PageTimings
+from retry_queue import (
+    FAILURE_BLANK_RENDER, FAILURE_DEADLINE, FAILURE_DRIVER_CRASH, FAILURE_HTTP_ERROR, FAILURE_OTHER, FAILURE_TIMEOUT, CaptureError
+)
+from page_probe import DEFAULT_LOADER_SELECTORS, PageSnapshot, content_fingerprint, probe_page
+from page_readiness import PageReadiness
+from viewport_profiles import LOAD_TIME_QUERIES_SCRIPT, MEDIA_QUERY_PROBE_SCRIPT, ViewportProfile, breakpoint_crossed
+
 logger = logging.getLogger(__name__)
 
+# Altura máxima de cada faixa capturada via DevTools; acima do limite de textura
+# da GPU (16384px) o Chrome devolve imagens cortadas ou em branco
+CDP_MAX_TILE_HEIGHT = 16000
+
+# Altura das faixas usadas quando a página excede CDP_MAX_TILE_HEIGHT; faixas
+# menores mantêm o pico de memória baixo, independente da altura da página
+CDP_BAND_HEIGHT = 4000
+
+# Modos de renderização: screenshot (raster) ou impressão nativa do navegador (vetorial)
+RENDER_MODES = ("screenshot", "print")
+
+# Altura máxima de cada página do PDF impresso (200 polegadas a 96 px/pol.,
+# o limite de tamanho de página dos leitores de PDF)
+PRINT_MAX_PAGE_HEIGHT = 19200
+
+# Caminho do driver (chromedriver/geckodriver) resolvido na primeira inicialização
+# de cada navegador, reaproveitado para evitar nova busca ou download
+_DRIVER_PATHS: Dict[str, str] = {}
+
+# Soma os bytes transferidos pela navegação e por todos os recursos da página
+NETWORK_ENTRIES_SCRIPT = """
+var entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+return entries.map(function(entry) {
+    return [entry.name, entry.transferSize || 0];
+});
+"""
+
+# Número máximo de passos (do tamanho da viewport) ao percorrer a página;
+# páginas com rolagem infinita continuariam crescendo indefinidamente
+LAZY_LOAD_MAX_STEPS = 200
+
+# Status HTTP do documento principal (responseStatus não existe em navegadores antigos)
+NAVIGATION_STATUS_SCRIPT = """
+var entries = performance.getEntriesByType('navigation');
+return entries.length ? (entries[0].responseStatus || 0) : 0;
+"""
+
+# Desfaz os ajustes de elementos fixos feitos por _pause_videos_and_animations,
+# para que o layout possa ser recalculado em outro viewport
+RESTORE_FIXED_ELEMENTS_SCRIPT = """
+var elements = document.querySelectorAll('[data-print-to-pdf-style]');
+for (var i = 0; i < elements.length; i++) {
+    var original = elements[i].getAttribute('data-print-to-pdf-style');
+    if (original) {
+        elements[i].setAttribute('style', original);
+    } else {
+        elements[i].removeAttribute('style');
+    }
+    elements[i].removeAttribute('data-print-to-pdf-style');
+}
+window.dispatchEvent(new Event('resize'));
+"""
+
+# Diferença máxima de luminância para considerar uma captura em branco
+BLANK_LUMINANCE_RANGE = 2
+
+def is_blank_image(image: Union[Image.Image, StitchedImage]) -> bool:
+    """
+    Verifica se uma captura é uniforme (página renderizada em branco ou de uma só cor).
+    
+    Args:
+        image: Imagem capturada
+        
+    Returns:
+        True se a imagem não tem conteúdo visível. Imagens em faixas
+        (StitchedImage) não são verificadas.
+    """
+    if not isinstance(image, Image.Image):
+        return False
+    low, high = image.convert('L').getextrema()
+    return high - low <= BLANK_LUMINANCE_RANGE
+
+def create_driver(
+    browser_type: str,
+    headless: bool,
+    page_load_timeout: int,
+    blocked_patterns: Optional[List[str]] = None,
+    tabbed: bool = False,
+    profile_path: Optional[str] = None,
+    cache_mb: int = 256,
+    proxy_url: Optional[str] = None,
+    proxy_intercepts_https: bool = False
+) -> webdriver.Remote:
+    """
+    Inicializa o navegador com as configurações apropriadas.
+    
+    Args:
+        browser_type: Navegador a ser usado ('chrome' ou 'firefox')
+        headless: Se o navegador deve ser executado em modo headless
+        page_load_timeout: Timeout de carregamento de página em segundos
+        blocked_patterns: Padrões de URL bloqueados que precisam ser configurados no lançamento
+        tabbed: Se o navegador será compartilhado por várias abas (TabSession): a navegação
+            não bloqueia a sessão e as abas em segundo plano não são desaceleradas
+        profile_path: Diretório de perfil persistente (None = perfil temporário)
+        cache_mb: Limite do cache HTTP em disco do perfil persistente (MB)
+        proxy_url: Endereço (host:porta) do proxy de cache compartilhado (None = acesso direto)
+        proxy_intercepts_https: Se o proxy decifra o HTTPS com a própria autoridade
+            certificadora, cujos certificados o navegador precisa aceitar
+        
+    Returns:
+        Driver do navegador
+    """
+    try:
+        if browser_type.lower() == "chrome":
+            options = ChromeOptions()
+            if headless:
+                options.add_argument("--headless=new")
+            
+            # Configurações para captura de página completa
+            options.add_argument("--window-size=1920,1080")
+            options.add_argument("--disable-gpu")
+            options.add_argument("--disable-extensions")
+            options.add_argument("--no-sandbox")
+            options.add_argument("--disable-dev-shm-usage")
+            
+            # Melhorias para captura de alta qualidade
+            options.add_argument("--force-device-scale-factor=1")
+            options.add_argument("--high-dpi-support=1")
+            
+            # Otimizações para melhor renderização de vídeo
+            options.add_argument("--autoplay-policy=no-user-gesture-required")
+            
+            # Log de desempenho para contabilizar as requisições bloqueadas
+            if blocked_patterns:
+                options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+            
+            # Várias abas: o carregamento é acompanhado pela TabSession e as abas
+            # em segundo plano precisam manter timers e renderização em ritmo normal
+            if tabbed:
+                options.page_load_strategy = "none"
+                options.add_argument("--disable-background-timer-throttling")
+                options.add_argument("--disable-backgrounding-occluded-windows")
+                options.add_argument("--disable-renderer-backgrounding")
+            
+            # Perfil persistente: o cache HTTP em disco é reaproveitado entre páginas
+            # e execuções, com o tamanho limitado pelo próprio navegador
+            if profile_path:
+                options.add_argument(f"--user-data-dir={profile_path}")
+                options.add_argument(f"--disk-cache-size={cache_mb * 1024 * 1024}")
+            
+            # Proxy de cache compartilhado: quando o HTTPS é decifrado pelo proxy com
+            # um certificado próprio, o navegador precisa aceitá-lo
+            if proxy_url:
+                options.add_argument(f"--proxy-server=http://{proxy_url}")
+                options.accept_insecure_certs = proxy_intercepts_https
+            
+            # Preferir Chrome já instalado, caso contrário baixar automaticamente.
+            # O caminho do driver resolvido é reaproveitado nas próximas inicializações
+            try:
+                service = ChromeService(executable_path=_DRIVER_PATHS.get("chrome"), popen_kw=DRIVER_POPEN_KW)
+                driver = webdriver.Chrome(service=service, options=options)
+            except Exception as e:
+                logger.warning(f"Erro ao inicializar Chrome padrão: {str(e)}")
+                from webdriver_manager.chrome import ChromeDriverManager
+                service = ChromeService(ChromeDriverManager().install(), popen_kw=DRIVER_POPEN_KW)
+                driver = webdriver.Chrome(service=service, options=options)
+            _DRIVER_PATHS["chrome"] = service.path
+            
+        else:  # Firefox como fallback ou opção preferida
+            options = FirefoxOptions()
+            if headless:
+                options.add_argument("--headless")
+            options.add_argument("--width=1920")
+            options.add_argument("--height=1080")
+            
+            # Configurações para melhor renderização de vídeo
+            options.set_preference("media.autoplay.default", 0)
+            options.set_preference("media.autoplay.enabled", True)
+            
+            # Alta qualidade
+            options.set_preference("layout.css.devPixelsPerPx", "1.0")
+            
+            # Configurações adicionais para garantir carregamento completo
+            options.set_preference("network.http.connection-timeout", 60)
+            options.set_preference("network.http.connection-retry-timeout", 60)
+            options.set_preference("dom.max_script_run_time", 60)
+            
+            # Várias abas: o carregamento é acompanhado pela TabSession e as abas
+            # em segundo plano precisam manter timers em ritmo normal
+            if tabbed:
+                options.page_load_strategy = "none"
+                options.set_preference("dom.min_background_timeout_value", 4)
+                options.set_preference("dom.timeout.enable_budget_timer_throttling", False)
+            
+            # Perfil persistente: o cache HTTP em disco é reaproveitado entre páginas
+            # e execuções, com o tamanho limitado pelo próprio navegador
+            if profile_path:
+                options.add_argument("-profile")
+                options.add_argument(profile_path)
+                options.set_preference("browser.cache.disk.enable", True)
+                options.set_preference("browser.cache.disk.smart_size.enabled", False)
+                options.set_preference("browser.cache.disk.capacity", cache_mb * 1024)
+            
+            # Bloqueio de requisições via PAC: URLs bloqueadas são enviadas
+            # para um proxy inexistente e falham imediatamente; as demais seguem
+            # direto ou pelo proxy de cache compartilhado
+            if proxy_url:
+                options.accept_insecure_certs = proxy_intercepts_https
+            if blocked_patterns or proxy_url:
+                default_route = f"PROXY {proxy_url}" if proxy_url else "DIRECT"
+                options.set_preference("network.proxy.type", 2)
+                options.set_preference("network.proxy.autoconfig_url", build_pac_url(blocked_patterns or [], default_route))
+                options.set_preference("network.proxy.autoconfig_url.include_path", True)
+            
+            # Preferir Firefox já instalado, caso contrário baixar automaticamente.
+            # O caminho do driver resolvido é reaproveitado nas próximas inicializações
+            try:
+                service = FirefoxService(executable_path=_DRIVER_PATHS.get("firefox"), popen_kw=DRIVER_POPEN_KW)
+                driver = webdriver.Firefox(service=service, options=options)
+            except Exception as e:
+                logger.warning(f"Erro ao inicializar Firefox padrão: {str(e)}")
+                from webdriver_manager.firefox import GeckoDriverManager
+                service = FirefoxService(GeckoDriverManager().install(), popen_kw=DRIVER_POPEN_KW)
+                driver = webdriver.Firefox(service=service, options=options)
+            _DRIVER_PATHS["firefox"] = service.path
+            
+        # Configurar timeouts 
+        driver.set_page_load_timeout(page_load_timeout)
+        driver.implicitly_wait(15)
+        
+        return driver
+    
+    except Exception as e:
+        logger.error(f"Erro ao inicializar o navegador: {str(e)}")
+        raise
+
+def driver_launch_key(
+    browser_type: str,
+    headless: bool,
+    page_load_timeout: int,
+    blocked_patterns: Optional[List[str]] = None
+) -> Tuple:
+    """
+    Gera a chave que identifica navegadores intercambiáveis entre domínios.
+    
+    No Chrome o bloqueio de URLs é aplicado a cada navegação, então só importa se
+    ele está ativo; no Firefox os padrões ficam fixos no PAC definido no lançamento.
+    
+    Args:
+        browser_type: Navegador ('chrome' ou 'firefox')
+        headless: Se o navegador é executado em modo headless
+        page_load_timeout: Timeout de carregamento de página em segundos
+        blocked_patterns: Padrões de URL bloqueados
+        
+    Returns:
+        Tupla usada como chave pelo BrowserManager
+    """
+    if browser_type.lower() == "chrome":
+        return ("chrome", headless, page_load_timeout, bool(blocked_patterns))
+    return ("firefox", headless, page_load_timeout, tuple(blocked_patterns or ()))
+
+@dataclass
+class DuplicatePage:
+    """Página cujo conteúdo normalizado já foi capturado em outra URL."""
+
+    url: str
+    content_hash: str
+    original_pdf: str
+
+
 class WebCrawler:
     """Crawler aprimorado para garantir carregamento completo da página antes de capturar screenshots."""
     
@@ -37,7 +318,22 @@ class WebCrawler:
         browser: str = "firefox",
         wait_time: int = 45,  # Aumentado para 45 segundos por padrão
         extra_wait_for_media: int = 20,  # Aumentado para 20 segundos extras para mídias
-        page_load_timeout: int = 180  # Timeout de 3 minutos para carregamento de página
+        page_load_timeout: int = 180,  # Timeout de 3 minutos para carregamento de página
+        loader_selectors: Optional[List[str]] = None,
+        loader_timeout: float = 15,
+        render_mode: str = "screenshot",
+        block_list: Optional[BlockList] = None,
+        recycle_policy: Optional[RecyclePolicy] = None,
+        browser_manager: Optional[BrowserManager] = None,
+        content_hashes: Optional[Dict[str, str]] = None,
+        page_deadline: float = 0,
+        lazy_load_budget: float = 60,
+        viewport_profiles: Optional[List[ViewportProfile]] = None,
+        tab_session: Optional[TabSession] = None,
+        profile_store: Optional[ProfileStore] = None,
+        profile_key: Optional[str] = None,
+        proxy_url: Optional[str] = None,
+        proxy_intercepts_https: bool = False
     ):
         """
         Inicializa o crawler.
@@ -50,6 +346,27 @@ class WebCrawler:
             wait_time: Tempo de espera para carregamento da página (segundos)
             extra_wait_for_media: Tempo adicional de espera para páginas com elementos multimídia
             page_load_timeout: Timeout de carregamento de página em segundos
+            loader_selectors: Seletores CSS de indicadores de carregamento (spinners, barras de progresso)
+            loader_timeout: Prazo máximo em segundos para os indicadores de carregamento desaparecerem
+            render_mode: 'screenshot' (imagem) ou 'print' (PDF vetorial via impressão do navegador)
+            block_list: Lista de padrões de URL bloqueados na camada de rede (None = sem bloqueio)
+            recycle_policy: Política de reinício proativo do navegador entre páginas (None = desativada)
+            browser_manager: Gerenciador que fornece navegadores aquecidos e os recebe de volta no close()
+            content_hashes: Índice {hash do conteúdo: PDF gerado}, compartilhado entre crawlers
+                para reaproveitar páginas duplicadas (None = índice próprio)
+            page_deadline: Prazo máximo de relógio por página em segundos; ao vencer, o
+                navegador é encerrado à força e a página falha (0 = sem prazo)
+            lazy_load_budget: Orçamento em segundos para percorrer a página e carregar o conteúdo tardio
+            viewport_profiles: Viewports em que cada página é capturada a partir de um único
+                carregamento (None = apenas a janela padrão)
+            tab_session: Navegador compartilhado em que o crawler usa uma aba própria
+                (None = navegador exclusivo do crawler)
+            profile_store: Conjunto de perfis persistentes, com cache HTTP em disco
+                reaproveitado entre páginas e execuções (None = perfil temporário)
+            profile_key: Chave do perfil persistente (domínio ou 'worker'; padrão: o domínio)
+            proxy_url: Endereço (host:porta) do proxy de cache compartilhado por todos os
+                navegadores (None = acesso direto)
+            proxy_intercepts_https: Se o proxy decifra o HTTPS com certificados próprios
         """
         self.base_url = base_url
         self.max_depth = max_depth
@@ -58,84 +375,211 @@ class WebCrawler:
         self.wait_time = wait_time
         self.extra_wait_for_media = extra_wait_for_media
         self.page_load_timeout = page_load_timeout
+        self.loader_selectors = list(loader_selectors) if loader_selectors else list(DEFAULT_LOADER_SELECTORS)
+        self.loader_timeout = loader_timeout
+        self.lazy_load_budget = lazy_load_budget
+        self.viewport_profiles = list(viewport_profiles) if viewport_profiles else None
+        if render_mode not in RENDER_MODES:
+            raise ValueError(f"Modo de renderização inválido: {render_mode}")
+        self.render_mode = render_mode
         self.visited_urls: Set[str] = set()
-        self.content_hashes: Dict[str, str] = {}  # Rastreamento de conteúdo para evitar duplicação
+        self.content_hashes: Dict[str, str] = content_hashes if content_hashes is not None else {}  # Rastreamento de conteúdo para evitar duplicação
+        self.last_content_hash: Optional[str] = None
         self.domain = urlparse(base_url).netloc
         
+        # Padrões de URL bloqueados na camada de rede do navegador
+        self.blocked_patterns: List[str] = block_list.patterns_for(self.domain) if block_list else []
+        self.last_network_stats: Dict[str, int] = {"blocked_requests": 0, "transferred_bytes": 0}
+        
+        # Tempos por etapa e contadores da última página capturada
+        self.last_timings = PageTimings()
+        
+        # Motor de prontidão: os tempos fixos passam a ser apenas limites superiores
+        self.readiness = PageReadiness()
+        
+        # Último estado coletado pela sonda de página
+        self.last_snapshot: Optional[PageSnapshot] = None
+        
+        # Reciclagem proativa do navegador entre páginas
+        self.recycle_policy = recycle_policy
+        self.pages_since_restart = 0
+        self.browser_restarts = 0
+        
+        # Navegadores aquecidos compartilhados entre domínios
+        self.browser_manager = browser_manager
+        
+        # Navegador compartilhado com outros crawlers, uma aba para cada
+        self.tab_session = tab_session
+        self._tab_page_open = False
+        
+        # Proxy de cache compartilhado (o mesmo para todos os navegadores da execução)
+        self.proxy_url = proxy_url
+        self.proxy_intercepts_https = proxy_intercepts_https
+        
+        self.launch_key = driver_launch_key(browser, headless, page_load_timeout, self.blocked_patterns)
+        
+        # Perfil persistente, reservado enquanto o crawler existir (abas usam o perfil da sessão);
+        # o navegador fica preso ao perfil e não passa pelo gerenciador de navegadores
+        self.profile_store = profile_store if not tab_session else None
+        self.profile_path = self.profile_store.acquire(profile_key or self.domain) if self.profile_store else None
+        self._visited_origins: Set[str] = set()
+        
+        # Prazo por página imposto por fora da sessão WebDriver
+        self.watchdog = PageWatchdog(page_deadline) if page_deadline else None
+        
         # Inicializar o driver do navegador
-        self.driver = self._init_browser()
+        try:
+            self.driver = self._init_browser()
+        except Exception:
+            if self.profile_path:
+                self.profile_store.release(self.profile_path)
+            raise
         
     def _init_browser(self) -> webdriver.Remote:
-        """Inicializa o navegador com as configurações apropriadas."""
+        """Inicializa o navegador com as configurações apropriadas (ou reutiliza um aquecido, ou abre uma aba)."""
+        def factory():
+            return create_driver(
+                self.browser_type, self.headless, self.page_load_timeout, self.blocked_patterns,
+                profile_path=self.profile_path,
+                cache_mb=self.profile_store.cache_mb if self.profile_store else 256,
+                proxy_url=self.proxy_url, proxy_intercepts_https=self.proxy_intercepts_https
+            )
+        
+        if self.tab_session:
+            driver = self.tab_session.open_tab()
+        elif self.browser_manager and not self.profile_path:
+            driver = self.browser_manager.acquire(self.launch_key, factory)
+        else:
+            driver = factory()
+        
+        self._apply_network_filter(driver)
+        
+        # Registrar as media queries avaliadas pelos scripts da página, para decidir
+        # entre redimensionar e recarregar ao trocar de viewport (apenas no Chrome)
+        if self.viewport_profiles and self.browser_type.lower() == "chrome":
+            try:
+                driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": MEDIA_QUERY_PROBE_SCRIPT})
+            except Exception as e:
+                logger.warning(f"Erro ao instalar o registro de media queries: {str(e)}")
+        
+        return driver
+    
+    def restart_browser(self, reason: str = ""):
+        """
+        Fecha o navegador atual e inicia um novo.
+        
+        Args:
+            reason: Motivo do reinício, para o log
+        """
+        logger.info(f"Reiniciando o navegador{': ' + reason if reason else ''}")
+        self._quit_driver()
+        self.driver = self._init_browser()
+        self.pages_since_restart = 0
+        self.browser_restarts += 1
+        METRICS.inc("printtopdf_browser_restarts_total")
+    
+    def _driver_pid(self) -> Optional[int]:
+        """
+        Obtém o PID do processo do driver (geckodriver/chromedriver), pai do navegador.
+        
+        Returns:
+            PID do driver ou None se indisponível
+        """
         try:
-            if self.browser_type.lower() == "chrome":
-                options = ChromeOptions()
-                if self.headless:
-                    options.add_argument("--headless=new")
-                
-                # Configurações para captura de página completa
-                options.add_argument("--window-size=1920,1080")
-                options.add_argument("--disable-gpu")
-                options.add_argument("--disable-extensions")
-                options.add_argument("--no-sandbox")
-                options.add_argument("--disable-dev-shm-usage")
-                
-                # Melhorias para captura de alta qualidade
-                options.add_argument("--force-device-scale-factor=1")
-                options.add_argument("--high-dpi-support=1")
-                
-                # Otimizações para melhor renderização de vídeo
-                options.add_argument("--autoplay-policy=no-user-gesture-required")
-                
-                # Preferir Chrome já instalado, caso contrário baixar automaticamente
-                try:
-                    service = ChromeService()
-                    driver = webdriver.Chrome(service=service, options=options)
-                except Exception as e:
-                    logger.warning(f"Erro ao inicializar Chrome padrão: {str(e)}")
-                    from webdriver_manager.chrome import ChromeDriverManager
-                    service = ChromeService(ChromeDriverManager().install())
-                    driver = webdriver.Chrome(service=service, options=options)
-                
-            else:  # Firefox como fallback ou opção preferida
-                options = FirefoxOptions()
-                if self.headless:
-                    options.add_argument("--headless")
-                options.add_argument("--width=1920")
-                options.add_argument("--height=1080")
-                
-                # Configurações para melhor renderização de vídeo
-                options.set_preference("media.autoplay.default", 0)
-                options.set_preference("media.autoplay.enabled", True)
-                
-                # Alta qualidade
-                options.set_preference("layout.css.devPixelsPerPx", "1.0")
-                
-                # Configurações adicionais para garantir carregamento completo
-                options.set_preference("network.http.connection-timeout", 60)
-                options.set_preference("network.http.connection-retry-timeout", 60)
-                options.set_preference("dom.max_script_run_time", 60)
-                
-                # Preferir Firefox já instalado, caso contrário baixar automaticamente
+            return self.driver.service.process.pid
+        except AttributeError:
+            return None
+    
+    def _recycle_if_needed(self):
+        """
+        Reinicia o navegador se a política de reciclagem exigir.
+        
+        Chamado apenas entre páginas, antes de uma nova navegação, nunca no meio de uma captura.
+        Com abas, a reciclagem vale para o navegador compartilhado e é decidida pela
+        sessão, que o reinicia uma única vez quando nenhuma aba está no meio de uma página.
+        """
+        if self.tab_session:
+            reason = self.tab_session.begin_page(self.recycle_policy)
+            self._tab_page_open = True
+            if reason:
+                self.browser_restarts += 1
+                METRICS.inc("printtopdf_browser_restarts_total")
+            if self.driver is None or self.driver.stale:
+                self.driver = self._init_browser()
+                self.pages_since_restart = 0
+            return
+        
+        if not self.recycle_policy:
+            return
+        
+        reason = self.recycle_policy.should_recycle(self.pages_since_restart, self._driver_pid())
+        if reason:
+            self.restart_browser(reason)
+    
+    def _apply_network_filter(self, driver: webdriver.Remote):
+        """
+        Aplica a lista de bloqueio na camada de rede do Chrome (DevTools).
+        
+        No Firefox o bloqueio é configurado via PAC na inicialização do navegador.
+        
+        Args:
+            driver: WebDriver em que o bloqueio deve ser aplicado
+        """
+        if not self.blocked_patterns or self.browser_type.lower() != "chrome":
+            return
+        
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked_patterns})
+        except Exception as e:
+            logger.warning(f"Erro ao aplicar bloqueio de requisições: {str(e)}")
+    
+    def _count_blocked_requests(self) -> int:
+        """
+        Conta as requisições bloqueadas desde a última contagem.
+        
+        No Chrome, lê os eventos Network.loadingFailed do log de desempenho (o que
+        também esvazia o log). No Firefox, conta as entradas de recursos da página
+        que correspondem à lista de bloqueio.
+        
+        Returns:
+            Número de requisições bloqueadas
+        """
+        if not self.blocked_patterns:
+            return 0
+        
+        if self.browser_type.lower() == "chrome":
+            blocked = 0
+            for entry in self.driver.get_log("performance"):
                 try:
-                    service = FirefoxService()
-                    driver = webdriver.Firefox(service=service, options=options)
-                except Exception as e:
-                    logger.warning(f"Erro ao inicializar Firefox padrão: {str(e)}")
-                    from webdriver_manager.firefox import GeckoDriverManager
-                    service = FirefoxService(GeckoDriverManager().install())
-                    driver = webdriver.Firefox(service=service, options=options)
-                
-            # Configurar timeouts 
-            driver.set_page_load_timeout(self.page_load_timeout)
-            driver.implicitly_wait(15)
-            
-            return driver
+                    message = json.loads(entry["message"])["message"]
+                except (KeyError, ValueError):
+                    continue
+                if message.get("method") == "Network.loadingFailed" and message.get("params", {}).get("blockedReason"):
+                    blocked += 1
+            return blocked
         
+        entries = self.driver.execute_script(NETWORK_ENTRIES_SCRIPT) or []
+        return sum(1 for name, _ in entries if url_matches(name, self.blocked_patterns))
+    
+    def _collect_network_stats(self) -> Dict[str, int]:
+        """
+        Coleta as estatísticas de rede da página atual.
+        
+        Returns:
+            Dicionário com 'blocked_requests' e 'transferred_bytes'
+        """
+        stats = {"blocked_requests": 0, "transferred_bytes": 0}
+        try:
+            entries = self.driver.execute_script(NETWORK_ENTRIES_SCRIPT) or []
+            stats["transferred_bytes"] = sum(int(size) for _, size in entries)
+            stats["blocked_requests"] = self._count_blocked_requests()
         except Exception as e:
-            logger.error(f"Erro ao inicializar o navegador: {str(e)}")
-            raise
-
+            logger.warning(f"Erro ao coletar estatísticas de rede: {str(e)}")
+        
+        self.last_network_stats = stats
+        return stats
+    
     def _is_resource_url(self, url: str) -> bool:
         """
         Verifica se a URL é um recurso estático (imagem, CSS, JS, etc.) que não deve ser capturado.
@@ -182,187 +626,73 @@ class WebCrawler:
         logger.warning("Método discover_pages() não é usado com sitemaps.")
         return []
     
-    def _get_page_dimensions(self) -> Tuple[int, int]:
+    def _probe_page(self) -> PageSnapshot:
+        """
+        Coleta o estado da página (dimensões, mídias, carregadores, jQuery e altura
+        de scroll) em uma única chamada ao WebDriver.
+        
+        Returns:
+            Snapshot com o estado atual da página
+        """
+        self.last_snapshot = probe_page(self.driver, self.loader_selectors)
+        return self.last_snapshot
+    
+    def _get_page_dimensions(self, snapshot: Optional[PageSnapshot] = None) -> Tuple[int, int]:
         """
         Obtém as dimensões completas da página, incluindo conteúdo que requer rolagem.
         
+        Args:
+            snapshot: Snapshot já coletado; se omitido, a página é sondada novamente
+        
         Returns:
             Tupla com (largura, altura) em pixels
         """
-        total_height = self.driver.execute_script("""
-            return Math.max(
-                document.body.scrollHeight, 
-                document.body.offsetHeight, 
-                document.documentElement.clientHeight, 
-                document.documentElement.scrollHeight, 
-                document.documentElement.offsetHeight
-            );
-        """)
-        
-        total_width = self.driver.execute_script("""
-            return Math.max(
-                document.body.scrollWidth, 
-                document.body.offsetWidth, 
-                document.documentElement.clientWidth, 
-                document.documentElement.scrollWidth, 
-                document.documentElement.offsetWidth
-            );
-        """)
-        
-        return (total_width, total_height)
-    
-    def _has_media_elements(self) -> bool:
+        if snapshot is None:
+            snapshot = self._probe_page()
+        
+        return (snapshot.width, snapshot.height)
+    
+    def _has_media_elements(self, snapshot: Optional[PageSnapshot] = None) -> bool:
         """
         Verifica se a página contém elementos de mídia como vídeos ou GIFs.
         
+        Args:
+            snapshot: Snapshot já coletado; se omitido, a página é sondada novamente
+        
         Returns:
             True se encontrar elementos de mídia, False caso contrário
         """
         try:
-            has_videos = self.driver.execute_script("""
-                return document.querySelectorAll('video, iframe[src*="youtube"], iframe[src*="vimeo"]').length > 0;
-            """)
-            
-            has_gifs = self.driver.execute_script("""
-                var images = document.getElementsByTagName('img');
-                for (var i = 0; i < images.length; i++) {
-                    if (images[i].src.toLowerCase().endsWith('.gif')) {
-                        return true;
-                    }
-                }
-                return false;
-            """)
-            
-            has_animations = self.driver.execute_script("""
-                var elements = document.querySelectorAll('[class*="animate"], [class*="slider"], [class*="carousel"], [class*="banner"]');
-                return elements.length > 0;
-            """)
+            if snapshot is None:
+                snapshot = self._probe_page()
             
-            return has_videos or has_gifs or has_animations
+            return snapshot.has_media
             
         except Exception as e:
             logger.warning(f"Erro ao verificar elementos de mídia: {str(e)}")
             return False
     
-    def _wait_for_page_load_completion(self):
+    def _wait_for_page_load_completion(self, timeout: float = 60):
         """
         Aguarda até que a página esteja completamente carregada,
         com checagens adicionais para garantir que todos os recursos estão carregados.
-        """
-        try:
-            WebDriverWait(self.driver, 60).until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
-            )
-        except TimeoutException:
-            logger.warning("Timeout aguardando document.readyState='complete'")
         
-        try:
-            self.driver.execute_script("""
-                return new Promise((resolve) => {
-                    var images = document.getElementsByTagName('img');
-                    var loaded = 0;
-                    var total = images.length;
-                    if (total === 0) {
-                        resolve(true);
-                        return;
-                    }
-                    function checkImage(img) {
-                        if (img.complete) {
-                            loaded++;
-                            if (loaded >= total) {
-                                resolve(true);
-                            }
-                        } else {
-                            img.addEventListener('load', function() {
-                                loaded++;
-                                if (loaded >= total) {
-                                    resolve(true);
-                                }
-                            });
-                            
-                            img.addEventListener('error', function() {
-                                loaded++;
-                                if (loaded >= total) {
-                                    resolve(true);
-                                }
-                            });
-                        }
-                    }
-                    for (var i = 0; i < images.length; i++) {
-                        checkImage(images[i]);
-                    }
-                    setTimeout(function() {
-                        resolve(true);
-                    }, 30000);
-                });
-            """)
-        except Exception as e:
-            logger.warning(f"Erro ao aguardar carregamento de imagens: {str(e)}")
+        Combina document.readyState, rede ociosa, ausência de mutações no DOM,
+        document.fonts.ready, decodificação de imagens, altura estável e
+        requisições jQuery pendentes, retornando assim que todos estabilizam.
+        Em seguida aguarda, de forma assíncrona, o desaparecimento dos
+        indicadores de carregamento configurados.
         
-        try:
-            self.driver.execute_script("""
-                var checkLoading = function() {
-                    var loaders = document.querySelectorAll(
-                        '.loading, .loader, [class*="loading"], [class*="loader"], [class*="progress"], .spinner'
-                    );
-                    
-                    for(var i = 0; i < loaders.length; i++) {
-                        var display = window.getComputedStyle(loaders[i]).display;
-                        var visibility = window.getComputedStyle(loaders[i]).visibility;
-                        var opacity = window.getComputedStyle(loaders[i]).opacity;
-                        
-                        if(display !== 'none' && visibility !== 'hidden' && opacity !== '0') {
-                            return false;
-                        }
-                    }
-                    return true;
-                };
-                
-                var startTime = new Date().getTime();
-                while(!checkLoading()) {
-                    if(new Date().getTime() - startTime > 15000) {
-                        break;
-                    }
-                    new Promise(r => setTimeout(r, 500));
-                }
-            """)
-        except Exception as e:
-            logger.warning(f"Erro ao verificar elementos de carregamento: {str(e)}")
-            
-        try:
-            previous_height = -1
-            current_height = self.driver.execute_script("return document.body.scrollHeight")
-            start_time = time.time()
-            while previous_height != current_height and time.time() - start_time < 10:
-                previous_height = current_height
-                time.sleep(1)
-                current_height = self.driver.execute_script("return document.body.scrollHeight")
-            logger.debug(f"Altura da página estabilizada em {current_height}px")
-        except Exception as e:
-            logger.warning(f"Erro ao verificar estabilidade da altura da página: {str(e)}")
-            
-        try:
-            self.driver.execute_script("""
-                return new Promise((resolve) => {
-                    if (typeof jQuery !== 'undefined') {
-                        function checkAjax() {
-                            if (jQuery.active === 0) {
-                                resolve(true);
-                                return;
-                            }
-                            setTimeout(checkAjax, 500);
-                        }
-                        checkAjax();
-                    } else {
-                        resolve(true);
-                    }
-                    setTimeout(function() {
-                        resolve(true);
-                    }, 10000);
-                });
-            """)
-        except Exception as e:
-            logger.warning(f"Erro ao verificar requisições AJAX: {str(e)}")
+        Args:
+            timeout: Tempo máximo de espera em segundos
+        """
+        self.readiness.wait(self.driver, timeout=timeout)
+        
+        self.readiness.wait_for_loaders(
+            self.driver,
+            self.loader_selectors,
+            timeout=self.loader_timeout
+        )
     
     def _pause_videos_and_animations(self):
         """
@@ -385,6 +715,10 @@ class WebCrawler:
                 for(var i = 0; i < iframes.length; i++) {
                     try {
                         var iframe = iframes[i];
+                        if(iframe.hasAttribute('data-print-to-pdf-paused')) {
+                            continue;
+                        }
+                        iframe.setAttribute('data-print-to-pdf-paused', '');
                         var src = iframe.getAttribute('src');
                         if(src.indexOf('youtube') > -1) {
                             if(src.indexOf('?') > -1) {
@@ -410,10 +744,13 @@ class WebCrawler:
                 }
                 
                 // Injetar estilo para pausar animações CSS
-                var styleSheet = document.createElement('style');
-                styleSheet.type = 'text/css';
-                styleSheet.innerText = '* { animation-play-state: paused !important; -webkit-animation-play-state: paused !important; transition: none !important; }';
-                document.head.appendChild(styleSheet);
+                if(!document.getElementById('print-to-pdf-pause')) {
+                    var styleSheet = document.createElement('style');
+                    styleSheet.id = 'print-to-pdf-pause';
+                    styleSheet.type = 'text/css';
+                    styleSheet.innerText = '* { animation-play-state: paused !important; -webkit-animation-play-state: paused !important; transition: none !important; }';
+                    document.head.appendChild(styleSheet);
+                }
                 
                 // Remover pop-ups, banners, etc.
                 var elementsToRemove = document.querySelectorAll(
@@ -437,6 +774,8 @@ class WebCrawler:
                         var currentTop = rect.top + window.scrollY;
                         var currentLeft = rect.left + window.scrollX;
                         
+                        // Guardar o estilo original para restaurá-lo em outro viewport
+                        element.setAttribute('data-print-to-pdf-style', element.getAttribute('style') || '');
                         element.style.position = 'absolute';
                         element.style.top = currentTop + 'px';
                         element.style.left = currentLeft + 'px';
@@ -449,28 +788,293 @@ class WebCrawler:
         except JavascriptException as e:
             logger.warning(f"Erro ao tentar pausar vídeos ou ajustar elementos fixos: {str(e)}")
     
-    def _scroll_page_and_wait(self, wait_after_scroll=60):
+    def _scroll_page_and_wait(self, wait_after_scroll: float = 60):
         """
-        Rola a página até o final e aguarda um período extra para garantir que todos
-        os elementos sejam carregados.
+        Percorre a página em passos do tamanho da viewport para disparar o conteúdo
+        tardio (lazy loading) e aguarda até que ele carregue e a página estabilize.
         
         Args:
-            wait_after_scroll: Tempo de espera em segundos após o scroll (padrão 60s)
+            wait_after_scroll: Orçamento total em segundos (padrão 60s); a espera termina
+                assim que as imagens e iframes pendentes carregam
         """
+        start_time = time.time()
         try:
-            last_height = self.driver.execute_script("return document.body.scrollHeight")
-            while True:
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
-                new_height = self.driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    break
-                last_height = new_height
-            time.sleep(wait_after_scroll)
+            self.readiness.load_lazy_content(self.driver, budget=wait_after_scroll, max_steps=LAZY_LOAD_MAX_STEPS)
+            remaining = wait_after_scroll - (time.time() - start_time)
+            self.readiness.wait(self.driver, timeout=max(0, min(remaining, 10)))
         except Exception as e:
             logger.warning(f"Erro ao realizar scroll e espera: {str(e)}")
     
-    def capture_screenshot(self, url: str) -> Image.Image:
+    def _load_page(self, url: str, viewport: Optional[ViewportProfile] = None):
+        """
+        Navega até a URL, aguarda o carregamento inicial e calcula o hash do conteúdo.
+        
+        Args:
+            url: URL da página
+            viewport: Viewport aplicado antes da navegação (None = manter o atual)
+        """
+        if viewport:
+            self._apply_viewport(viewport)
+        
+        # Descartar eventos de rede da página anterior e reaplicar o bloqueio
+        self.last_network_stats = {"blocked_requests": 0, "transferred_bytes": 0}
+        if self.blocked_patterns and self.browser_type.lower() == "chrome":
+            try:
+                self.driver.get_log("performance")
+            except Exception:
+                pass
+            self._apply_network_filter(self.driver)
+        
+        parsed_url = urlparse(url)
+        self._visited_origins.add(f"{parsed_url.scheme}://{parsed_url.netloc}")
+        
+        with self.last_timings.stage("navigation"):
+            self.driver.get(url)
+        
+        # Páginas de erro do servidor não devem virar PDF
+        status = self._navigation_status()
+        if status and status >= 400:
+            raise CaptureError(FAILURE_HTTP_ERROR, f"HTTP {status} ao carregar {url}")
+        
+        # Aguarda carregamento inicial (wait_time é apenas o limite superior)
+        with self.last_timings.stage("readiness"):
+            self._wait_for_page_load_completion(timeout=self.wait_time)
+        
+        # Hash do conteúdo normalizado, calculado antes do scroll e da captura
+        try:
+            with self.last_timings.stage("fingerprint"):
+                self.last_content_hash = content_fingerprint(self.driver)
+        except Exception as e:
+            logger.warning(f"Erro ao calcular o hash do conteúdo: {str(e)}")
+            self.last_content_hash = None
+    
+    def _navigation_status(self) -> Optional[int]:
+        """
+        Obtém o status HTTP do documento carregado (Navigation Timing).
+        
+        Returns:
+            Status HTTP, ou None se o navegador não o expõe
+        """
+        try:
+            status = self.driver.execute_script(NAVIGATION_STATUS_SCRIPT)
+            return int(status) if status else None
+        except Exception:
+            return None
+    
+    def _prepare_loaded_page(self):
+        """
+        Prepara a página já carregada para captura: rola a página para carregar
+        conteúdo tardio e pausa vídeos e animações.
+        """
+        # Páginas com vídeos/GIFs/animações recebem tempo extra (também como limite superior)
+        with self.last_timings.stage("readiness"):
+            if self._has_media_elements(self._probe_page()):
+                logger.info("Elementos de mídia detectados, aguardando estabilização adicional")
+                self.readiness.wait(self.driver, timeout=self.extra_wait_for_media)
+        
+        # Percorre a página carregando o conteúdo tardio (orçamento máximo lazy_load_budget)
+        with self.last_timings.stage("scroll"):
+            self._scroll_page_and_wait(wait_after_scroll=self.lazy_load_budget)
+        
+        # Pausa vídeos, animações e ajusta elementos fixos
+        logger.info("Pausando vídeos, animações e ajustando elementos fixos")
+        with self.last_timings.stage("pause"):
+            self._pause_videos_and_animations()
+        
+        with self.last_timings.stage("readiness"):
+            self.readiness.wait(self.driver, timeout=2)
+        
+        self._collect_network_stats()
+    
+    def _load_and_prepare_page(self, url: str):
+        """
+        Navega até a URL e prepara a página para captura.
+        
+        Args:
+            url: URL da página
+        """
+        self._load_page(url)
+        self._prepare_loaded_page()
+    
+    def _find_duplicate(self, url: str) -> Optional["DuplicatePage"]:
+        """
+        Verifica se o conteúdo da página carregada já foi capturado em outra URL.
+        
+        Args:
+            url: URL da página carregada
+            
+        Returns:
+            DuplicatePage com o PDF existente, ou None se o conteúdo é inédito
+        """
+        if not self.last_content_hash:
+            return None
+        
+        original_pdf = self.content_hashes.get(self.last_content_hash)
+        if not original_pdf or not os.path.exists(original_pdf):
+            return None
+        
+        logger.info(f"Conteúdo de {url} já capturado em {original_pdf}, reaproveitando o PDF")
+        return DuplicatePage(url=url, content_hash=self.last_content_hash, original_pdf=original_pdf)
+    
+    def register_content(self, pdf_path: str):
+        """
+        Registra o PDF gerado para o conteúdo da última página carregada.
+        
+        Se o PDF foi regravado (página alterada recapturada no mesmo caminho), o
+        hash do conteúdo anterior deixa de apontar para ele.
+        
+        Args:
+            pdf_path: Caminho do PDF gerado
+        """
+        for content_hash, existing_pdf in list(self.content_hashes.items()):
+            if existing_pdf == pdf_path and content_hash != self.last_content_hash:
+                self.content_hashes.pop(content_hash, None)
+        if self.last_content_hash:
+            self.content_hashes.setdefault(self.last_content_hash, pdf_path)
+    
+    def _capture_current_page(self) -> Union[Image.Image, StitchedImage]:
+        """
+        Captura a página completa atualmente carregada e preparada.
+        
+        Returns:
+            Objeto PIL Image com o screenshot, ou StitchedImage para páginas muito longas
+        """
+        if self.browser_type.lower() == "firefox":
+            try:
+                logger.info("Usando captura nativa do Firefox para página completa")
+                screenshot_bytes = self.driver.get_full_page_screenshot_as_png()
+                image = self._decode_png(screenshot_bytes)
+                logger.info(f"Screenshot capturado com dimensões: {image.size}")
+                return image
+            except Exception as e:
+                logger.warning(f"Erro ao usar captura nativa do Firefox: {str(e)}")
+        
+        total_width, total_height = self._get_page_dimensions()
+        logger.info(f"Dimensões da página: {total_width}x{total_height}px")
+        
+        if self.browser_type.lower() == "chrome":
+            try:
+                logger.info("Usando captura via DevTools do Chrome para página completa")
+                image = self._capture_full_page_with_cdp(total_width, total_height)
+                logger.info(f"Screenshot capturado com dimensões: {image.size}")
+                return image
+            except Exception as e:
+                logger.warning(f"Erro ao usar captura via DevTools do Chrome: {str(e)}")
+        
+        view_height = min(total_height, 16000)
+        self.driver.set_window_size(total_width, view_height)
+        
+        self.readiness.wait(self.driver, timeout=2)
+        self.driver.execute_script("window.scrollTo(0, 0);")
+        self.readiness.wait(self.driver, timeout=1)
+        
+        if total_height > 15000 or (total_width > 1920 and total_height > 10000):
+            logger.info("Página muito longa, usando método de costura de screenshots")
+            return self._capture_full_screenshot_with_stitching(total_width, total_height)
+        
+        logger.info("Capturando screenshot completo")
+        screenshot_bytes = self.driver.get_screenshot_as_png()
+        image = self._decode_png(screenshot_bytes)
+        
+        img_width, img_height = image.size
+        logger.info(f"Dimensões do screenshot: {img_width}x{img_height}px")
+        
+        if img_height < total_height * 0.9:
+            logger.info("Captura simples insuficiente. Tentando método de costura.")
+            return self._capture_full_screenshot_with_stitching(total_width, total_height)
+        
+        return image
+    
+    def _decode_png(self, png_bytes: bytes) -> Image.Image:
+        """
+        Decodifica um PNG recebido do navegador, contabilizando o tempo e os bytes.
+        
+        Args:
+            png_bytes: Conteúdo do PNG
+            
+        Returns:
+            Imagem decodificada
+        """
+        self.last_timings.add("capture_bytes", len(png_bytes))
+        with self.last_timings.stage("png_decode"):
+            image = Image.open(BytesIO(png_bytes))
+            image.load()
+        return image
+    
+    def _print_current_page(self) -> bytes:
+        """
+        Gera um PDF vetorial da página atualmente carregada usando a impressão
+        nativa do navegador (Chrome print-to-PDF ou Firefox print_page).
+        
+        A largura da página do PDF acompanha a largura da página web; páginas
+        muito longas são divididas em páginas de até PRINT_MAX_PAGE_HEIGHT pixels.
+        
+        Returns:
+            Conteúdo do PDF em bytes
+        """
+        total_width, total_height = self._get_page_dimensions()
+        
+        if self.browser_type.lower() == "chrome":
+            # Usar os estilos de tela em vez da folha de estilo de impressão do site
+            self.driver.execute_cdp_cmd("Emulation.setEmulatedMedia", {"media": "screen"})
+        
+        # Converter pixels CSS (96 por polegada) para centímetros
+        options = PrintOptions()
+        options.background = True
+        options.shrink_to_fit = False
+        options.margin_top = 0
+        options.margin_bottom = 0
+        options.margin_left = 0
+        options.margin_right = 0
+        options.page_width = total_width * 2.54 / 96
+        options.page_height = min(total_height, PRINT_MAX_PAGE_HEIGHT) * 2.54 / 96
+        
+        logger.info(f"Imprimindo página em PDF vetorial ({total_width}x{total_height}px)")
+        pdf_bytes = base64.b64decode(self.driver.print_page(options))
+        
+        if not pdf_bytes.startswith(b'%PDF'):
+            raise ValueError("O navegador não devolveu um PDF válido")
+        
+        self.last_timings.add("capture_bytes", len(pdf_bytes))
+        return pdf_bytes
+    
+    def capture(
+        self,
+        url: str
+    ) -> Union[bytes, Image.Image, StitchedImage, Dict[str, Union[bytes, Image.Image, StitchedImage]], "DuplicatePage"]:
+        """
+        Captura a página no modo de renderização configurado.
+        
+        Logo após o carregamento, o hash do conteúdo é comparado com o das páginas
+        já capturadas; se coincidir, a página não é preparada nem capturada e o
+        PDF existente é indicado. No modo 'print' a página recebe a mesma
+        preparação da captura por screenshot e é impressa pelo navegador; se a
+        impressão falhar, a página já carregada é capturada como imagem.
+        
+        Com perfis de viewport configurados, a página é capturada em cada um
+        deles a partir do mesmo carregamento (ver _capture_profiles).
+        
+        Não há novas tentativas imediatas: falhas são classificadas e devolvidas
+        como CaptureError, para que a página seja reagendada sem bloquear as demais.
+        
+        Args:
+            url: URL da página para capturar
+            
+        Returns:
+            PDF em bytes (modo 'print'), imagem da página (modo 'screenshot' ou
+            fallback), dicionário {perfil: PDF ou imagem} com perfis de viewport,
+            ou DuplicatePage se o conteúdo já foi capturado
+            
+        Raises:
+            CaptureError: Se a captura falhar
+        """
+        self.last_timings = PageTimings()
+        if self._is_resource_url(url):
+            return self.capture_screenshot(url)
+        
+        return self._capture_classified(url, self.render_mode, profiles=bool(self.viewport_profiles))
+    
+    def capture_screenshot(self, url: str) -> Union[Image.Image, StitchedImage, "DuplicatePage"]:
         """
         Captura um screenshot da página completa, incluindo todo o conteúdo que requer rolagem.
         Aguarda carregamento completo e trata elementos de mídia.
@@ -479,108 +1083,369 @@ class WebCrawler:
             url: URL da página para capturar
             
         Returns:
-            Objeto PIL Image com o screenshot
+            Objeto PIL Image com o screenshot, ou StitchedImage (faixas em disco)
+            para páginas muito longas. Ambos devem ser fechados com close() após o uso.
+            
+        Raises:
+            CaptureError: Se a captura falhar
         """
+        self.last_timings = PageTimings()
         if self._is_resource_url(url):
             logger.info(f"Ignorando captura de recurso estático: {url}")
             return Image.new('RGB', (1, 1), color='white')
+        
+        return self._capture_classified(url, "screenshot")
+    
+    def _capture_classified(self, url: str, render_mode: str, profiles: bool = False):
+        """
+        Executa a captura sob o prazo por página e converte as exceções em
+        CaptureError com a classe da falha.
+        
+        Args:
+            url: URL da página para capturar
+            render_mode: 'screenshot' ou 'print'
+            profiles: Se a página deve ser capturada em cada perfil de viewport
             
-        try:
-            logger.info(f"Iniciando captura de screenshot de {url}")
-            self.driver.get(url)
-            
-            # Aguarda carregamento inicial
-            time.sleep(self.wait_time)
-            
-            # Executa o scroll completo e aguarda 60 segundos após o scroll
-            self._scroll_page_and_wait(wait_after_scroll=60)
-            
-            # Pausa vídeos, animações e ajusta elementos fixos
-            logger.info("Pausando vídeos, animações e ajustando elementos fixos")
-            self._pause_videos_and_animations()
+        Returns:
+            Resultado de _capture_page (ou de _capture_profiles)
             
-            time.sleep(2)
+        Raises:
+            CaptureError: Se a captura falhar
+        """
+        watchdog = self.watchdog
+        if watchdog:
+            watchdog.expired = False
+        try:
+            # Reciclar o navegador entre páginas, se necessário (nunca no meio de uma página),
+            # antes de armar o prazo, para que ele monitore o navegador que fará a captura
+            with self.last_timings.stage("browser_restart"):
+                self._recycle_if_needed()
+            self.pages_since_restart += 1
             
-            if self.browser_type.lower() == "firefox":
+            capture_page = self._capture_profiles if profiles else self._capture_page
+            if watchdog:
+                # Com abas, o prazo vencido fecha apenas a aba, e não o navegador compartilhado
+                guard = (
+                    watchdog.guard(None, on_expire=self.driver.abandon) if self.tab_session
+                    else watchdog.guard(self._driver_pid())
+                )
+                with guard:
+                    result = capture_page(url, render_mode)
+            else:
+                result = capture_page(url, render_mode)
+            self.last_timings.add("transferred_bytes", self.last_network_stats.get("transferred_bytes", 0))
+            return result
+        except Exception as e:
+            if watchdog and watchdog.expired:
+                raise CaptureError(
+                    FAILURE_DEADLINE, f"Prazo de {watchdog.deadline:.0f}s excedido em {url}: {str(e)}"
+                ) from e
+            if isinstance(e, CaptureError):
+                raise
+            raise self._classify_error(url, e) from e
+        finally:
+            # O navegador foi encerrado pelo watchdog: iniciar um novo para a próxima página
+            # (com abas, apenas a aba foi fechada e uma nova é aberta na próxima página)
+            if watchdog and watchdog.expired and self.tab_session:
+                self._quit_driver()
+            elif watchdog and watchdog.expired:
                 try:
-                    logger.info("Usando captura nativa do Firefox para página completa")
-                    screenshot_bytes = self.driver.get_full_page_screenshot_as_png()
-                    image = Image.open(BytesIO(screenshot_bytes))
-                    logger.info(f"Screenshot capturado com dimensões: {image.size}")
-                    return image
-                except Exception as e:
-                    logger.warning(f"Erro ao usar captura nativa do Firefox: {str(e)}")
+                    self.restart_browser("prazo da página excedido")
+                except Exception as restart_error:
+                    logger.error(f"Erro ao reiniciar o navegador: {str(restart_error)}")
             
-            total_width, total_height = self._get_page_dimensions()
-            logger.info(f"Dimensões da página: {total_width}x{total_height}px")
-            
-            view_height = min(total_height, 16000)
-            self.driver.set_window_size(total_width, view_height)
+            # Página encerrada: a sessão de abas pode reciclar o navegador compartilhado
+            if self._tab_page_open:
+                self._tab_page_open = False
+                self.tab_session.end_page()
+    
+    def _classify_error(self, url: str, error: Exception) -> CaptureError:
+        """
+        Converte uma exceção da captura em CaptureError com a classe da falha.
+        
+        Args:
+            url: URL da página
+            error: Exceção ocorrida
             
-            time.sleep(2)
-            self.driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(1)
+        Returns:
+            Falha classificada
+        """
+        if isinstance(error, TimeoutException):
+            return CaptureError(FAILURE_TIMEOUT, f"Timeout ao carregar {url}: {str(error)}")
+        
+        if isinstance(error, WebDriverException):
+            # Sessão possivelmente corrompida: a próxima página recebe um navegador novo
+            try:
+                self.restart_browser("erro do WebDriver")
+            except Exception as restart_error:
+                logger.error(f"Erro ao reiniciar o navegador: {str(restart_error)}")
+            return CaptureError(FAILURE_DRIVER_CRASH, f"Erro do WebDriver em {url}: {str(error)}")
+        
+        return CaptureError(FAILURE_OTHER, f"Erro ao capturar {url}: {str(error)}")
+    
+    def _capture_page(self, url: str, render_mode: str) -> Union[bytes, Image.Image, StitchedImage, "DuplicatePage"]:
+        """
+        Carrega, prepara e captura uma página.
+        
+        Args:
+            url: URL da página para capturar
+            render_mode: 'screenshot' ou 'print'
             
-            if total_height > 15000 or (total_width > 1920 and total_height > 10000):
-                logger.info("Página muito longa, usando método de costura de screenshots")
-                return self._capture_full_screenshot_with_stitching(total_width, total_height)
+        Returns:
+            PDF em bytes, imagem da página ou DuplicatePage
+        """
+        logger.info(f"Iniciando captura de {url}")
+        self.last_content_hash = None
+        self._load_page(url)
+        
+        duplicate = self._find_duplicate(url)
+        if duplicate:
+            return duplicate
+        
+        self._prepare_loaded_page()
+        
+        return self._render_current_page(url, render_mode)
+    
+    def _render_current_page(self, url: str, render_mode: str) -> Union[bytes, Image.Image, StitchedImage]:
+        """
+        Renderiza a página já preparada no modo indicado.
+        
+        Args:
+            url: URL da página carregada
+            render_mode: 'screenshot' ou 'print'
             
-            logger.info("Capturando screenshot completo")
-            screenshot_bytes = self.driver.get_screenshot_as_png()
-            image = Image.open(BytesIO(screenshot_bytes))
+        Returns:
+            PDF em bytes ou imagem da página
             
-            img_width, img_height = image.size
-            logger.info(f"Dimensões do screenshot: {img_width}x{img_height}px")
+        Raises:
+            CaptureError: Se a página foi renderizada em branco
+        """
+        with self.last_timings.stage("screenshot"):
+            if render_mode == "print":
+                try:
+                    return self._print_current_page()
+                except Exception as e:
+                    logger.warning(f"Falha na impressão nativa de {url}, usando captura por screenshot: {str(e)}")
             
-            if img_height < total_height * 0.9:
-                logger.info("Captura simples insuficiente. Tentando método de costura.")
-                return self._capture_full_screenshot_with_stitching(total_width, total_height)
+            image = self._capture_current_page()
+        
+        self.last_timings.record_max("image_width", image.size[0])
+        self.last_timings.record_max("image_height", image.size[1])
+        if is_blank_image(image):
+            image.close()
+            raise CaptureError(FAILURE_BLANK_RENDER, f"Página renderizada em branco: {url}")
+        return image
+    
+    def _capture_profiles(
+        self,
+        url: str,
+        render_mode: str
+    ) -> Union[Dict[str, Union[bytes, Image.Image, StitchedImage]], "DuplicatePage"]:
+        """
+        Captura a página em cada perfil de viewport a partir de um único carregamento.
+        
+        Após a navegação e a espera de prontidão do primeiro perfil, os demais são
+        obtidos redimensionando o viewport; a página só é recarregada quando
+        um breakpoint avaliado no carregamento muda de resultado ou quando a
+        emulação de dispositivo móvel é ligada ou desligada.
+        
+        Args:
+            url: URL da página para capturar
+            render_mode: 'screenshot' ou 'print'
             
-            return image
+        Returns:
+            Dicionário {nome do perfil: PDF em bytes ou imagem}, na ordem dos perfis,
+            ou DuplicatePage se o conteúdo já foi capturado
+        """
+        logger.info(f"Iniciando captura de {url} em {len(self.viewport_profiles)} viewports")
+        self.last_content_hash = None
+        captures: Dict[str, Union[bytes, Image.Image, StitchedImage]] = {}
+        network_stats = {"blocked_requests": 0, "transferred_bytes": 0}
+        document_stats = None
+        content_hash = None
+        previous = None
+        
+        try:
+            for profile in self.viewport_profiles:
+                reason = self._viewport_reload_reason(previous, profile) if previous else None
+                if previous is None or reason:
+                    if previous is not None:
+                        logger.info(f"Recarregando {url} para o viewport {profile.name} ({reason})")
+                        network_stats = self._add_network_stats(network_stats, document_stats)
+                    self._load_page(url, viewport=profile)
+                    
+                    if previous is None:
+                        content_hash = self.last_content_hash
+                        duplicate = self._find_duplicate(url)
+                        if duplicate:
+                            return duplicate
+                    
+                    self._prepare_loaded_page()
+                else:
+                    logger.info(f"Redimensionando {url} para o viewport {profile.name} ({profile.width}x{profile.height})")
+                    self.driver.execute_script(RESTORE_FIXED_ELEMENTS_SCRIPT)
+                    self._apply_viewport(profile)
+                    self._prepare_resized_page()
+                    if self.browser_type.lower() == "chrome":
+                        # No Chrome cada coleta conta só os bloqueios desde a anterior
+                        self.last_network_stats["blocked_requests"] += document_stats["blocked_requests"]
                 
-        except TimeoutException:
-            logger.warning(f"Timeout ao carregar {url}, tentando novamente com tempo maior")
-            self.driver.set_page_load_timeout(240)
-            self.driver.get(url)
-            time.sleep(self.wait_time * 2)
-            self._pause_videos_and_animations()
-            total_width, total_height = self._get_page_dimensions()
-            self.driver.set_window_size(total_width, min(total_height, 15000))
-            time.sleep(2)
-            screenshot_bytes = self.driver.get_screenshot_as_png()
-            self.driver.set_page_load_timeout(self.page_load_timeout)
-            image = Image.open(BytesIO(screenshot_bytes))
-            return image
-            
-        except WebDriverException as e:
-            logger.error(f"Erro do WebDriver ao capturar screenshot de {url}: {str(e)}")
-            logger.info("Reiniciando o WebDriver devido a erro")
-            self.close()
-            self.driver = self._init_browser()
-            self.driver.get(url)
-            time.sleep(self.wait_time * 2)
-            self._pause_videos_and_animations()
-            total_width, total_height = self._get_page_dimensions()
-            self.driver.set_window_size(total_width, min(total_height, 15000))
-            time.sleep(2)
-            screenshot_bytes = self.driver.get_screenshot_as_png()
-            image = Image.open(BytesIO(screenshot_bytes))
-            return image
+                document_stats = self.last_network_stats
+                captures[profile.name] = self._render_current_page(url, render_mode)
+                previous = profile
+        except Exception:
+            for capture in captures.values():
+                if not isinstance(capture, bytes):
+                    capture.close()
+            raise
+        finally:
+            # O hash que identifica a página é o do primeiro carregamento
+            self.last_content_hash = content_hash
+        
+        self.last_network_stats = self._add_network_stats(network_stats, document_stats)
+        return captures
+    
+    def _viewport_reload_reason(self, previous: ViewportProfile, profile: ViewportProfile) -> Optional[str]:
+        """
+        Verifica se a troca de viewport exige recarregar a página.
+        
+        Args:
+            previous: Viewport atual
+            profile: Próximo viewport
             
+        Returns:
+            Motivo da recarga, ou None se basta redimensionar
+        """
+        if self.browser_type.lower() != "chrome":
+            # Sem o registro de media queries, o redimensionamento é sempre tentado
+            return None
+        
+        if previous.mobile != profile.mobile:
+            return "emulação de dispositivo móvel"
+        
+        try:
+            queries = self.driver.execute_script(LOAD_TIME_QUERIES_SCRIPT) or []
         except Exception as e:
-            logger.error(f"Erro ao capturar screenshot de {url}: {str(e)}")
-            return Image.new('RGB', (1920, 1080), color='white')
+            logger.warning(f"Erro ao ler as media queries da página: {str(e)}")
+            return None
+        
+        query = breakpoint_crossed(queries, previous, profile)
+        return f"breakpoint {query}" if query else None
+    
+    def _apply_viewport(self, profile: ViewportProfile):
+        """
+        Ajusta o viewport do navegador ao perfil.
+        
+        No Chrome o tamanho e a emulação de dispositivo móvel são aplicados via
+        DevTools; no Firefox a janela é redimensionada.
+        
+        Args:
+            profile: Perfil de viewport
+        """
+        if self.browser_type.lower() == "chrome":
+            self.driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+                "width": profile.width,
+                "height": profile.height,
+                "deviceScaleFactor": 1,
+                "mobile": profile.mobile
+            })
+            self.driver.execute_cdp_cmd("Emulation.setTouchEmulationEnabled", {"enabled": profile.mobile})
+        else:
+            self.driver.set_window_size(profile.width, profile.height)
+    
+    def _prepare_resized_page(self):
+        """
+        Prepara para captura a página redimensionada para outro viewport: aguarda
+        o novo layout, carrega o conteúdo tardio revelado por ele e pausa as mídias.
+        """
+        with self.last_timings.stage("readiness"):
+            self.readiness.wait(self.driver, timeout=min(self.wait_time, 10))
+        with self.last_timings.stage("scroll"):
+            self._scroll_page_and_wait(wait_after_scroll=self.lazy_load_budget)
+        with self.last_timings.stage("pause"):
+            self._pause_videos_and_animations()
+        with self.last_timings.stage("readiness"):
+            self.readiness.wait(self.driver, timeout=2)
+        self._collect_network_stats()
+    
+    def _add_network_stats(self, totals: Dict[str, int], stats: Optional[Dict[str, int]]) -> Dict[str, int]:
+        """
+        Soma as estatísticas de rede de um documento às de documentos anteriores.
+        
+        Args:
+            totals: Estatísticas acumuladas
+            stats: Estatísticas do documento (None = nenhuma)
+            
+        Returns:
+            Estatísticas acumuladas atualizadas
+        """
+        if not stats:
+            return totals
+        return {key: totals.get(key, 0) + value for key, value in stats.items()}
     
-    def _capture_full_screenshot_with_stitching(self, total_width: int, total_height: int) -> Image.Image:
+    def _capture_full_page_with_cdp(self, total_width: int, total_height: int) -> Union[Image.Image, StitchedImage]:
+        """
+        Captura a página completa no Chrome via DevTools (Page.captureScreenshot com
+        captureBeyondViewport), sem redimensionar a janela nem rolar a página.
+        
+        Páginas mais altas que o limite de textura da GPU são capturadas em faixas
+        delimitadas por retângulos de recorte (clip) e gravadas em disco.
+        
+        Args:
+            total_width: Largura total da página
+            total_height: Altura total da página
+            
+        Returns:
+            Imagem completa da página (StitchedImage se capturada em faixas)
+        """
+        def capture_clip(y: int, height: int) -> Image.Image:
+            result = self.driver.execute_cdp_cmd("Page.captureScreenshot", {
+                "format": "png",
+                "captureBeyondViewport": True,
+                "fromSurface": True,
+                "clip": {
+                    "x": 0,
+                    "y": y,
+                    "width": total_width,
+                    "height": height,
+                    "scale": 1
+                }
+            })
+            return self._decode_png(base64.b64decode(result["data"]))
+        
+        if total_height <= CDP_MAX_TILE_HEIGHT:
+            return capture_clip(0, total_height)
+        
+        stitcher = BandStitcher(total_width, total_height)
+        try:
+            offset = 0
+            while offset < total_height:
+                tile_height = min(CDP_BAND_HEIGHT, total_height - offset)
+                tile = capture_clip(offset, tile_height)
+                stitcher.add(tile, offset)
+                tile.close()
+                logger.debug(f"Faixa capturada via DevTools em y={offset}px ({tile_height}px)")
+                offset += tile_height
+        except Exception:
+            stitcher.abort()
+            raise
+        
+        logger.info(f"Página capturada via DevTools em {len(stitcher.bands)} faixas")
+        return stitcher.finish()
+    
+    def _capture_full_screenshot_with_stitching(self, total_width: int, total_height: int) -> StitchedImage:
         """
         Captura uma página completa usando o método de tirar múltiplos screenshots e costurá-los.
         
+        Cada trecho novo é gravado em disco como uma faixa, de modo que o uso de
+        memória fica limitado a poucos viewports, independente da altura da página.
+        
         Args:
             total_width: Largura total da página
             total_height: Altura total da página
             
         Returns:
-            Imagem completa da página
+            Imagem completa da página, em faixas gravadas em disco
         """
         logger.info(f"Iniciando captura com costura para página de dimensões {total_width}x{total_height}px")
         
@@ -590,42 +1455,106 @@ class WebCrawler:
         self.driver.set_window_size(viewport_width, viewport_height)
         time.sleep(2)
         
-        full_screenshot = Image.new('RGB', (total_width, total_height))
+        stitcher = BandStitcher(total_width, total_height)
         
         offset = 0
         last_scrolled_pos = -1
         overlap = 300
         
-        while offset < total_height:
-            self.driver.execute_script(f"window.scrollTo(0, {offset});")
-            time.sleep(1)
-            
-            current_scroll_position = self.driver.execute_script("return window.pageYOffset;")
-            
-            if current_scroll_position == last_scrolled_pos:
-                logger.info(f"Fim da página detectado em {current_scroll_position}px")
-                break
+        try:
+            while offset < total_height:
+                self.driver.execute_script(f"window.scrollTo(0, {offset});")
+                time.sleep(1)
                 
-            last_scrolled_pos = current_scroll_position
-            
-            screenshot_bytes = self.driver.get_screenshot_as_png()
-            screenshot = Image.open(BytesIO(screenshot_bytes))
+                current_scroll_position = self.driver.execute_script("return window.pageYOffset;")
+                
+                if current_scroll_position == last_scrolled_pos:
+                    logger.info(f"Fim da página detectado em {current_scroll_position}px")
+                    break
+                    
+                last_scrolled_pos = current_scroll_position
+                
+                screenshot_bytes = self.driver.get_screenshot_as_png()
+                screenshot = self._decode_png(screenshot_bytes)
+                
+                stitcher.add(screenshot, current_scroll_position)
+                screenshot.close()
+                logger.debug(f"Screenshot parcial gravado em y={current_scroll_position}px")
+                
+                offset += viewport_height - overlap
+                
+                if offset >= total_height:
+                    break
+        except Exception:
+            stitcher.abort()
+            raise
+        
+        logger.info("Captura com costura concluída")
+        return stitcher.finish()
+    
+    def _reset_browser_state(self) -> bool:
+        """
+        Limpa o estado do navegador (cookies, armazenamento, abas extras e tamanho
+        da janela) para que ele possa ser reutilizado em outro domínio.
+        
+        Returns:
+            True se o estado foi limpo, False se o navegador não deve ser reutilizado
+        """
+        try:
+            # Manter apenas a primeira aba
+            handles = self.driver.window_handles
+            for handle in handles[1:]:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            self.driver.switch_to.window(handles[0])
             
-            full_screenshot.paste(screenshot, (0, current_scroll_position))
-            logger.debug(f"Screenshot parcial colado em y={current_scroll_position}px")
+            # Armazenamento e cookies da origem atual
+            self.driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+            self.driver.delete_all_cookies()
             
-            offset += viewport_height - overlap
+            if self.browser_type.lower() == "chrome":
+                # Desfazer a emulação de viewport dos perfis
+                self.driver.execute_cdp_cmd("Emulation.clearDeviceMetricsOverride", {})
+                self.driver.execute_cdp_cmd("Emulation.setTouchEmulationEnabled", {"enabled": False})
+                
+                # No Chrome é possível limpar cookies de todos os domínios e o
+                # armazenamento de cada origem visitada
+                self.driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+                for origin in self._visited_origins:
+                    self.driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+                        "origin": origin,
+                        "storageTypes": "local_storage,session_storage,indexeddb,websql,service_workers,cache_storage"
+                    })
             
-            if offset >= total_height:
-                break
+            self.driver.set_window_size(1920, 1080)
+            self.driver.get("about:blank")
+            self._visited_origins.clear()
+            return True
         
-        logger.info("Captura com costura concluída")
-        return full_screenshot
+        except Exception as e:
+            logger.warning(f"Erro ao limpar o estado do navegador, ele não será reutilizado: {str(e)}")
+            return False
     
-    def close(self):
-        """Fecha o navegador."""
+    def _quit_driver(self):
+        """Encerra o navegador atual sem devolvê-lo ao gerenciador."""
         if self.driver:
             try:
                 self.driver.quit()
             except Exception as e:
                 logger.warning(f"Erro ao fechar o navegador: {str(e)}")
+            self.driver = None
+    
+    def close(self):
+        """Fecha o navegador (ou o devolve, com o estado limpo, ao gerenciador de navegadores)."""
+        if self.driver and self.browser_manager and not self.tab_session and not self.profile_path:
+            if self._reset_browser_state():
+                self.browser_manager.release(self.launch_key, self.driver)
+                self.driver = None
+                return
+        
+        self._quit_driver()
+        
+        # Devolver o perfil persistente só depois que o navegador o liberou
+        if self.profile_path:
+            self.profile_store.release(self.profile_path)
+            self.profile_path = None
@@ -3,6 +3,9 @@
 PrintToPDF: Ferramenta para capturar screenshots de páginas web de sitemaps XML e convertê-las em PDF.
 """
 
+import functools
+import itertools
+import multiprocessing
 import os
 import sys
 import logging
@@ -10,21 +13,1033 @@ import re
 from urllib.parse import urlparse
 from pathlib import Path
 import shutil
+import socket
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from types import SimpleNamespace
 
 import click
 from tqdm import tqdm
 
 # Importações locais (da mesma pasta)
-from crawler import WebCrawler
+from crawler import DuplicatePage, WebCrawler, create_driver, driver_launch_key
+from browser_manager import BrowserManager
+from browser_profile import ProfileStore
+from caching_proxy import CachingProxy, request_prefetch
+from capture_pool import CapturePool
+from capture_state import STATE_FILENAME, CaptureState
+from metrics import METRICS, MetricsServer
+from network_filter import BlockList
 from pdf_generator import PDFGenerator
+from preflight import PreflightChecker
+from recycle_policy import RecyclePolicy
+from retry_queue import FAILURE_OTHER, CaptureError, RetryPolicy, RetryQueue
+from run_manifest import RunManifest
+from run_report import RunReport
 from sitemap_parser import SitemapParser
+from stage_timings import STAGES, write_timings
+from tab_session import TabSession
 from utils import setup_logging, clean_domain_name
+from viewport_profiles import parse_viewport_profiles
+from work_queue import LeaseKeeper, WorkQueue
 
 # Configurar logging
 logger = logging.getLogger(__name__)
 
+# Intervalo entre consultas ao diretório da fila distribuída (segundos)
+QUEUE_POLL_INTERVAL = 5
+
+def _assign_pdf_paths(urls, pages_dir, domain, known_paths=None):
+    """
+    Define o caminho do PDF de cada página, preservando a ordem do sitemap.
+    
+    Args:
+        urls: Lista de URLs das páginas
+        pages_dir: Diretório onde os PDFs individuais são salvos
+        domain: Domínio das páginas
+        known_paths: Caminhos já usados pelas URLs em execuções anteriores (mantidos)
+        
+    Returns:
+        Lista de caminhos (Path) na mesma ordem das URLs
+    """
+    known_paths = known_paths or {}
+    pdf_paths = []
+    reserved = set(known_paths.values())
+    
+    for i, page_url in enumerate(urls):
+        if page_url in known_paths:
+            pdf_paths.append(known_paths[page_url])
+            continue
+        
+        # Nome do arquivo PDF para esta página
+        # Usar última parte da URL ou índice se não for específico
+        url_parts = page_url.rstrip('/').split('/')
+        page_name = url_parts[-1] if url_parts[-1] and url_parts[-1] != domain else f"page_{i+1}"
+        
+        # Limpar o nome de arquivo para ser seguro
+        page_name = re.sub(r'[^a-zA-Z0-9]', '_', page_name)
+        if not page_name or page_name == '_':
+            page_name = f"page_{i+1}"
+        
+        # Garantir nomes únicos para evitar sobrescrever
+        pdf_filename = f"{page_name}.pdf"
+        pdf_path = pages_dir / pdf_filename
+        
+        # Se já existe (ou já foi reservado) um arquivo com esse nome, adicionar número
+        counter = 1
+        while pdf_path.exists() or pdf_path in reserved:
+            pdf_filename = f"{page_name}_{counter}.pdf"
+            pdf_path = pages_dir / pdf_filename
+            counter += 1
+        
+        reserved.add(pdf_path)
+        pdf_paths.append(pdf_path)
+    
+    return pdf_paths
+
+def _write_capture(capture, pdf_path, pdf_generator, metric_kind="page"):
+    """
+    Grava o resultado de uma captura como PDF.
+    
+    Args:
+        capture: PDF em bytes (modo de impressão) ou imagem da página
+        pdf_path: Caminho do PDF a ser criado
+        pdf_generator: Gerador de PDF
+        metric_kind: Tipo do PDF na métrica de bytes gravados (None = arquivo temporário, não contado)
+    """
+    if isinstance(capture, bytes):
+        # Modo de impressão: o navegador já devolveu o PDF
+        with open(pdf_path, 'wb') as f:
+            f.write(capture)
+        if metric_kind:
+            METRICS.inc("printtopdf_pdf_bytes_written_total", len(capture), kind=metric_kind)
+        return
+    
+    # Converter screenshot para PDF e liberar a imagem (ou as faixas em disco)
+    try:
+        pdf_generator.image_to_pdf(capture, str(pdf_path), metric_kind=metric_kind)
+    finally:
+        capture.close()
+
+def _write_viewport_captures(captures, pdf_path, pdf_generator, viewport_output):
+    """
+    Grava as capturas de uma página em cada perfil de viewport.
+    
+    O PDF da página recebe uma página por perfil; no modo 'separate' o PDF de
+    cada perfil também é mantido em pages/<perfil>/.
+    
+    Args:
+        captures: Dicionário {nome do perfil: PDF em bytes ou imagem}
+        pdf_path: Caminho do PDF da página
+        pdf_generator: Gerador de PDF
+        viewport_output: 'combined' ou 'separate'
+    """
+    pdf_path = Path(pdf_path)
+    pending = list(captures.items())
+    profile_paths = []
+    
+    try:
+        while pending:
+            profile_name, capture = pending.pop(0)
+            if viewport_output == "separate":
+                profile_path = pdf_path.parent / profile_name / pdf_path.name
+                profile_path.parent.mkdir(exist_ok=True)
+            else:
+                profile_path = pdf_path.with_name(f".{pdf_path.stem}.{profile_name}.pdf")
+            profile_paths.append(str(profile_path))
+            # Os PDFs temporários de cada perfil não contam como bytes gravados
+            _write_capture(capture, profile_path, pdf_generator, metric_kind="page" if viewport_output == "separate" else None)
+        
+        pdf_generator.merge_pdfs(profile_paths, str(pdf_path), add_bookmarks=False, metric_kind="page")
+    finally:
+        # Liberar as capturas não gravadas (em caso de erro)
+        for _, capture in pending:
+            if not isinstance(capture, bytes):
+                capture.close()
+        if viewport_output != "separate":
+            for profile_path in profile_paths:
+                if os.path.exists(profile_path):
+                    os.remove(profile_path)
+
+def _capture_page(crawler, pdf_generator, run_report, run_manifest, capture_state, page_url, pdf_path, page_meta, viewport_output="combined"):
+    """
+    Captura uma página e salva o PDF correspondente.
+    
+    Args:
+        crawler: WebCrawler exclusivo do worker que executa a captura
+        pdf_generator: Gerador de PDF
+        run_report: Relatório da execução
+        run_manifest: Manifesto da execução
+        capture_state: Estado das capturas do domínio (None fora do modo incremental)
+        page_url: URL da página
+        pdf_path: Caminho do PDF a ser criado
+        page_meta: Sinais de modificação da página ('lastmod' e 'headers')
+        viewport_output: Com perfis de viewport, 'combined' (um PDF com uma página por
+            perfil) ou 'separate' (também um PDF por perfil)
+        
+    Returns:
+        Caminho do PDF criado
+        
+    Raises:
+        CaptureError: Se a página falhar (a classe da falha decide se haverá nova tentativa)
+    """
+    started = time.monotonic()
+    failure = CaptureError(FAILURE_OTHER, "PDF não foi criado")
+    METRICS.add("printtopdf_captures_in_flight", 1)
+    
+    try:
+        # Capturar a página (screenshot completo ou PDF vetorial, conforme o modo)
+        # Garante carregamento total da página antes de capturar
+        capture = crawler.capture(page_url)
+        run_report.record_network(crawler.domain, crawler.last_network_stats)
+        
+        if isinstance(capture, DuplicatePage):
+            # Conteúdo idêntico a uma página já capturada: reaproveitar o PDF existente
+            # (pode ser o próprio PDF da URL, quando só o lastmod mudou)
+            if os.path.abspath(capture.original_pdf) != os.path.abspath(pdf_path):
+                shutil.copyfile(capture.original_pdf, pdf_path)
+                crawler.register_content(str(pdf_path))
+                run_report.record_duplicate(crawler.domain, page_url, capture.original_pdf)
+            logger.info(f"PDF reaproveitado de {capture.original_pdf}: {pdf_path}")
+            if capture_state:
+                capture_state.record(page_url, str(pdf_path), capture.content_hash, **page_meta)
+            run_manifest.record_page(
+                crawler.domain, page_url, "duplicate", str(pdf_path), time.monotonic() - started
+            )
+            _finish_page(run_report, crawler, page_url, "duplicate")
+            return str(pdf_path)
+        
+        with crawler.last_timings.stage("pdf_encode"):
+            if isinstance(capture, dict):
+                # Perfis de viewport: uma captura por perfil
+                _write_viewport_captures(capture, pdf_path, pdf_generator, viewport_output)
+            else:
+                _write_capture(capture, pdf_path, pdf_generator)
+        
+        # Verificar se o PDF foi criado corretamente
+        if os.path.exists(pdf_path) and os.path.getsize(pdf_path) > 0:
+            logger.info(f"PDF criado com sucesso: {pdf_path}")
+            crawler.last_timings.add("pdf_bytes", os.path.getsize(pdf_path))
+            crawler.register_content(str(pdf_path))
+            if capture_state:
+                capture_state.record(page_url, str(pdf_path), crawler.last_content_hash, **page_meta)
+            run_manifest.record_page(
+                crawler.domain, page_url, "captured", str(pdf_path), time.monotonic() - started
+            )
+            _finish_page(run_report, crawler, page_url, "captured")
+            return str(pdf_path)
+        
+        logger.error(f"Falha ao criar PDF para {page_url}")
+        
+    except Exception as e:
+        failure = e if isinstance(e, CaptureError) else CaptureError(FAILURE_OTHER, str(e))
+        logger.error(f"Erro ao processar página {page_url} ({failure.kind}): {str(e)}")
+        click.echo(f"Erro ao processar página {page_url} ({failure.kind}): {str(e)}")
+    
+    run_manifest.record_page(
+        crawler.domain, page_url, "failed", duration=time.monotonic() - started,
+        error=str(failure), failure_kind=failure.kind
+    )
+    _finish_page(run_report, crawler, page_url, "failed", failure.kind)
+    raise failure
+
+def _finish_page(run_report, crawler, page_url, status, failure_kind=""):
+    """
+    Registra os tempos por etapa de uma página no relatório e nas métricas em tempo real.
+    
+    Args:
+        run_report: Relatório da execução
+        crawler: WebCrawler que capturou a página
+        page_url: URL da página
+        status: 'captured', 'duplicate' ou 'failed'
+        failure_kind: Classe da falha, em caso de falha
+    """
+    row = crawler.last_timings.to_row(crawler.domain, page_url, status, failure_kind)
+    run_report.record_timings(crawler.domain, row)
+    
+    METRICS.add("printtopdf_captures_in_flight", -1)
+    METRICS.inc("printtopdf_pages_total", status=status)
+    METRICS.set("printtopdf_last_page_timestamp_seconds", time.time())
+    # Etapas que não ocorreram na página (ex.: reinício do navegador) ficam fora dos histogramas
+    for stage in ("total",) + STAGES:
+        if stage == "total" or row[stage] > 0:
+            METRICS.observe("printtopdf_stage_seconds", row[stage], stage=stage)
+
+def _schedule_retry(retry_queue, run_report, domain, item, error, retries):
+    """
+    Agenda uma nova tentativa para uma página que falhou, ou registra a falha definitiva.
+    
+    Args:
+        retry_queue: Fila de novas tentativas do domínio
+        run_report: Relatório da execução
+        domain: Domínio da página
+        item: Tupla (URL, caminho do PDF, sinais de modificação)
+        error: Falha ocorrida
+        retries: Novas tentativas já realizadas para a página
+    """
+    if not isinstance(error, CaptureError):
+        error = CaptureError(FAILURE_OTHER, str(error))
+    
+    if not retry_queue.push(item, error, retries):
+        logger.error(f"Página {item[0]} falhou após {retries + 1} tentativa(s) ({error.kind})")
+        run_report.record_failure(domain, item[0], error.kind, retries + 1)
+        return
+    
+    METRICS.inc("printtopdf_page_retries_total")
+    METRICS.add("printtopdf_queue_depth", 1)
+
+def _open_run(settings, run_id, manifest_name=None, manifest=None):
+    """
+    Cria os recursos compartilhados pelos domínios processados em um mesmo processo.
+    
+    Args:
+        settings: Configurações da execução (opções da linha de comando)
+        run_id: Identificador da execução
+        manifest_name: Nome do arquivo do manifesto (padrão: '<run_id>.jsonl'); cada
+            processo que grava no manifesto usa um arquivo próprio
+        manifest: Manifesto já aberto neste processo, reaproveitado no lugar de um novo
+        
+    Returns:
+        Namespace com os recursos da execução
+    """
+    output_path = Path(settings.output_dir)
+    
+    # Lista de bloqueio de requisições (padrão embutido + ajustes do arquivo)
+    block_list = None
+    if settings.block_requests:
+        block_list = BlockList.from_file(settings.block_list_file) if settings.block_list_file else BlockList()
+    
+    return SimpleNamespace(
+        id=run_id,
+        output_path=output_path,
+        block_list=block_list,
+        # Política de reciclagem proativa dos navegadores
+        recycle_policy=RecyclePolicy(max_pages=settings.recycle_after_pages, max_rss_mb=settings.recycle_max_rss_mb),
+        # Navegadores aquecidos reaproveitados entre domínios
+        browser_manager=BrowserManager(max_idle=settings.workers) if settings.reuse_browsers else None,
+        # Verificação HTTP prévia das URLs
+        preflight_checker=PreflightChecker(max_workers=settings.preflight_workers) if settings.preflight else None,
+        # Perfis persistentes com cache HTTP em disco entre páginas e execuções
+        profile_store=ProfileStore(
+            settings.profile_dir, settings.browser, settings.profile_cache_mb, settings.profile_store_max_mb
+        ) if settings.profile_dir else None,
+        # Novas tentativas adiadas para páginas que falharam
+        retry_policy=RetryPolicy(base_delay=settings.retry_base_delay),
+        report=RunReport(),
+        manifest=manifest or RunManifest(str(output_path / "execucoes" / (manifest_name or f"{run_id}.jsonl")), run_id),
+        # Hash do conteúdo de cada página capturada -> PDF gerado, compartilhado
+        # entre workers e domínios para reaproveitar páginas duplicadas
+        content_hashes={}
+    )
+
+def _close_run(run):
+    """
+    Libera os recursos criados por _open_run.
+    
+    Args:
+        run: Recursos da execução
+    """
+    # Encerrar os navegadores aquecidos restantes
+    if run.browser_manager:
+        run.browser_manager.close()
+    
+    if run.preflight_checker:
+        run.preflight_checker.close()
+
+def _create_crawler(domain, settings, run, tab_session=None):
+    """
+    Cria o crawler de um domínio com as configurações da execução.
+    
+    Args:
+        domain: Domínio
+        settings: Configurações da execução
+        run: Recursos da execução
+        tab_session: Navegador compartilhado em que o crawler abre uma aba (None = navegador próprio)
+        
+    Returns:
+        WebCrawler pronto para capturar páginas do domínio
+    """
+    base_url = f"https://{domain}" if not domain.startswith(('http://', 'https://')) else domain
+    return WebCrawler(
+        base_url=base_url,
+        max_depth=0,  # Não fazer crawling, apenas usar as URLs fornecidas
+        headless=settings.headless,
+        browser=settings.browser,
+        wait_time=settings.wait_time,
+        extra_wait_for_media=settings.extra_wait_for_media,
+        page_load_timeout=settings.page_load_timeout,
+        loader_selectors=list(settings.loader_selectors) or None,
+        loader_timeout=settings.loader_timeout,
+        render_mode=settings.render_mode,
+        block_list=run.block_list,
+        recycle_policy=run.recycle_policy,
+        browser_manager=run.browser_manager,
+        content_hashes=run.content_hashes,
+        page_deadline=settings.page_deadline,
+        lazy_load_budget=settings.lazy_load_budget,
+        viewport_profiles=parse_viewport_profiles(settings.viewports) if settings.viewports else None,
+        tab_session=tab_session,
+        profile_store=run.profile_store,
+        profile_key=_profile_key(domain, settings),
+        proxy_url=settings.proxy_url,
+        proxy_intercepts_https=settings.proxy_intercepts_https
+    )
+
+def _profile_key(domain, settings):
+    """
+    Define a chave do perfil persistente do navegador.
+    
+    Args:
+        domain: Domínio
+        settings: Configurações da execução
+        
+    Returns:
+        Domínio (um perfil por domínio) ou 'worker' (perfis compartilhados entre domínios)
+    """
+    return clean_domain_name(domain) if settings.profile_scope == "domain" else "worker"
+
+def _open_tab_sessions(domain, settings, run):
+    """
+    Cria os navegadores compartilhados por abas de um domínio (um por worker).
+    
+    Args:
+        domain: Domínio
+        settings: Configurações da execução
+        run: Recursos da execução
+        
+    Returns:
+        Lista de TabSession (vazia quando cada crawler usa um navegador próprio)
+    """
+    if settings.tabs <= 1:
+        return []
+    
+    blocked_patterns = run.block_list.patterns_for(domain) if run.block_list else []
+    tab_sessions = []
+    for _ in range(settings.workers):
+        # Cada navegador compartilhado usa um perfil persistente próprio, se habilitado
+        profile_path = run.profile_store.acquire(_profile_key(domain, settings)) if run.profile_store else None
+        factory = functools.partial(
+            create_driver, settings.browser, settings.headless, settings.page_load_timeout, blocked_patterns,
+            tabbed=True, profile_path=profile_path, cache_mb=settings.profile_cache_mb,
+            proxy_url=settings.proxy_url, proxy_intercepts_https=settings.proxy_intercepts_https
+        )
+        tab_sessions.append(TabSession(factory, settings.page_load_timeout, profile_path))
+    return tab_sessions
+
+def _preflight_domain(domain, urls, lastmod, run):
+    """
+    Verifica as URLs de um domínio via HTTP e reúne os sinais de modificação de cada uma.
+    
+    Args:
+        domain: Domínio
+        urls: URLs do domínio, na ordem do sitemap
+        lastmod: Valor de <lastmod> de cada URL no sitemap
+        run: Recursos da execução
+        
+    Returns:
+        Tupla (URLs que seguem para captura, {URL: sinais de modificação})
+    """
+    # Sinais de modificação de cada URL (lastmod do sitemap e validadores HTTP)
+    page_meta = {url: {"lastmod": lastmod.get(url), "headers": {}} for url in urls}
+    
+    # Descartar ou redirecionar URLs antes de gastar uma navegação com elas
+    if run.preflight_checker:
+        click.echo("Verificando URLs via HTTP (pre-flight)...")
+        preflight_results = run.preflight_checker.check_many(urls)
+        for preflight_result in preflight_results:
+            run.report.record_preflight(domain, preflight_result.to_dict())
+            if preflight_result.capture_url:
+                page_meta[preflight_result.capture_url] = {
+                    "lastmod": lastmod.get(preflight_result.url),
+                    "headers": preflight_result.headers
+                }
+            if preflight_result.action == "skip":
+                run.manifest.record_page(domain, preflight_result.url, "skipped", error=preflight_result.reason)
+            if preflight_result.action != "capture":
+                logger.info(f"Pre-flight: {preflight_result.url} -> {preflight_result.action} ({preflight_result.reason})")
+        
+        # Manter a ordem do sitemap sem repetir destinos de redirecionamentos
+        urls = list(dict.fromkeys(
+            result.capture_url for result in preflight_results if result.capture_url
+        ))
+        click.echo(f"{len(urls)} de {len(preflight_results)} URLs seguem para captura")
+    
+    return urls, page_meta
+
+def _merge_domain(domain, domain_dir, individual_pdfs, pdf_generator, run_report=None):
+    """
+    Mescla os PDFs individuais de um domínio em um único arquivo.
+    
+    Args:
+        domain: Domínio
+        domain_dir: Diretório do domínio
+        individual_pdfs: PDFs das páginas, na ordem do sitemap
+        pdf_generator: Gerador de PDF
+        run_report: Relatório da execução, que recebe a duração da mesclagem
+        
+    Returns:
+        Caminho do PDF mesclado do domínio ou None
+    """
+    started = time.monotonic()
+    try:
+        return _merge_domain_pdfs(domain, domain_dir, individual_pdfs, pdf_generator)
+    finally:
+        if run_report:
+            run_report.record_merge(domain, time.monotonic() - started)
+
+def _merge_domain_pdfs(domain, domain_dir, individual_pdfs, pdf_generator):
+    """
+    Mescla os PDFs válidos de um domínio (ver _merge_domain).
+    
+    Args:
+        domain: Domínio
+        domain_dir: Diretório do domínio
+        individual_pdfs: PDFs das páginas, na ordem do sitemap
+        pdf_generator: Gerador de PDF
+        
+    Returns:
+        Caminho do PDF mesclado do domínio ou None
+    """
+    if individual_pdfs:
+        click.echo("Mesclando PDFs individuais...")
+        
+        # Verificar se há PDFs válidos para mesclar
+        valid_pdfs = pdf_generator.filter_valid_pdfs(individual_pdfs)
+        
+        if valid_pdfs:
+            # Arquivo mesclado para este domínio
+            merged_pdf_path = domain_dir / f"{clean_domain_name(domain)}_completo.pdf"
+            
+            # Mesclar PDFs
+            result = pdf_generator.merge_pdfs(valid_pdfs, str(merged_pdf_path))
+            
+            # Verificar se o arquivo foi criado
+            if result and os.path.exists(merged_pdf_path) and os.path.getsize(merged_pdf_path) > 0:
+                click.echo(f"PDF mesclado salvo em: {merged_pdf_path}")
+                return str(merged_pdf_path)
+            else:
+                logger.error(f"Falha ao criar PDF mesclado para {domain}")
+                click.echo(f"Falha ao criar PDF mesclado para {domain}")
+        else:
+            click.echo("Nenhum PDF válido encontrado para mesclar")
+    
+    return None
+
+def _process_domain(domain, urls, next_item, lastmod, settings, run):
+    """
+    Captura as páginas de um domínio e mescla os PDFs individuais.
+    
+    Args:
+        domain: Domínio
+        urls: URLs do domínio, na ordem do sitemap
+        next_item: Próximo domínio (domínio, URLs) do mesmo processo, para pré-inicializar navegadores
+        lastmod: Valor de <lastmod> de cada URL no sitemap
+        settings: Configurações da execução
+        run: Recursos da execução
+        
+    Returns:
+        Caminho do PDF mesclado do domínio ou None
+    """
+    cleaned_domain = clean_domain_name(domain)
+    click.echo(f"\n{'='*80}")
+    click.echo(f"Processando domínio: {domain} ({len(urls)} páginas)")
+    click.echo(f"{'='*80}")
+    
+    urls, page_meta = _preflight_domain(domain, urls, lastmod, run)
+    if not urls:
+        return None
+    
+    # Criar diretório para este domínio
+    domain_dir = run.output_path / cleaned_domain
+    pages_dir = domain_dir / "pages"
+    
+    # Limpar diretórios existentes para evitar misturar com capturas anteriores
+    # (no modo incremental e ao retomar, os PDFs anteriores são reaproveitados)
+    if settings.clean and not settings.incremental and not settings.resume_run_id and domain_dir.exists():
+        click.echo(f"Limpando diretórios anteriores para {cleaned_domain}...")
+        shutil.rmtree(domain_dir)
+        
+    # Criar diretórios para armazenar os PDFs
+    domain_dir.mkdir(exist_ok=True, parents=True)
+    pages_dir.mkdir(exist_ok=True, parents=True)
+    
+    # Inicializar o gerador de PDF
+    pdf_generator = PDFGenerator()
+    
+    # Modo incremental: reaproveitar os PDFs de páginas que não mudaram
+    capture_state = None
+    cached_pdfs = {}
+    known_paths = {}
+    if settings.incremental:
+        capture_state = CaptureState(str(domain_dir / STATE_FILENAME))
+        for url in urls:
+            cached_pdf = capture_state.cached_pdf(url, **page_meta[url])
+            if cached_pdf:
+                cached_pdfs[url] = cached_pdf
+            previous = capture_state.entries.get(url, {}).get("pdf_path")
+            if previous and Path(previous).parent == pages_dir:
+                known_paths[url] = Path(previous)
+        
+        # Conteúdo já capturado também serve para reaproveitar páginas alteradas
+        for content_hash, pdf_file in capture_state.content_hashes().items():
+            run.content_hashes.setdefault(content_hash, pdf_file)
+        
+        run.report.record_cached(domain, len(cached_pdfs))
+        click.echo(f"{len(cached_pdfs)} páginas inalteradas reaproveitadas da execução anterior")
+        for url, cached_pdf in cached_pdfs.items():
+            run.manifest.record_page(domain, url, "cached", cached_pdf)
+    
+    # Execução retomada: pular as páginas já concluídas antes da interrupção
+    if settings.resume_run_id:
+        completed = 0
+        for url in urls:
+            completed_pdf = None if url in cached_pdfs else run.manifest.completed_pdf(url)
+            if completed_pdf:
+                cached_pdfs[url] = completed_pdf
+                completed += 1
+        click.echo(f"{completed} páginas já concluídas na execução {run.id}")
+    
+    pending_urls = [url for url in urls if url not in cached_pdfs]
+    METRICS.add("printtopdf_queue_depth", len(pending_urls))
+    
+    # Inicializar o pool de crawlers para todo o domínio; com --tabs, cada
+    # navegador é dividido entre várias abas, distribuídas em rodízio
+    tab_sessions = _open_tab_sessions(domain, settings, run)
+    tab_counter = itertools.count()
+    pool = CapturePool(
+        crawler_factory=lambda: _create_crawler(
+            domain, settings, run,
+            tab_sessions[next(tab_counter) % len(tab_sessions)] if tab_sessions else None
+        ),
+        workers=settings.workers * settings.tabs
+    )
+    
+    try:
+        # Exibir as URLs a serem processadas
+        click.echo(
+            f"Processando {len(pending_urls)} URLs do sitemap com {settings.workers} worker(s)"
+            + (f" e {settings.tabs} abas por navegador" if tab_sessions else "")
+        )
+        
+        # Definir os nomes dos PDFs antes da captura, na ordem do sitemap,
+        # para que workers paralelos nunca disputem o mesmo arquivo
+        pdf_paths = _assign_pdf_paths(pending_urls, pages_dir, domain, known_paths)
+        
+        # Capturar screenshots e criar PDFs individuais
+        with tqdm(total=len(pending_urls), desc="Capturando screenshots", disable=settings.processes > 1) as pbar:
+            def on_page_done(index, result):
+                # Atualizar a barra de progresso com o URL concluído
+                short_url = pending_urls[index].split('/')[-1] if '/' in pending_urls[index] else pending_urls[index]
+                if not short_url:
+                    short_url = "homepage"
+                pbar.set_description(f"Capturado {short_url}")
+                pbar.update(1)
+                METRICS.add("printtopdf_queue_depth", -1)
+            
+            capture_task = lambda crawler, item: _capture_page(
+                crawler, pdf_generator, run.report, run.manifest, capture_state, *item,
+                viewport_output=settings.viewport_output
+            )
+            
+            # Com o proxy de cache e um único crawler, o HTML da próxima página da fila é
+            # buscado enquanto a página atual é capturada (com vários crawlers em paralelo,
+            # a próxima página já está sendo carregada por outro deles)
+            prefetch_next = {}
+            if settings.proxy_url and pool.workers == 1:
+                prefetch_next = dict(zip(pending_urls, pending_urls[1:]))
+            def first_capture_task(crawler, item):
+                if item[0] in prefetch_next:
+                    request_prefetch(settings.proxy_url, prefetch_next[item[0]])
+                return capture_task(crawler, item)
+            
+            items = [(url, pdf_path, page_meta[url]) for url, pdf_path in zip(pending_urls, pdf_paths)]
+            results = pool.map(first_capture_task, items, on_done=on_page_done)
+        
+        # Páginas que falharam voltam para a fila, atrás de todas as páginas saudáveis
+        captured = dict(zip(pending_urls, results))
+        retry_queue = RetryQueue(run.retry_policy)
+        for item, result in zip(items, results):
+            if isinstance(result, Exception):
+                _schedule_retry(retry_queue, run.report, domain, item, result, 0)
+        
+        while retry_queue:
+            batch = retry_queue.pop_due()
+            click.echo(f"Nova tentativa de {len(batch)} página(s) que falharam")
+            retry_results = pool.map(capture_task, [item for item, _ in batch])
+            for (item, retries), result in zip(batch, retry_results):
+                METRICS.add("printtopdf_queue_depth", -1)
+                captured[item[0]] = result
+                if isinstance(result, Exception):
+                    _schedule_retry(retry_queue, run.report, domain, item, result, retries)
+        
+        # Resultados já estão na ordem do sitemap; PDFs reaproveitados e novos são intercalados
+        individual_pdfs = []
+        for url in urls:
+            result = cached_pdfs.get(url) or captured.get(url)
+            if isinstance(result, str):
+                individual_pdfs.append(result)
+    finally:
+        # Devolver os navegadores do pool (ao gerenciador, quando houver reutilização)
+        pool.close()
+        for tab_session in tab_sessions:
+            tab_session.close()
+            if tab_session.profile_path:
+                run.profile_store.release(tab_session.profile_path)
+    
+    if capture_state:
+        capture_state.save()
+    
+    # Pré-inicializar as sessões do próximo domínio enquanto este é mesclado
+    # (navegadores com perfil persistente não passam pelo gerenciador)
+    if run.browser_manager and not run.profile_store and next_item:
+        next_domain, next_domain_urls = next_item
+        next_patterns = run.block_list.patterns_for(next_domain) if run.block_list else []
+        run.browser_manager.prelaunch(
+            driver_launch_key(settings.browser, settings.headless, settings.page_load_timeout, next_patterns),
+            functools.partial(
+                create_driver, settings.browser, settings.headless, settings.page_load_timeout, next_patterns,
+                proxy_url=settings.proxy_url, proxy_intercepts_https=settings.proxy_intercepts_https
+            ),
+            count=min(settings.workers, len(next_domain_urls))
+        )
+    
+    # Mesclar todos os PDFs em um único arquivo para este domínio
+    return _merge_domain(domain, domain_dir, individual_pdfs, pdf_generator, run.report)
+
+def _process_domains(domain_items, lastmod, settings, run_id, manifest_name=None, manifest=None):
+    """
+    Processa uma sequência de domínios no processo atual.
+    
+    Args:
+        domain_items: Lista de (domínio, URLs)
+        lastmod: Valor de <lastmod> de cada URL no sitemap
+        settings: Configurações da execução
+        run_id: Identificador da execução
+        manifest_name: Arquivo do manifesto desta fatia (processos de captura)
+        manifest: Manifesto já aberto no processo principal
+        
+    Returns:
+        Tupla ({domínio: PDF mesclado}, estatísticas do relatório por domínio)
+    """
+    run = _open_run(settings, run_id, manifest_name=manifest_name, manifest=manifest)
+    merged_pdfs = {}
+    
+    try:
+        for index, (domain, urls) in enumerate(domain_items):
+            next_item = domain_items[index + 1] if index + 1 < len(domain_items) else None
+            METRICS.set("printtopdf_current_domain", 1, domain=domain)
+            try:
+                merged_pdf = _process_domain(domain, urls, next_item, lastmod, settings, run)
+                if merged_pdf:
+                    merged_pdfs[domain] = merged_pdf
+            except Exception as e:
+                logger.error(f"Erro ao processar domínio {domain}: {str(e)}")
+                click.echo(f"Erro ao processar domínio {domain}: {str(e)}")
+            finally:
+                METRICS.remove("printtopdf_current_domain", domain=domain)
+    finally:
+        _close_run(run)
+        # Estado final das métricas de um processo de captura (--processes)
+        METRICS.flush()
+    
+    return merged_pdfs, run.report.domains
+
+def _shard_domains(domain_items, processes):
+    """
+    Distribui os domínios entre processos, equilibrando o número de páginas.
+    
+    Args:
+        domain_items: Lista de (domínio, URLs)
+        processes: Número de processos
+        
+    Returns:
+        Lista de fatias não vazias, cada uma na ordem original dos domínios
+    """
+    shards = [[] for _ in range(processes)]
+    loads = [0] * processes
+    
+    # Maiores domínios primeiro, cada um para o processo menos carregado
+    order = sorted(range(len(domain_items)), key=lambda index: -len(domain_items[index][1]))
+    for index in order:
+        target = loads.index(min(loads))
+        shards[target].append(index)
+        loads[target] += len(domain_items[index][1])
+    
+    return [[domain_items[index] for index in sorted(shard)] for shard in shards if shard]
+
+def _enqueue_job(queue, domain_items, lastmod, settings, run):
+    """
+    Publica as páginas de todos os domínios como tarefas na fila distribuída.
+    
+    Args:
+        queue: Fila de trabalho no diretório compartilhado
+        domain_items: Lista de (domínio, URLs)
+        lastmod: Valor de <lastmod> de cada URL no sitemap
+        settings: Configurações da execução
+        run: Recursos da execução
+    """
+    tasks = []
+    domains = []
+    
+    for index, (domain, urls) in enumerate(domain_items):
+        urls, page_meta = _preflight_domain(domain, urls, lastmod, run)
+        if not urls:
+            continue
+        
+        cleaned_domain = clean_domain_name(domain)
+        domain_dir = run.output_path / cleaned_domain
+        pages_dir = domain_dir / "pages"
+        if settings.clean and domain_dir.exists():
+            shutil.rmtree(domain_dir)
+        pages_dir.mkdir(exist_ok=True, parents=True)
+        
+        # Caminhos relativos ao diretório de saída: cada nó monta o armazenamento
+        # compartilhado no seu próprio caminho
+        domain_key = f"{index:04d}-{cleaned_domain}"
+        domains.append({"domain": domain, "key": domain_key, "dir": cleaned_domain})
+        for url_index, (url, pdf_path) in enumerate(zip(urls, _assign_pdf_paths(urls, pages_dir, domain))):
+            tasks.append({
+                "id": f"{domain_key}--{url_index:06d}",
+                "domain": domain,
+                "domain_key": domain_key,
+                "url": url,
+                "pdf_path": str(pdf_path.relative_to(run.output_path)),
+                "page_meta": page_meta[url]
+            })
+    
+    queue.create_job({"run_id": run.id, "settings": vars(settings), "domains": domains}, tasks)
+    click.echo(f"{len(tasks)} páginas de {len(domains)} domínios publicadas na fila {queue.queue_dir}")
+
+def _coordinate_queue(queue, domain_items, lastmod, settings, run_id, run_report, run_manifest):
+    """
+    Publica o trabalho na fila (se ainda não publicado), aguarda os workers e mescla os PDFs.
+    
+    Args:
+        queue: Fila de trabalho no diretório compartilhado
+        domain_items: Lista de (domínio, URLs)
+        lastmod: Valor de <lastmod> de cada URL no sitemap
+        settings: Configurações da execução
+        run_id: Identificador da execução
+        run_report: Relatório da execução
+        run_manifest: Manifesto da execução, aberto no processo principal
+        
+    Returns:
+        Dicionário {domínio: PDF mesclado}
+    """
+    if queue.load_job() is None:
+        run = _open_run(settings, run_id, manifest=run_manifest)
+        try:
+            _enqueue_job(queue, domain_items, lastmod, settings, run)
+        finally:
+            _close_run(run)
+        run_report.merge_domains(run.report.domains)
+    else:
+        click.echo(f"Trabalho já publicado em {queue.queue_dir}, aguardando a conclusão")
+    
+    job = queue.load_job()
+    done, total = queue.progress()
+    with tqdm(total=total, initial=done, desc="Páginas concluídas pelos workers") as pbar:
+        while done < total:
+            METRICS.set("printtopdf_queue_depth", total - done)
+            time.sleep(QUEUE_POLL_INTERVAL)
+            done, total = queue.progress()
+            pbar.update(done - pbar.n)
+    METRICS.set("printtopdf_queue_depth", 0)
+    
+    results = queue.results()
+    output_path = Path(settings.output_dir)
+    merged_by_domain = {}
+    pdf_generator = PDFGenerator()
+    
+    for domain_info in job["domains"]:
+        domain = domain_info["domain"]
+        individual_pdfs = []
+        for task_id in sorted(task_id for task_id in results if task_id.startswith(f"{domain_info['key']}--")):
+            result = results[task_id]
+            if result.get("timings"):
+                run_report.record_timings(domain, result["timings"])
+            if result.get("status") == "captured":
+                individual_pdfs.append(str(output_path / result["pdf_path"]))
+                run_report.record_network(domain, result.get("network", {}))
+            else:
+                run_report.record_failure(domain, result.get("url"), result.get("failure_kind"), result.get("attempts", 1))
+        
+        merged_pdf = _merge_domain(domain, output_path / domain_info["dir"], individual_pdfs, pdf_generator, run_report)
+        if merged_pdf:
+            merged_by_domain[domain] = merged_pdf
+    
+    return merged_by_domain
+
+def _run_queue_worker(queue, settings, worker_id):
+    """
+    Consome tarefas da fila distribuída até todas estarem concluídas.
+    
+    As configurações de captura vêm do trabalho publicado pelo coordenador;
+    só as opções locais do nó (diretório de saída, workers, headless) são
+    tomadas da linha de comando do worker.
+    
+    Args:
+        queue: Fila de trabalho no diretório compartilhado
+        settings: Configurações locais do worker
+        worker_id: Identificador do worker
+    """
+    job = queue.load_job()
+    while job is None:
+        click.echo(f"Aguardando a publicação do trabalho em {queue.queue_dir}...")
+        time.sleep(QUEUE_POLL_INTERVAL)
+        job = queue.load_job()
+    
+    job_settings = SimpleNamespace(**{
+        **job["settings"],
+        "output_dir": settings.output_dir,
+        "workers": settings.workers,
+        "headless": settings.headless,
+        "processes": 1,
+        "tabs": 1,
+        "proxy_url": settings.proxy_url,
+        "proxy_intercepts_https": settings.proxy_intercepts_https
+    })
+    run = _open_run(job_settings, job["run_id"], manifest_name=f"{job['run_id']}-{worker_id}.jsonl")
+    output_path = Path(settings.output_dir)
+    
+    def worker_loop(slot):
+        lease_owner = f"{worker_id}-{slot}"
+        pdf_generator = PDFGenerator()
+        crawler = None
+        current_domain = None
+        
+        while True:
+            task = queue.lease(lease_owner, settings.lease_ttl, prefer=current_domain)
+            if task is None:
+                done, total = queue.progress()
+                METRICS.set("printtopdf_queue_depth", total - done)
+                if done >= total:
+                    break
+                # Tarefas restantes estão com outros workers ou aguardando o backoff
+                time.sleep(QUEUE_POLL_INTERVAL)
+                continue
+            
+            # Um navegador por domínio; trocar de domínio fecha o crawler anterior
+            if crawler and task["domain_key"] != current_domain:
+                crawler.close()
+                crawler = None
+                METRICS.remove("printtopdf_current_domain", domain=current_domain)
+            
+            keeper = LeaseKeeper(queue, task["id"], lease_owner, settings.lease_ttl)
+            outcome = {"domain": task["domain"], "url": task["url"]}
+            try:
+                if crawler is None:
+                    current_domain = task["domain_key"]
+                    METRICS.set("printtopdf_current_domain", 1, domain=current_domain)
+                    crawler = _create_crawler(task["domain"], job_settings, run)
+                
+                pdf_path = output_path / task["pdf_path"]
+                pdf_path.parent.mkdir(exist_ok=True, parents=True)
+                _capture_page(
+                    crawler, pdf_generator, run.report, run.manifest, None, task["url"], pdf_path, task["page_meta"],
+                    viewport_output=job_settings.viewport_output
+                )
+                outcome.update(
+                    status="captured", pdf_path=task["pdf_path"], network=crawler.last_network_stats,
+                    timings=crawler.last_timings.to_row(task["domain"], task["url"], "captured")
+                )
+            except Exception as e:
+                error = e if isinstance(e, CaptureError) else CaptureError(FAILURE_OTHER, str(e))
+                retries = len(queue.attempts(task["id"]))
+                if run.retry_policy.allows(error.kind, retries):
+                    keeper.stop()
+                    queue.release(task["id"], lease_owner, error.kind, retry_after=run.retry_policy.delay(retries))
+                    METRICS.inc("printtopdf_page_retries_total")
+                    continue
+                outcome.update(status="failed", failure_kind=error.kind, error=str(error), attempts=retries + 1)
+                if crawler:
+                    outcome["timings"] = crawler.last_timings.to_row(task["domain"], task["url"], "failed", error.kind)
+            finally:
+                keeper.stop()
+            
+            # Sem a concessão, outro worker assumiu a tarefa e registrará o resultado
+            if not keeper.lost:
+                queue.complete(task["id"], lease_owner, outcome)
+        
+        if crawler:
+            crawler.close()
+            METRICS.remove("printtopdf_current_domain", domain=current_domain)
+    
+    click.echo(f"Worker {worker_id} consumindo a fila {queue.queue_dir} com {settings.workers} navegador(es)")
+    threads = [
+        threading.Thread(target=worker_loop, args=(slot,), name=f"fila-{slot}")
+        for slot in range(settings.workers)
+    ]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        _close_run(run)
+    
+    click.echo(f"Worker {worker_id}: todas as tarefas da fila foram concluídas")
+
+def _start_caching_proxy(settings):
+    """
+    Inicia o proxy de cache compartilhado, se habilitado, e registra seu endereço nas configurações.
+    
+    O proxy roda no processo principal; os navegadores de todos os workers e
+    processos de captura o acessam pelo endereço em settings.proxy_url;
+    settings.proxy_intercepts_https indica se o HTTPS é decifrado pelo proxy.
+    
+    Args:
+        settings: Configurações da execução
+        
+    Returns:
+        CachingProxy em execução ou None
+    """
+    settings.proxy_url = None
+    settings.proxy_intercepts_https = False
+    if not settings.caching_proxy:
+        return None
+    
+    cache_dir = settings.proxy_cache_dir or str(Path(settings.output_dir) / "cache_proxy")
+    caching_proxy = CachingProxy(cache_dir, settings.proxy_cache_mb, settings.proxy_static_ttl)
+    settings.proxy_url = caching_proxy.start()
+    settings.proxy_intercepts_https = caching_proxy.intercepts_https
+    click.echo(f"Proxy de cache compartilhado em {settings.proxy_url} (cache em {cache_dir})")
+    return caching_proxy
+
+def _init_worker_process(log_file, metrics_dir=None):
+    """
+    Configura o logging e as métricas de um processo de captura.
+    
+    Args:
+        log_file: Arquivo de log da execução
+        metrics_dir: Diretório em que o processo grava o estado das suas métricas,
+            somadas pelo servidor de métricas do processo principal (None = sem métricas)
+    """
+    setup_logging(level=logging.INFO, log_file=log_file)
+    if metrics_dir:
+        METRICS.export_to(os.path.join(metrics_dir, f"{os.getpid()}.json"))
+
+def _start_metrics_server(settings):
+    """
+    Inicia o servidor de métricas do Prometheus, se habilitado.
+    
+    Args:
+        settings: Configurações da execução
+        
+    Returns:
+        Tupla (MetricsServer em execução ou None, diretório do estado das métricas dos processos de captura)
+    """
+    if not settings.metrics_port:
+        return None, None
+    
+    metrics_dir = str(Path(settings.output_dir) / "metricas")
+    metrics_server = MetricsServer(METRICS, metrics_dir)
+    url = metrics_server.start(settings.metrics_host, settings.metrics_port)
+    click.echo(f"Métricas em tempo real disponíveis em {url}")
+    return metrics_server, metrics_dir
+
 @click.command()
 @click.option(
     "--urls-file", 
@@ -59,17 +1074,223 @@ logger = logging.getLogger(__name__)
     type=int,
     help="Tempo adicional de espera para páginas com vídeo/GIF (segundos)"
 )
+@click.option(
+    "--render-mode",
+    default="screenshot",
+    type=click.Choice(["screenshot", "print"]),
+    help="Modo de captura: screenshot (imagem) ou print (PDF vetorial gerado pelo navegador)"
+)
+@click.option(
+    "--viewports",
+    default=None,
+    help="Perfis de viewport capturados a partir de um único carregamento, separados por vírgula: "
+         "desktop, tablet, mobile ou nome:LARGURAxALTURA[:mobile] (ex.: desktop,tablet,mobile)"
+)
+@click.option(
+    "--viewport-output",
+    default="combined",
+    type=click.Choice(["combined", "separate"]),
+    help="Com --viewports: combined (um PDF por página, com uma página por perfil) ou separate (também um PDF por perfil em pages/<perfil>/)"
+)
+@click.option(
+    "--loader-selector",
+    "loader_selectors",
+    multiple=True,
+    help="Seletor CSS de indicador de carregamento a aguardar (pode ser repetido; substitui a lista padrão)"
+)
+@click.option(
+    "--loader-timeout",
+    default=15,
+    type=float,
+    help="Prazo máximo para os indicadores de carregamento desaparecerem (segundos)"
+)
+@click.option(
+    "--lazy-load-budget",
+    default=60,
+    type=click.FloatRange(min=0),
+    help="Orçamento para percorrer a página e carregar imagens e iframes tardios (segundos)"
+)
+@click.option(
+    "--block-requests/--no-block-requests",
+    default=True,
+    help="Bloquear anúncios, rastreadores e recursos pesados de terceiros na camada de rede"
+)
+@click.option(
+    "--block-list",
+    "block_list_file",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Arquivo JSON com padrões de bloqueio adicionais e ajustes por domínio"
+)
+@click.option(
+    "--recycle-after-pages",
+    default=100,
+    type=click.IntRange(min=0),
+    help="Reiniciar o navegador após este número de páginas (0 = desativado)"
+)
+@click.option(
+    "--recycle-max-rss-mb",
+    default=3072,
+    type=click.IntRange(min=0),
+    help="Reiniciar o navegador quando sua memória residente ultrapassar este valor em MB (0 = desativado)"
+)
+@click.option(
+    "--page-load-timeout",
+    default=180,
+    type=click.IntRange(min=1),
+    help="Timeout de carregamento de página do navegador (segundos)"
+)
+@click.option(
+    "--page-deadline",
+    default=600,
+    type=click.IntRange(min=0),
+    help="Prazo máximo por página (segundos); ao vencer, o navegador é encerrado à força e a página falha; com --tabs, apenas a aba da página é fechada (0 = sem prazo)"
+)
+@click.option(
+    "--reuse-browsers/--no-reuse-browsers",
+    default=True,
+    help="Manter navegadores aquecidos entre domínios, limpando cookies e armazenamento"
+)
+@click.option(
+    "--preflight/--no-preflight",
+    default=True,
+    help="Verificar as URLs via HTTP antes da captura, ignorando páginas mortas, redirecionadas para outros hosts ou não HTML"
+)
+@click.option(
+    "--preflight-workers",
+    default=16,
+    type=click.IntRange(min=1),
+    help="Número de verificações HTTP prévias simultâneas"
+)
+@click.option(
+    "--retry-base-delay",
+    default=30,
+    type=click.FloatRange(min=0),
+    help="Intervalo antes da primeira nova tentativa de uma página que falhou (segundos, dobra a cada tentativa)"
+)
+@click.option(
+    "--processes",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Número de processos capturando domínios diferentes em paralelo, cada um com seus navegadores"
+)
+@click.option(
+    "--workers",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Número de navegadores capturando páginas do mesmo domínio em paralelo"
+)
+@click.option(
+    "--tabs",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Abas por navegador: cada worker captura várias páginas intercaladas em um único navegador"
+)
+@click.option(
+    "--profile-dir",
+    default=None,
+    type=click.Path(file_okay=False),
+    help="Diretório de perfis persistentes do navegador: o cache HTTP em disco é reaproveitado entre páginas e execuções"
+)
+@click.option(
+    "--profile-scope",
+    default="domain",
+    type=click.Choice(["domain", "worker"]),
+    help="Com --profile-dir: um perfil por domínio ou perfis compartilhados entre domínios (um por worker)"
+)
+@click.option(
+    "--profile-cache-mb",
+    default=256,
+    type=click.IntRange(min=16),
+    help="Limite do cache HTTP em disco de cada perfil (MB); o navegador descarta as entradas mais antigas"
+)
+@click.option(
+    "--profile-store-max-mb",
+    default=4096,
+    type=click.IntRange(min=64),
+    help="Limite total do diretório de perfis (MB); os perfis usados há mais tempo são removidos"
+)
+@click.option(
+    "--caching-proxy/--no-caching-proxy",
+    default=False,
+    help="Encaminhar o tráfego de todos os navegadores por um proxy local com cache em disco compartilhado "
+         "(o cache de HTTPS exige o pacote opcional 'cryptography', extra 'proxy-https'; sem ele o HTTPS "
+         "passa pelo proxy sem cache)"
+)
+@click.option(
+    "--proxy-cache-dir",
+    default=None,
+    type=click.Path(file_okay=False),
+    help="Diretório do cache do proxy (padrão: <output-dir>/cache_proxy), reaproveitado entre execuções"
+)
+@click.option(
+    "--proxy-cache-mb",
+    default=2048,
+    type=click.IntRange(min=64),
+    help="Limite do cache do proxy (MB); as respostas usadas há mais tempo são removidas"
+)
+@click.option(
+    "--proxy-static-ttl",
+    default=86400,
+    type=click.IntRange(min=0),
+    help="Validade no cache do proxy de CSS, JS, fontes e imagens, ignorando os cabeçalhos da origem (segundos, 0 = seguir os cabeçalhos)"
+)
+@click.option(
+    "--queue-dir",
+    default=None,
+    type=click.Path(file_okay=False),
+    help="Diretório compartilhado de uma fila distribuída entre várias máquinas (sem broker externo)"
+)
+@click.option(
+    "--queue-role",
+    default="coordinator",
+    type=click.Choice(["coordinator", "worker"]),
+    help="Papel nesta fila: coordinator (publica as tarefas e faz as mesclagens) ou worker (captura páginas)"
+)
+@click.option(
+    "--worker-id",
+    default=f"{socket.gethostname()}-{os.getpid()}",
+    help="Identificador deste worker na fila distribuída"
+)
+@click.option(
+    "--lease-ttl",
+    default=300,
+    type=click.IntRange(min=30),
+    help="Duração da concessão de uma tarefa da fila (segundos); renovada enquanto a página é processada"
+)
+@click.option(
+    "--metrics-port",
+    default=0,
+    type=click.IntRange(min=0, max=65535),
+    help="Porta do endpoint HTTP com métricas em tempo real no formato do Prometheus (/metrics; 0 = desativado)"
+)
+@click.option(
+    "--metrics-host",
+    default="127.0.0.1",
+    help="Endereço de escuta do endpoint de métricas"
+)
 @click.option(
     "--clean/--no-clean",
     default=True,
     help="Limpar diretórios antigos antes de iniciar"
 )
+@click.option(
+    "--incremental/--no-incremental",
+    default=False,
+    help="Recapturar apenas páginas novas ou alteradas (lastmod do sitemap, ETag, Last-Modified), mantendo os PDFs anteriores"
+)
+@click.option(
+    "--resume",
+    "resume_run_id",
+    default=None,
+    help="Retomar a execução com este identificador, pulando as páginas já concluídas"
+)
 @click.option(
     "--skip-final-merge/--do-final-merge",
     default=False,
     help="Pular a criação do PDF final com todos os sites"
 )
-def main(urls_file, output_dir, headless, browser, wait_time, extra_wait_for_media, clean, skip_final_merge):
+def main(urls_file, output_dir, headless, browser, wait_time, extra_wait_for_media, render_mode, viewports, viewport_output, loader_selectors, loader_timeout, lazy_load_budget, block_requests, block_list_file, recycle_after_pages, recycle_max_rss_mb, page_load_timeout, page_deadline, reuse_browsers, preflight, preflight_workers, retry_base_delay, processes, workers, tabs, profile_dir, profile_scope, profile_cache_mb, profile_store_max_mb, caching_proxy, proxy_cache_dir, proxy_cache_mb, proxy_static_ttl, queue_dir, queue_role, worker_id, lease_ttl, metrics_port, metrics_host, clean, incremental, resume_run_id, skip_final_merge):
     """Captura screenshots de alta qualidade de todas as páginas listadas em sitemaps XML e converte para PDF."""
     # Configurar logging com timestamp
     log_dir = Path("logs")
@@ -79,7 +1300,28 @@ def main(urls_file, output_dir, headless, browser, wait_time, extra_wait_for_med
     setup_logging(level=logging.INFO, log_file=str(log_file))
     
     logger.info("Iniciando PrintToPDF para Sitemaps XML com configurações de alta qualidade")
-    logger.info(f"Configurações: browser={browser}, wait_time={wait_time}s, extra_wait_for_media={extra_wait_for_media}s")
+    logger.info(f"Configurações: browser={browser}, wait_time={wait_time}s, extra_wait_for_media={extra_wait_for_media}s, render_mode={render_mode}, workers={workers}")
+    
+    # Validar os perfis de viewport antes de abrir qualquer navegador
+    if viewports:
+        try:
+            parse_viewport_profiles(viewports)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--viewports")
+    
+    # Worker de fila distribuída: as URLs e as configurações de captura vêm do coordenador
+    if queue_dir and queue_role == "worker":
+        settings = SimpleNamespace(**click.get_current_context().params)
+        shared_proxy = _start_caching_proxy(settings)
+        metrics_server, _ = _start_metrics_server(settings)
+        try:
+            _run_queue_worker(WorkQueue(queue_dir), settings, worker_id)
+        finally:
+            if shared_proxy:
+                shared_proxy.close()
+            if metrics_server:
+                metrics_server.close()
+        return
     
     # Verificar se o arquivo de URLs existe
     if not os.path.exists(urls_file):
@@ -91,6 +1333,27 @@ def main(urls_file, output_dir, headless, browser, wait_time, extra_wait_for_med
     output_path = Path(output_dir)
     output_path.mkdir(exist_ok=True, parents=True)
     
+    # Relatório da execução
+    run_report = RunReport()
+    
+    # Manifesto da execução (JSONL), usado para retomar execuções interrompidas
+    run_id = resume_run_id or timestamp
+    manifest_path = output_path / "execucoes" / f"{run_id}.jsonl"
+    if resume_run_id and not manifest_path.exists():
+        logger.error(f"Manifesto da execução {resume_run_id} não encontrado em {manifest_path}")
+        click.echo(f"Erro: Manifesto da execução {resume_run_id} não encontrado em {manifest_path}")
+        sys.exit(1)
+    run_manifest = RunManifest(str(manifest_path), run_id)
+    settings = SimpleNamespace(**click.get_current_context().params)
+    run_manifest.start(vars(settings), resumed=bool(resume_run_id))
+    click.echo(f"Execução {run_id} (manifesto: {manifest_path})")
+    
+    # Proxy de cache compartilhado por todos os navegadores da execução
+    shared_proxy = _start_caching_proxy(settings)
+    
+    # Métricas em tempo real para o Prometheus
+    metrics_server, metrics_dir = _start_metrics_server(settings)
+    
     # Inicializar o parser de sitemap
     sitemap_parser = SitemapParser()
     
@@ -104,132 +1367,60 @@ def main(urls_file, output_dir, headless, browser, wait_time, extra_wait_for_med
     
     click.echo(f"Processando {len(domain_urls)} domínios...")
     
-    # Lista para armazenar todos os PDFs finais para mesclagem global
-    all_merged_pdfs = []
-    
     # Processar cada domínio e suas URLs
-    for domain, urls in domain_urls.items():
-        try:
-            cleaned_domain = clean_domain_name(domain)
-            click.echo(f"\n{'='*80}")
-            click.echo(f"Processando domínio: {domain} ({len(urls)} páginas)")
-            click.echo(f"{'='*80}")
-            
-            # Criar diretório para este domínio
-            domain_dir = output_path / cleaned_domain
-            pages_dir = domain_dir / "pages"
-            
-            # Limpar diretórios existentes para evitar misturar com capturas anteriores
-            if clean and domain_dir.exists():
-                click.echo(f"Limpando diretórios anteriores para {cleaned_domain}...")
-                shutil.rmtree(domain_dir)
-                
-            # Criar diretórios para armazenar os PDFs
-            domain_dir.mkdir(exist_ok=True, parents=True)
-            pages_dir.mkdir(exist_ok=True, parents=True)
-            
-            # Inicializar o gerador de PDF
-            pdf_generator = PDFGenerator()
-            
-            # Inicializar o crawler uma vez para todo o domínio
-            base_url = f"https://{domain}" if not domain.startswith(('http://', 'https://')) else domain
-            crawler = WebCrawler(
-                base_url=base_url,
-                max_depth=0,  # Não fazer crawling, apenas usar as URLs fornecidas
-                headless=headless,
-                browser=browser,
-                wait_time=wait_time,
-                extra_wait_for_media=extra_wait_for_media
-            )
-            
-            # Exibir as URLs a serem processadas
-            click.echo(f"Processando {len(urls)} URLs do sitemap")
-            
-            # Capturar screenshots e criar PDFs individuais
-            individual_pdfs = []
-            
-            with tqdm(total=len(urls), desc="Capturando screenshots") as pbar:
-                for i, page_url in enumerate(urls):
-                    try:
-                        # Nome do arquivo PDF para esta página
-                        # Usar última parte da URL ou índice se não for específico
-                        url_parts = page_url.rstrip('/').split('/')
-                        page_name = url_parts[-1] if url_parts[-1] and url_parts[-1] != domain else f"page_{i+1}"
-                        
-                        # Limpar o nome de arquivo para ser seguro
-                        page_name = re.sub(r'[^a-zA-Z0-9]', '_', page_name)
-                        if not page_name or page_name == '_':
-                            page_name = f"page_{i+1}"
-                        
-                        # Garantir nomes únicos para evitar sobrescrever
-                        pdf_filename = f"{page_name}.pdf"
-                        pdf_path = pages_dir / pdf_filename
-                        
-                        # Se já existe um arquivo com esse nome, adicionar número
-                        counter = 1
-                        while pdf_path.exists():
-                            pdf_filename = f"{page_name}_{counter}.pdf"
-                            pdf_path = pages_dir / pdf_filename
-                            counter += 1
-                        
-                        # Atualizar a barra de progresso com o URL atual
-                        short_url = page_url.split('/')[-1] if '/' in page_url else page_url
-                        if not short_url:
-                            short_url = "homepage"
-                        pbar.set_description(f"Capturando {short_url}")
-                        
-                        # Capturar screenshot (página completa com tempo de espera extra)
-                        # Garante carregamento total da página antes de capturar
-                        screenshot = crawler.capture_screenshot(page_url)
-                        
-                        # Converter screenshot para PDF
-                        pdf_generator.image_to_pdf(screenshot, str(pdf_path))
-                        
-                        # Verificar se o PDF foi criado corretamente
-                        if os.path.exists(pdf_path) and os.path.getsize(pdf_path) > 0:
-                            individual_pdfs.append(str(pdf_path))
-                            logger.info(f"PDF criado com sucesso: {pdf_path}")
-                        else:
-                            logger.error(f"Falha ao criar PDF para {page_url}")
-                        
-                    except Exception as e:
-                        logger.error(f"Erro ao processar página {page_url}: {str(e)}")
-                        click.echo(f"Erro ao processar página {page_url}: {str(e)}")
-                    
-                    # Atualizar a barra de progresso
-                    pbar.update(1)
-            
-            # Mesclar todos os PDFs em um único arquivo para este domínio
-            if individual_pdfs:
-                click.echo("Mesclando PDFs individuais...")
-                
-                # Verificar se há PDFs válidos para mesclar
-                valid_pdfs = pdf_generator.filter_valid_pdfs(individual_pdfs)
-                
-                if valid_pdfs:
-                    # Arquivo mesclado para este domínio
-                    merged_pdf_path = domain_dir / f"{cleaned_domain}_completo.pdf"
-                    
-                    # Mesclar PDFs
-                    result = pdf_generator.merge_pdfs(valid_pdfs, str(merged_pdf_path))
-                    
-                    # Verificar se o arquivo foi criado
-                    if result and os.path.exists(merged_pdf_path) and os.path.getsize(merged_pdf_path) > 0:
-                        # Adicionar à lista de PDFs mesclados para mesclagem global
-                        all_merged_pdfs.append(str(merged_pdf_path))
-                        click.echo(f"PDF mesclado salvo em: {merged_pdf_path}")
-                    else:
-                        logger.error(f"Falha ao criar PDF mesclado para {domain}")
-                        click.echo(f"Falha ao criar PDF mesclado para {domain}")
-                else:
-                    click.echo("Nenhum PDF válido encontrado para mesclar")
-            
-            # Fechar o crawler
-            crawler.close()
+    domain_items = list(domain_urls.items())
+    processes = min(processes, len(domain_items))
+    merged_by_domain = {}
+    
+    if queue_dir:
+        # Fila distribuída: workers em outras máquinas capturam as páginas
+        merged_by_domain = _coordinate_queue(
+            WorkQueue(queue_dir), domain_items, sitemap_parser.lastmod, settings, run_id, run_report, run_manifest
+        )
+    elif processes > 1:
+        # Cada processo recebe uma fatia dos domínios e cria seus próprios navegadores,
+        # gravando as páginas em um manifesto próprio ('<run_id>-processo<N>.jsonl');
+        # os resultados são reunidos aqui para a mesclagem final
+        shards = _shard_domains(domain_items, processes)
+        click.echo(f"Distribuindo os domínios entre {len(shards)} processos")
+        
+        with ProcessPoolExecutor(
+            max_workers=len(shards),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker_process,
+            initargs=(str(log_file), metrics_dir)
+        ) as executor:
+            futures = []
+            for shard_index, shard in enumerate(shards, 1):
+                shard_lastmod = {
+                    url: sitemap_parser.lastmod[url]
+                    for _, urls in shard for url in urls if url in sitemap_parser.lastmod
+                }
+                futures.append(executor.submit(
+                    _process_domains, shard, shard_lastmod, settings, run_id,
+                    manifest_name=f"{run_id}-processo{shard_index}.jsonl"
+                ))
             
-        except Exception as e:
-            logger.error(f"Erro ao processar domínio {domain}: {str(e)}")
-            click.echo(f"Erro ao processar domínio {domain}: {str(e)}")
+            for shard, future in zip(shards, futures):
+                try:
+                    merged_pdfs, report_domains = future.result()
+                    merged_by_domain.update(merged_pdfs)
+                    run_report.merge_domains(report_domains)
+                except Exception as e:
+                    shard_domains = ", ".join(domain for domain, _ in shard)
+                    logger.error(f"Erro no processo dos domínios {shard_domains}: {str(e)}")
+                    click.echo(f"Erro no processo dos domínios {shard_domains}: {str(e)}")
+    else:
+        merged_by_domain, report_domains = _process_domains(
+            domain_items, sitemap_parser.lastmod, settings, run_id, manifest=run_manifest
+        )
+        run_report.merge_domains(report_domains)
+    
+    if shared_proxy:
+        shared_proxy.close()
+    
+    # PDFs mesclados na ordem do arquivo de sitemaps, independente da ordem de conclusão
+    all_merged_pdfs = [merged_by_domain[domain] for domain, _ in domain_items if domain in merged_by_domain]
     
     # Criar um PDF final com todas as páginas de todos os domínios
     if all_merged_pdfs and not skip_final_merge:
@@ -261,6 +1452,28 @@ def main(urls_file, output_dir, headless, browser, wait_time, extra_wait_for_med
             logger.error(f"Erro ao criar PDF final: {str(e)}")
             click.echo(f"Erro ao criar PDF final: {str(e)}")
     
+    # Salvar o relatório da execução
+    report_path = run_report.write(str(output_path / "relatorio_execucao.json"))
+    
+    # Tempos por etapa de cada página (o resumo por domínio fica no relatório)
+    timings_path = output_path / "tempos_por_pagina.jsonl"
+    write_timings(run_report.page_timings(), str(timings_path), str(timings_path.with_suffix(".csv")))
+    totals = run_report.to_dict()["totals"]
+    run_manifest.finish(totals)
+    click.echo(
+        f"\nRequisições bloqueadas: {totals['blocked_requests']} | "
+        f"Bytes transferidos: {totals['transferred_bytes']} | "
+        f"URLs ignoradas no pre-flight: {totals['preflight_skipped']} | "
+        f"Páginas duplicadas: {totals['duplicates']} | "
+        f"Páginas reaproveitadas (incremental): {totals['cached']} | "
+        f"Páginas com falha: {totals['failed']}"
+    )
+    click.echo(f"Relatório da execução salvo em: {report_path}")
+    click.echo(f"Tempos por etapa de cada página salvos em: {timings_path} e {timings_path.with_suffix('.csv')}")
+    if metrics_server:
+        metrics_server.close()
+    click.echo(f"Manifesto da execução salvo em: {manifest_path} (retomar com --resume {run_id})")
+    
     click.echo("\nProcessamento concluído!")
     click.echo(f"Todos os PDFs estão disponíveis na pasta: {output_path.absolute()}")
     click.echo("Os arquivos estão organizados por domínio dentro da pasta 'results'")
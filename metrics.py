@@ -0,0 +1,379 @@
+"""
+Módulo com as métricas da execução em tempo real, expostas no formato de texto do Prometheus.
+"""
+
+import glob
+import json
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from process_utils import pid_alive, process_tree_rss, read_parent_pids
+
+logger = logging.getLogger(__name__)
+
+# Limites dos histogramas de duração das etapas (segundos)
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Intervalo entre as gravações do estado das métricas de um processo de captura (segundos)
+SNAPSHOT_INTERVAL = 5
+
+# Processos dos drivers, cuja árvore contém os navegadores
+DRIVER_PROCESS_NAMES = ("chromedriver", "geckodriver")
+
+# Métricas: nome -> (tipo, descrição, combinação de gauges entre processos)
+METRIC_DEFINITIONS: Dict[str, Tuple[str, str, str]] = {
+    "printtopdf_pages_total": ("counter", "Páginas processadas, por status", "sum"),
+    "printtopdf_page_retries_total": ("counter", "Páginas reagendadas para nova tentativa", "sum"),
+    "printtopdf_captures_in_flight": ("gauge", "Capturas em andamento", "sum"),
+    "printtopdf_stage_seconds": ("histogram", "Duração de cada etapa da captura de uma página", "sum"),
+    "printtopdf_browser_restarts_total": ("counter", "Reinícios de navegador (reciclagem, falhas, prazo excedido)", "sum"),
+    "printtopdf_pdf_bytes_written_total": ("counter", "Bytes de PDF gravados, por tipo (página ou mesclado)", "sum"),
+    "printtopdf_current_domain": ("gauge", "Domínios em processamento (valor 1)", "max"),
+    "printtopdf_queue_depth": ("gauge", "Páginas aguardando captura", "sum"),
+    "printtopdf_last_page_timestamp_seconds": ("gauge", "Instante (Unix) da última página concluída", "max"),
+    "printtopdf_resident_memory_bytes": ("gauge", "Memória residente, por componente (python ou navegadores)", "sum"),
+}
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> LabelSet:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: LabelSet, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _resident_memory() -> List[Tuple[str, Dict[str, Any], float]]:
+    """
+    Mede a memória residente do processo atual e dos navegadores iniciados por ele.
+
+    Returns:
+        Séries (métrica, rótulos, valor) de printtopdf_resident_memory_bytes
+    """
+    if not os.path.isdir('/proc'):
+        return []
+
+    own_rss = 0
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    own_rss = int(line.split()[1]) * 1024
+                    break
+    except OSError:
+        pass
+
+    browsers_rss = 0
+    pid = os.getpid()
+    for child, parent in read_parent_pids().items():
+        if parent != pid:
+            continue
+        try:
+            with open(f'/proc/{child}/comm', 'r') as f:
+                name = f.read().strip()
+        except OSError:
+            continue
+        if name in DRIVER_PROCESS_NAMES:
+            browsers_rss += process_tree_rss(child) or 0
+
+    return [
+        ("printtopdf_resident_memory_bytes", {"component": "python"}, own_rss),
+        ("printtopdf_resident_memory_bytes", {"component": "browsers"}, browsers_rss),
+    ]
+
+
+class MetricsRegistry:
+    """
+    Registro das métricas de um processo, seguro para uso entre threads.
+
+    Processos de captura (--processes) gravam periodicamente o estado das suas
+    métricas em um diretório; o processo principal as soma às próprias ao
+    responder ao Prometheus.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Inicializa o registro vazio.
+
+        Args:
+            buckets: Limites dos histogramas (segundos)
+        """
+        self.buckets = tuple(buckets)
+        self._counters: Dict[Tuple[str, LabelSet], float] = {}
+        self._gauges: Dict[Tuple[str, LabelSet], float] = {}
+        self._histograms: Dict[Tuple[str, LabelSet], List[float]] = {}
+        self._collectors: List[Callable[[], List[Tuple[str, Dict[str, Any], float]]]] = [_resident_memory]
+        self._lock = threading.Lock()
+        self._snapshot_path: Optional[str] = None
+        self._snapshot_stop = threading.Event()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """
+        Incrementa um contador.
+
+        Args:
+            name: Nome da métrica
+            value: Incremento
+            **labels: Rótulos da série
+        """
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        """
+        Define o valor de um gauge.
+
+        Args:
+            name: Nome da métrica
+            value: Valor
+            **labels: Rótulos da série
+        """
+        with self._lock:
+            self._gauges[(name, _labels(labels))] = value
+
+    def add(self, name: str, value: float, **labels):
+        """
+        Soma um valor (positivo ou negativo) a um gauge.
+
+        Args:
+            name: Nome da métrica
+            value: Valor a somar
+            **labels: Rótulos da série
+        """
+        key = (name, _labels(labels))
+        with self._lock:
+            self._gauges[key] = self._gauges.get(key, 0) + value
+
+    def remove(self, name: str, **labels):
+        """
+        Remove uma série de um gauge (por exemplo, um domínio que terminou).
+
+        Args:
+            name: Nome da métrica
+            **labels: Rótulos da série
+        """
+        with self._lock:
+            self._gauges.pop((name, _labels(labels)), None)
+
+    def observe(self, name: str, value: float, **labels):
+        """
+        Registra uma observação em um histograma.
+
+        Args:
+            name: Nome da métrica
+            value: Valor observado (segundos)
+            **labels: Rótulos da série
+        """
+        key = (name, _labels(labels))
+        with self._lock:
+            # Contagens por limite (não acumuladas), seguidas de soma e total
+            data = self._histograms.setdefault(key, [0.0] * (len(self.buckets) + 3))
+            index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+            data[index] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Gera o estado atual das métricas, incluindo os gauges medidos na hora.
+
+        Returns:
+            Dicionário serializável em JSON
+        """
+        collected = [series for collector in self._collectors for series in collector()]
+        with self._lock:
+            gauges = dict(self._gauges)
+            for name, labels, value in collected:
+                gauges[(name, _labels(labels))] = value
+            return {
+                "pid": os.getpid(),
+                "buckets": list(self.buckets),
+                "counters": [[name, list(map(list, labels)), value] for (name, labels), value in self._counters.items()],
+                "gauges": [[name, list(map(list, labels)), value] for (name, labels), value in gauges.items()],
+                "histograms": [[name, list(map(list, labels)), list(data)] for (name, labels), data in self._histograms.items()],
+            }
+
+    def export_to(self, path: str, interval: float = SNAPSHOT_INTERVAL):
+        """
+        Grava o estado das métricas periodicamente em um arquivo (processos de captura).
+
+        Args:
+            path: Arquivo JSON do processo
+            interval: Intervalo entre as gravações em segundos
+        """
+        self._snapshot_path = path
+        self.flush()
+
+        def run():
+            while not self._snapshot_stop.wait(interval):
+                self.flush()
+
+        threading.Thread(target=run, name="metricas", daemon=True).start()
+
+    def flush(self):
+        """Grava imediatamente o estado das métricas, se a exportação estiver ativa."""
+        if not self._snapshot_path:
+            return
+        temp_path = f"{self._snapshot_path}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(temp_path, self._snapshot_path)
+        except OSError as e:
+            logger.warning(f"Erro ao gravar as métricas em {self._snapshot_path}: {str(e)}")
+
+    def render(self, snapshot_dir: Optional[str] = None) -> str:
+        """
+        Gera as métricas no formato de texto do Prometheus.
+
+        Args:
+            snapshot_dir: Diretório com o estado das métricas dos processos de captura
+
+        Returns:
+            Texto no formato de exposição do Prometheus (versão 0.0.4)
+        """
+        snapshots = [self.snapshot()]
+        if snapshot_dir:
+            for path in sorted(glob.glob(os.path.join(snapshot_dir, "*.json"))):
+                try:
+                    with open(path, 'r') as f:
+                        snapshot = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if snapshot.get("pid") == os.getpid():
+                    continue
+                # Gauges de processos encerrados não representam mais o estado atual
+                if not pid_alive(snapshot.get("pid", 0)):
+                    snapshot["gauges"] = []
+                snapshots.append(snapshot)
+
+        counters: Dict[Tuple[str, LabelSet], float] = {}
+        gauges: Dict[Tuple[str, LabelSet], float] = {}
+        histograms: Dict[Tuple[str, LabelSet], List[float]] = {}
+        for snapshot in snapshots:
+            if snapshot.get("buckets") != list(self.buckets):
+                snapshot["histograms"] = []
+            for name, labels, value in snapshot["counters"]:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, value in snapshot["gauges"]:
+                key = (name, tuple(map(tuple, labels)))
+                if key in gauges and METRIC_DEFINITIONS.get(name, ("", "", "sum"))[2] == "max":
+                    gauges[key] = max(gauges[key], value)
+                else:
+                    gauges[key] = gauges.get(key, 0) + value
+            for name, labels, data in snapshot["histograms"]:
+                key = (name, tuple(map(tuple, labels)))
+                merged = histograms.setdefault(key, [0.0] * len(data))
+                histograms[key] = [a + b for a, b in zip(merged, data)]
+
+        lines = []
+        for name, (metric_type, description, _) in METRIC_DEFINITIONS.items():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            if metric_type == "histogram":
+                for (series, labels), data in sorted(histograms.items()):
+                    if series != name:
+                        continue
+                    cumulative = 0.0
+                    for bound, count in zip(self.buckets + (float("inf"),), data):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(labels, ('le', _format_value(bound)))} {_format_value(cumulative)}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(data[-2])}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {_format_value(data[-1])}")
+            else:
+                source = counters if metric_type == "counter" else gauges
+                for (series, labels), value in sorted(source.items()):
+                    if series == name:
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Registro do processo atual, alimentado pelo WebCrawler, pelo PDFGenerator e pelo laço principal
+METRICS = MetricsRegistry()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Responde às coletas do Prometheus em /metrics."""
+
+    def log_message(self, format, *args):
+        logger.debug(f"Métricas: {format % args}")
+
+    def do_GET(self):
+        if self.path.split('?')[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.registry.render(self.server.snapshot_dir).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MetricsServer:
+    """Servidor HTTP local que expõe as métricas da execução ao Prometheus."""
+
+    def __init__(self, registry: MetricsRegistry, snapshot_dir: Optional[str] = None):
+        """
+        Inicializa o servidor (sem iniciá-lo).
+
+        Args:
+            registry: Registro de métricas do processo principal
+            snapshot_dir: Diretório com o estado das métricas dos processos de captura
+                (limpo ao iniciar, para não somar execuções anteriores)
+        """
+        self.registry = registry
+        self.snapshot_dir = snapshot_dir
+        self._server: Optional[ThreadingHTTPServer] = None
+
+        if snapshot_dir:
+            os.makedirs(snapshot_dir, exist_ok=True)
+            for path in glob.glob(os.path.join(snapshot_dir, "*.json")):
+                os.remove(path)
+
+    def start(self, host: str, port: int) -> str:
+        """
+        Inicia o servidor em uma thread em segundo plano.
+
+        Args:
+            host: Endereço de escuta
+            port: Porta
+
+        Returns:
+            URL das métricas
+        """
+        self._server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self._server.daemon_threads = True
+        self._server.registry = self.registry
+        self._server.snapshot_dir = self.snapshot_dir
+        threading.Thread(target=self._server.serve_forever, name="servidor-metricas", daemon=True).start()
+        url = f"http://{host}:{self._server.server_address[1]}/metrics"
+        logger.info(f"Métricas disponíveis em {url}")
+        return url
+
+    def close(self):
+        """Encerra o servidor."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,193 @@
+"""
+Módulo com a lista de bloqueio de requisições de rede (anúncios, rastreadores e recursos pesados de terceiros).
+"""
+
+import fnmatch
+import json
+import logging
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import quote
+
+logger = logging.getLogger(__name__)
+
+# Hosts bloqueados, com o caminho: cada um vale para o próprio host e para os
+# seus subdomínios, sem casar com outros domínios que apenas terminem igual
+# (ex.: 'segment.com' não bloqueia 'mysegment.com')
+DEFAULT_BLOCK_HOSTS: List[str] = [
+    # Analytics e gerenciadores de tags
+    "google-analytics.com/*",
+    "googletagmanager.com/*",
+    "analytics.google.com/*",
+    "hotjar.com/*",
+    "clarity.ms/*",
+    "segment.com/*",
+    "segment.io/*",
+    "mixpanel.com/*",
+    "scorecardresearch.com/*",
+    "newrelic.com/*",
+    "nr-data.net/*",
+    "connect.facebook.net/*",
+    "facebook.com/tr*",
+    "snap.licdn.com/*",
+    "bat.bing.com/*",
+    # Redes de anúncios
+    "doubleclick.net/*",
+    "googlesyndication.com/*",
+    "googleadservices.com/*",
+    "adservice.google.*",
+    "amazon-adsystem.com/*",
+    "adnxs.com/*",
+    "criteo.com/*",
+    "criteo.net/*",
+    "taboola.com/*",
+    "outbrain.com/*",
+    # Widgets de chat
+    "intercom.io/*",
+    "intercomcdn.com/*",
+    "zdassets.com/*",
+    "tawk.to/*",
+    "crisp.chat/*",
+    "drift.com/*",
+    "livechatinc.com/*",
+    "hubspot.com/*",
+    # CDNs de vídeo (o poster continua visível na captura)
+    "googlevideo.com/*",
+    "vod-progressive.akamaized.net/*",
+]
+
+# Padrões no formato aceito pelo Chrome (Network.setBlockedURLs) e pelo
+# shExpMatch dos arquivos PAC: '*' corresponde a qualquer sequência de caracteres
+DEFAULT_BLOCK_PATTERNS: List[str] = [
+    pattern for host in DEFAULT_BLOCK_HOSTS for pattern in (f"*://{host}", f"*://*.{host}")
+]
+
+# Endereço sem serviço usado pelo PAC do Firefox para descartar requisições
+BLACKHOLE_PROXY = "PROXY 127.0.0.1:9"
+
+
+class BlockList:
+    """Lista de padrões de URL bloqueados, com padrão embutido e ajustes por domínio."""
+
+    def __init__(
+        self,
+        patterns: Optional[Iterable[str]] = None,
+        domain_overrides: Optional[Dict[str, Dict[str, List[str]]]] = None
+    ):
+        """
+        Inicializa a lista de bloqueio.
+
+        Args:
+            patterns: Padrões bloqueados em todos os domínios (padrão: DEFAULT_BLOCK_PATTERNS)
+            domain_overrides: Ajustes por domínio, no formato
+                {"dominio.com": {"block": [...], "allow": [...]}}
+        """
+        self.patterns = list(DEFAULT_BLOCK_PATTERNS if patterns is None else patterns)
+        self.domain_overrides = domain_overrides or {}
+
+    @classmethod
+    def from_file(cls, file_path: str) -> "BlockList":
+        """
+        Carrega a lista de bloqueio de um arquivo JSON.
+
+        O arquivo aceita as chaves opcionais "block" (padrões adicionais),
+        "replace_defaults" (ignorar a lista embutida) e "domains"
+        (ajustes por domínio com "block" e "allow").
+
+        Args:
+            file_path: Caminho do arquivo JSON
+
+        Returns:
+            Lista de bloqueio configurada
+        """
+        with open(file_path, 'r') as f:
+            config = json.load(f)
+
+        base = [] if config.get("replace_defaults") else list(DEFAULT_BLOCK_PATTERNS)
+        base.extend(config.get("block", []))
+
+        return cls(patterns=base, domain_overrides=config.get("domains", {}))
+
+    def patterns_for(self, domain: str) -> List[str]:
+        """
+        Obtém os padrões efetivos para um domínio.
+
+        Padrões que correspondem ao próprio domínio capturado são descartados,
+        para que as páginas (e os recursos) do site nunca sejam bloqueados.
+
+        Args:
+            domain: Domínio capturado
+
+        Returns:
+            Lista de padrões bloqueados nesse domínio
+        """
+        domain = domain.lower()
+        override = self.domain_overrides.get(domain)
+        if override is None and domain.startswith('www.'):
+            override = self.domain_overrides.get(domain[4:])
+        if not override:
+            patterns = list(self.patterns)
+        else:
+            allowed = set(override.get("allow", []))
+            patterns = [pattern for pattern in self.patterns if pattern not in allowed]
+            patterns.extend(p for p in override.get("block", []) if p not in patterns)
+
+        host = domain.split(':')[0]
+        own = [pattern for pattern in patterns if _host_matches(host, pattern)]
+        if own:
+            logger.info(f"Padrões de bloqueio ignorados em {domain}, que corresponde a eles: {', '.join(own)}")
+        return [pattern for pattern in patterns if pattern not in own]
+
+
+def _host_matches(host: str, pattern: str) -> bool:
+    """
+    Verifica se a parte de host de um padrão corresponde a um host ou a um domínio acima dele.
+
+    Os dois padrões de um mesmo host ('x.com' e '*.x.com') valem tanto para
+    x.com quanto para www.x.com.
+
+    Args:
+        host: Host (sem porta)
+        pattern: Padrão no formato 'esquema://host/caminho' (esquema e caminho opcionais)
+
+    Returns:
+        True se o padrão vale para o host
+    """
+    host_pattern = pattern.split('://', 1)[-1].split('/', 1)[0]
+    if host_pattern.startswith('*.'):
+        host_pattern = host_pattern[2:]
+    return fnmatch.fnmatchcase(host, host_pattern) or fnmatch.fnmatchcase(host, f"*.{host_pattern}")
+
+
+def url_matches(url: str, patterns: Iterable[str]) -> bool:
+    """
+    Verifica se uma URL corresponde a algum padrão de bloqueio.
+
+    Args:
+        url: URL da requisição
+        patterns: Padrões com curinga '*'
+
+    Returns:
+        True se a URL deve ser bloqueada, False caso contrário
+    """
+    return any(fnmatch.fnmatchcase(url, pattern) for pattern in patterns)
+
+
+def build_pac_url(patterns: Iterable[str], default_route: str = "DIRECT") -> str:
+    """
+    Monta um arquivo PAC (data: URL) que descarta as requisições bloqueadas.
+
+    Usado no Firefox, que não oferece bloqueio de URLs via WebDriver.
+
+    Args:
+        patterns: Padrões com curinga '*'
+        default_route: Destino das demais requisições (ex.: 'PROXY 127.0.0.1:8080' para o proxy de cache)
+
+    Returns:
+        URL data: com o script PAC
+    """
+    checks = "\n".join(
+        f"    if (shExpMatch(url, {json.dumps(pattern)})) return {json.dumps(BLACKHOLE_PROXY)};"
+        for pattern in patterns
+    )
+    pac = f"function FindProxyForURL(url, host) {{\n{checks}\n    return {json.dumps(default_route)};\n}}\n"
+    return "data:application/x-ns-proxy-autoconfig," + quote(pac)
@@ -0,0 +1,183 @@
+"""
+Módulo com a sonda de página, que coleta o estado da página em uma única chamada ao WebDriver.
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from selenium import webdriver
+
+logger = logging.getLogger(__name__)
+
+# Seletores de elementos que indicam carregamento em andamento
+DEFAULT_LOADER_SELECTORS: List[str] = [
+    '.loading', '.loader', '[class*="loading"]', '[class*="loader"]', '[class*="progress"]', '.spinner'
+]
+
+# Script executado na página; devolve todos os dados em um único objeto JSON
+PROBE_SCRIPT = """
+var loaderSelector = arguments[0];
+var body = document.body || document.documentElement;
+var root = document.documentElement;
+
+var hasVideos = document.querySelectorAll(
+    'video, iframe[src*="youtube"], iframe[src*="vimeo"]'
+).length > 0;
+
+var hasGifs = false;
+var images = document.images;
+for (var i = 0; i < images.length; i++) {
+    if ((images[i].currentSrc || images[i].src || '').toLowerCase().split('?')[0].endsWith('.gif')) {
+        hasGifs = true;
+        break;
+    }
+}
+
+var hasAnimations = document.querySelectorAll(
+    '[class*="animate"], [class*="slider"], [class*="carousel"], [class*="banner"]'
+).length > 0;
+
+var loadersVisible = 0;
+if (loaderSelector) {
+    var loaders = document.querySelectorAll(loaderSelector);
+    for (var j = 0; j < loaders.length; j++) {
+        var style = window.getComputedStyle(loaders[j]);
+        if (style.display !== 'none' && style.visibility !== 'hidden' && style.opacity !== '0') {
+            loadersVisible++;
+        }
+    }
+}
+
+return {
+    width: Math.max(
+        body.scrollWidth, body.offsetWidth,
+        root.clientWidth, root.scrollWidth, root.offsetWidth
+    ),
+    height: Math.max(
+        body.scrollHeight, body.offsetHeight,
+        root.clientHeight, root.scrollHeight, root.offsetHeight
+    ),
+    scrollHeight: body.scrollHeight,
+    scrollY: window.pageYOffset,
+    viewportWidth: window.innerWidth,
+    viewportHeight: window.innerHeight,
+    readyState: document.readyState,
+    hasVideos: hasVideos,
+    hasGifs: hasGifs,
+    hasAnimations: hasAnimations,
+    loadersVisible: loadersVisible,
+    jqueryActive: (typeof jQuery !== 'undefined' && jQuery.active) ? jQuery.active : 0
+};
+"""
+
+# Conteúdo normalizado da página: texto visível com espaços colapsados e as
+# imagens sem query string, de modo que variações de URL (parâmetros de
+# rastreamento, barra final, aliases) produzam a mesma impressão digital
+FINGERPRINT_SCRIPT = """
+var body = document.body;
+if (!body) {
+    return null;
+}
+var text = (body.innerText || '').replace(/\\s+/g, ' ').trim();
+var images = {};
+for (var i = 0; i < document.images.length; i++) {
+    var src = (document.images[i].currentSrc || document.images[i].src || '').split('#')[0].split('?')[0];
+    if (src) {
+        images[src] = true;
+    }
+}
+return {text: text, images: Object.keys(images).sort()};
+"""
+
+# Tamanho mínimo do texto para considerar a impressão digital confiável;
+# páginas quase vazias (apenas canvas, por exemplo) não são deduplicadas
+MIN_FINGERPRINT_TEXT = 200
+
+
+@dataclass
+class PageSnapshot:
+    """Estado da página obtido pela sonda em uma única chamada."""
+
+    width: int = 0
+    height: int = 0
+    scroll_height: int = 0
+    scroll_y: int = 0
+    viewport_width: int = 0
+    viewport_height: int = 0
+    ready_state: str = ""
+    has_videos: bool = False
+    has_gifs: bool = False
+    has_animations: bool = False
+    loaders_visible: int = 0
+    jquery_active: int = 0
+
+    @property
+    def has_media(self) -> bool:
+        """Indica se a página contém vídeos, GIFs ou elementos animados."""
+        return self.has_videos or self.has_gifs or self.has_animations
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PageSnapshot":
+        """
+        Cria um snapshot a partir do objeto devolvido pelo script da sonda.
+
+        Args:
+            data: Dicionário devolvido pelo WebDriver
+
+        Returns:
+            Snapshot da página
+        """
+        return cls(
+            width=int(data.get("width") or 0),
+            height=int(data.get("height") or 0),
+            scroll_height=int(data.get("scrollHeight") or 0),
+            scroll_y=int(data.get("scrollY") or 0),
+            viewport_width=int(data.get("viewportWidth") or 0),
+            viewport_height=int(data.get("viewportHeight") or 0),
+            ready_state=data.get("readyState") or "",
+            has_videos=bool(data.get("hasVideos")),
+            has_gifs=bool(data.get("hasGifs")),
+            has_animations=bool(data.get("hasAnimations")),
+            loaders_visible=int(data.get("loadersVisible") or 0),
+            jquery_active=int(data.get("jqueryActive") or 0),
+        )
+
+
+def probe_page(driver: webdriver.Remote, loader_selectors: List[str] = DEFAULT_LOADER_SELECTORS) -> PageSnapshot:
+    """
+    Coleta dimensões, mídias, carregadores, atividade jQuery e altura de scroll da página.
+
+    Args:
+        driver: WebDriver com a página carregada
+        loader_selectors: Seletores CSS de elementos de carregamento
+
+    Returns:
+        Snapshot com o estado atual da página
+    """
+    data = driver.execute_script(PROBE_SCRIPT, ", ".join(loader_selectors)) or {}
+    return PageSnapshot.from_dict(data)
+
+
+def content_fingerprint(driver: webdriver.Remote) -> Optional[str]:
+    """
+    Calcula o hash do conteúdo normalizado da página (texto visível e imagens).
+
+    Args:
+        driver: WebDriver com a página carregada
+
+    Returns:
+        Hash SHA-256 em hexadecimal, ou None se a página tiver pouco conteúdo
+        para uma comparação confiável
+    """
+    data = driver.execute_script(FINGERPRINT_SCRIPT)
+    if not data or len(data.get("text") or "") < MIN_FINGERPRINT_TEXT:
+        return None
+
+    digest = hashlib.sha256()
+    digest.update(data["text"].encode("utf-8"))
+    for src in data.get("images") or []:
+        digest.update(b"\n")
+        digest.update(src.encode("utf-8"))
+    return digest.hexdigest()
@@ -0,0 +1,446 @@
+"""
+Módulo com o motor de prontidão de página, que substitui esperas fixas por sinais reais de carregamento.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+logger = logging.getLogger(__name__)
+
+# Script assíncrono executado na página. Na primeira execução instala observadores
+# (mutações no DOM, recursos de rede, fetch/XHR pendentes) que permanecem na página
+# e são reaproveitados pelas chamadas seguintes. Resolve assim que todos os sinais
+# estiverem estáveis pelo período de silêncio ou quando o prazo se esgotar.
+READINESS_SCRIPT = """
+var timeoutMs = arguments[0];
+var quietMs = arguments[1];
+var done = arguments[arguments.length - 1];
+var start = Date.now();
+
+var state = window.__printToPdfReadiness;
+if (!state) {
+    state = {
+        lastMutation: Date.now(),
+        lastResource: Date.now(),
+        lastHeightChange: Date.now(),
+        lastHeight: -1,
+        pendingRequests: 0
+    };
+    window.__printToPdfReadiness = state;
+
+    try {
+        new MutationObserver(function() {
+            state.lastMutation = Date.now();
+        }).observe(document.documentElement, {
+            childList: true,
+            subtree: true,
+            characterData: true,
+            attributes: true,
+            attributeFilter: ['src', 'srcset', 'href']
+        });
+    } catch (e) {}
+
+    try {
+        new PerformanceObserver(function() {
+            state.lastResource = Date.now();
+        }).observe({type: 'resource', buffered: false});
+    } catch (e) {}
+
+    try {
+        var originalFetch = window.fetch;
+        if (originalFetch) {
+            window.fetch = function() {
+                state.pendingRequests++;
+                return originalFetch.apply(this, arguments).finally(function() {
+                    state.pendingRequests--;
+                    state.lastResource = Date.now();
+                });
+            };
+        }
+        var originalSend = XMLHttpRequest.prototype.send;
+        XMLHttpRequest.prototype.send = function() {
+            state.pendingRequests++;
+            this.addEventListener('loadend', function() {
+                state.pendingRequests--;
+                state.lastResource = Date.now();
+            });
+            return originalSend.apply(this, arguments);
+        };
+    } catch (e) {}
+}
+
+var fontsReady = !(document.fonts && document.fonts.ready);
+if (!fontsReady) {
+    document.fonts.ready.then(function() { fontsReady = true; }, function() { fontsReady = true; });
+}
+
+// Imagens fora da tela com loading="lazy" só carregam com o scroll e não bloqueiam
+var imagesReady = false;
+Promise.all(Array.prototype.map.call(document.images, function(img) {
+    if (!img.complete) {
+        if (img.loading === 'lazy') {
+            return Promise.resolve();
+        }
+        return new Promise(function(resolve) {
+            img.addEventListener('load', resolve, {once: true});
+            img.addEventListener('error', resolve, {once: true});
+        }).then(function() {
+            return img.decode ? img.decode().catch(function() {}) : null;
+        });
+    }
+    if (img.naturalWidth > 0 && img.decode) {
+        return img.decode().catch(function() {});
+    }
+    return Promise.resolve();
+})).then(function() { imagesReady = true; }, function() { imagesReady = true; });
+
+function pendingSignals() {
+    var now = Date.now();
+    var pending = [];
+
+    var height = document.body ? document.body.scrollHeight : 0;
+    if (height !== state.lastHeight) {
+        state.lastHeight = height;
+        state.lastHeightChange = now;
+    }
+
+    if (document.readyState !== 'complete') pending.push('readyState');
+    if (!fontsReady) pending.push('fonts');
+    if (!imagesReady) pending.push('images');
+    if (state.pendingRequests > 0) pending.push('requests');
+    if (now - state.lastResource < quietMs) pending.push('network');
+    if (now - state.lastMutation < quietMs) pending.push('mutations');
+    if (now - state.lastHeightChange < quietMs) pending.push('height');
+    if (typeof jQuery !== 'undefined' && jQuery.active > 0) pending.push('jquery');
+    return pending;
+}
+
+(function check() {
+    var pending = pendingSignals();
+    var elapsed = Date.now() - start;
+    if (pending.length === 0 || elapsed >= timeoutMs) {
+        done({ready: pending.length === 0, pending: pending, elapsed: elapsed});
+        return;
+    }
+    setTimeout(check, 100);
+})();
+"""
+
+# Script assíncrono que consulta os carregadores visíveis sem bloquear a página:
+# cada verificação é agendada com setTimeout, liberando a thread principal para
+# continuar renderizando entre as consultas
+LOADER_WAIT_SCRIPT = """
+var selector = arguments[0];
+var timeoutMs = arguments[1];
+var intervalMs = arguments[2];
+var done = arguments[arguments.length - 1];
+var start = Date.now();
+
+function visibleLoaders() {
+    var count = 0;
+    var loaders = document.querySelectorAll(selector);
+    for (var i = 0; i < loaders.length; i++) {
+        var style = window.getComputedStyle(loaders[i]);
+        if (style.display !== 'none' && style.visibility !== 'hidden' && style.opacity !== '0') {
+            count++;
+        }
+    }
+    return count;
+}
+
+(function check() {
+    var count;
+    try {
+        count = visibleLoaders();
+    } catch (e) {
+        done({cleared: false, visible: -1, elapsed: Date.now() - start, error: String(e)});
+        return;
+    }
+    var elapsed = Date.now() - start;
+    if (count === 0 || elapsed >= timeoutMs) {
+        done({cleared: count === 0, visible: count, elapsed: elapsed});
+        return;
+    }
+    setTimeout(check, intervalMs);
+})();
+"""
+
+# Script assíncrono que percorre a página em passos do tamanho da viewport,
+# forçando o carregamento imediato de imagens e iframes com loading="lazy" e
+# de marcadores do tipo data-src, e acompanha as cargas pendentes. Resolve
+# assim que todas terminarem ou quando o orçamento se esgotar.
+LAZY_LOAD_SCRIPT = """
+var budgetMs = arguments[0];
+var stepPauseMs = arguments[1];
+var maxSteps = arguments[2];
+var done = arguments[arguments.length - 1];
+var start = Date.now();
+var pending = [];
+var steps = 0;
+
+var LAZY_ATTRIBUTES = [
+    ['data-src', 'src'], ['data-lazy-src', 'src'], ['data-original', 'src'],
+    ['data-srcset', 'srcset'], ['data-lazy-srcset', 'srcset']
+];
+
+// Iframes não expõem 'complete': um iframe já carregado aparece nas entradas de
+// recurso da página (ou tem o documento pronto, se for da mesma origem)
+function iframeLoaded(element) {
+    var src = element.src;
+    if (!src || src === 'about:blank') {
+        return true;
+    }
+    try {
+        var doc = element.contentDocument;
+        if (doc && doc.URL !== 'about:blank' && doc.readyState === 'complete') {
+            return true;
+        }
+    } catch (e) {}
+    return performance.getEntriesByName(src).length > 0;
+}
+
+// Iframes só contam como pendentes se o src acabou de ser atribuído a partir de
+// um atributo tardio ou se eram loading="lazy" e ainda não carregaram; os demais
+// já carregados não disparariam mais o evento load
+function track(element, assigned, wasLazy) {
+    if (element.__printToPdfTracked) {
+        return;
+    }
+    var isPending;
+    if (element.tagName === 'IFRAME') {
+        isPending = assigned || (wasLazy && !iframeLoaded(element));
+    } else {
+        isPending = !element.complete;
+    }
+    if (!isPending) {
+        return;
+    }
+    element.__printToPdfTracked = true;
+    pending.push(element);
+    var finish = function() {
+        var index = pending.indexOf(element);
+        if (index >= 0) {
+            pending.splice(index, 1);
+        }
+    };
+    element.addEventListener('load', finish, {once: true});
+    element.addEventListener('error', finish, {once: true});
+}
+
+function forceEager() {
+    var elements = document.querySelectorAll('img, iframe, picture source');
+    for (var i = 0; i < elements.length; i++) {
+        var element = elements[i];
+        var wasLazy = element.getAttribute('loading') === 'lazy';
+        if (wasLazy) {
+            element.setAttribute('loading', 'eager');
+        }
+        var assigned = false;
+        for (var j = 0; j < LAZY_ATTRIBUTES.length; j++) {
+            var value = element.getAttribute(LAZY_ATTRIBUTES[j][0]);
+            var target = LAZY_ATTRIBUTES[j][1];
+            if (value && element.getAttribute(target) !== value) {
+                element.setAttribute(target, value);
+                assigned = true;
+            }
+        }
+        if (element.tagName !== 'SOURCE') {
+            track(element, assigned, wasLazy);
+        }
+    }
+}
+
+function pageHeight() {
+    var body = document.body || document.documentElement;
+    return Math.max(body.scrollHeight, document.documentElement.scrollHeight);
+}
+
+function finish(timedOut) {
+    window.scrollTo(0, 0);
+    done({steps: steps, pending: pending.length, timedOut: timedOut, elapsed: Date.now() - start});
+}
+
+function waitPending() {
+    if (pending.length === 0) {
+        finish(false);
+        return;
+    }
+    if (Date.now() - start >= budgetMs) {
+        finish(true);
+        return;
+    }
+    setTimeout(waitPending, 100);
+}
+
+function step(y) {
+    if (Date.now() - start >= budgetMs) {
+        finish(true);
+        return;
+    }
+    window.scrollTo(0, y);
+    steps++;
+    // Dar tempo aos IntersectionObservers da página para reagir à nova posição
+    setTimeout(function() {
+        forceEager();
+        var next = y + Math.max(window.innerHeight, 1);
+        if (next < pageHeight() && steps < maxSteps) {
+            step(next);
+        } else {
+            waitPending();
+        }
+    }, stepPauseMs);
+}
+
+forceEager();
+step(0);
+"""
+
+
+class PageReadiness:
+    """Motor de prontidão que aguarda a página estabilizar, usando o tempo fixo apenas como limite superior."""
+
+    def __init__(self, quiet_period: float = 0.5):
+        """
+        Inicializa o motor de prontidão.
+
+        Args:
+            quiet_period: Tempo (segundos) sem atividade de rede, mutações no DOM
+                ou mudanças de altura para considerar a página estável
+        """
+        self.quiet_period = quiet_period
+
+    def wait(
+        self,
+        driver: webdriver.Remote,
+        timeout: float,
+        quiet_period: Optional[float] = None
+    ) -> bool:
+        """
+        Aguarda até a página estar pronta ou o tempo limite se esgotar.
+
+        Args:
+            driver: WebDriver com a página carregada
+            timeout: Tempo máximo de espera em segundos
+            quiet_period: Período de silêncio específico para esta espera
+
+        Returns:
+            True se a página estabilizou antes do limite, False caso contrário
+        """
+        if timeout <= 0:
+            return True
+
+        quiet = self.quiet_period if quiet_period is None else quiet_period
+        start_time = time.time()
+
+        try:
+            # O timeout de script precisa cobrir todo o prazo da espera
+            driver.set_script_timeout(timeout + 10)
+            result: Dict[str, Any] = driver.execute_async_script(
+                READINESS_SCRIPT, int(timeout * 1000), int(quiet * 1000)
+            ) or {}
+        except WebDriverException as e:
+            logger.warning(f"Erro ao aguardar prontidão da página: {str(e)}")
+            # Sem sinais confiáveis, manter o comportamento antigo até o limite
+            remaining = timeout - (time.time() - start_time)
+            if remaining > 0:
+                time.sleep(remaining)
+            return False
+
+        elapsed = time.time() - start_time
+        if result.get("ready"):
+            logger.info(f"Página pronta após {elapsed:.1f}s (limite {timeout}s)")
+            return True
+
+        logger.info(
+            f"Limite de {timeout}s atingido aguardando a página; "
+            f"sinais pendentes: {', '.join(result.get('pending', [])) or 'desconhecidos'}"
+        )
+        return False
+
+    def wait_for_loaders(
+        self,
+        driver: webdriver.Remote,
+        selectors: List[str],
+        timeout: float,
+        poll_interval: float = 0.25
+    ) -> bool:
+        """
+        Aguarda, sem bloquear a página, até que nenhum carregador esteja visível.
+
+        Args:
+            driver: WebDriver com a página carregada
+            selectors: Seletores CSS dos elementos de carregamento
+            timeout: Prazo máximo em segundos
+            poll_interval: Intervalo entre as verificações na página (segundos)
+
+        Returns:
+            True se os carregadores desapareceram dentro do prazo, False caso contrário
+        """
+        if not selectors or timeout <= 0:
+            return True
+
+        try:
+            driver.set_script_timeout(timeout + 10)
+            result: Dict[str, Any] = driver.execute_async_script(
+                LOADER_WAIT_SCRIPT, ", ".join(selectors), int(timeout * 1000), int(poll_interval * 1000)
+            ) or {}
+        except WebDriverException as e:
+            logger.warning(f"Erro ao verificar elementos de carregamento: {str(e)}")
+            return False
+
+        if result.get("error"):
+            logger.warning(f"Seletor de carregamento inválido: {result['error']}")
+            return False
+
+        if result.get("cleared"):
+            logger.debug(f"Carregadores ausentes após {result.get('elapsed', 0) / 1000:.1f}s")
+            return True
+
+        logger.info(f"Prazo de {timeout}s atingido com {result.get('visible')} carregador(es) visível(is)")
+        return False
+
+    def load_lazy_content(
+        self,
+        driver: webdriver.Remote,
+        budget: float,
+        step_pause: float = 0.15,
+        max_steps: int = 200
+    ) -> bool:
+        """
+        Percorre a página em passos do tamanho da viewport e aguarda o conteúdo tardio carregar.
+
+        Args:
+            driver: WebDriver com a página carregada
+            budget: Orçamento total em segundos (percurso e espera pelas cargas pendentes)
+            step_pause: Pausa após cada passo para a página reagir à rolagem (segundos)
+            max_steps: Número máximo de passos (limita páginas de rolagem infinita)
+
+        Returns:
+            True se todas as imagens e iframes carregaram dentro do orçamento, False caso contrário
+        """
+        if budget <= 0:
+            return True
+
+        try:
+            driver.set_script_timeout(budget + 10)
+            result: Dict[str, Any] = driver.execute_async_script(
+                LAZY_LOAD_SCRIPT, int(budget * 1000), int(step_pause * 1000), max_steps
+            ) or {}
+        except WebDriverException as e:
+            logger.warning(f"Erro ao carregar conteúdo tardio: {str(e)}")
+            return False
+
+        elapsed = result.get("elapsed", 0) / 1000
+        if not result.get("timedOut"):
+            logger.info(f"Conteúdo tardio carregado em {result.get('steps')} passo(s) e {elapsed:.1f}s")
+            return True
+
+        logger.info(
+            f"Orçamento de {budget}s atingido carregando conteúdo tardio "
+            f"({result.get('steps')} passo(s), {result.get('pending')} carga(s) pendente(s))"
+        )
+        return False
@@ -0,0 +1,106 @@
+"""
+Módulo com o watchdog de prazo por página, que encerra o navegador travado por fora da sessão WebDriver.
+"""
+
+import logging
+import os
+import signal
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from process_utils import process_tree_pids
+
+logger = logging.getLogger(__name__)
+
+# Argumentos do subprocesso do driver: nova sessão (e grupo de processos) para
+# que o driver e os navegadores iniciados por ele possam ser encerrados juntos
+DRIVER_POPEN_KW = {"start_new_session": True} if os.name == "posix" else {}
+
+
+def kill_process_group(root_pid: int):
+    """
+    Encerra à força o driver e todos os processos do navegador.
+
+    Mata o grupo de processos do driver (quando ele é líder de um grupo próprio)
+    e, em seguida, qualquer descendente que tenha saído do grupo.
+
+    Args:
+        root_pid: PID do processo do driver
+    """
+    if os.name != "posix":
+        try:
+            os.kill(root_pid, signal.SIGTERM)
+        except OSError:
+            pass
+        return
+
+    pids = process_tree_pids(root_pid) if os.path.isdir('/proc') else [root_pid]
+
+    try:
+        pgid = os.getpgid(root_pid)
+        # Nunca matar o grupo do próprio processo Python
+        if pgid != os.getpgrp():
+            os.killpg(pgid, signal.SIGKILL)
+    except OSError:
+        pass
+
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+class PageWatchdog:
+    """Impõe um prazo máximo de relógio para o processamento de cada página."""
+
+    def __init__(self, deadline: float):
+        """
+        Inicializa o watchdog.
+
+        Args:
+            deadline: Prazo máximo por página em segundos
+        """
+        self.deadline = deadline
+        self.expired = False
+
+    def _expire(self, pid: Optional[int], on_expire: Optional[Callable[[], None]]):
+        """
+        Encerra o navegador (ou apenas a aba) cujo prazo venceu.
+
+        Args:
+            pid: PID do processo do driver
+            on_expire: Ação executada no lugar de encerrar o processo
+        """
+        self.expired = True
+        if on_expire:
+            logger.error(f"Prazo de {self.deadline:.0f}s por página excedido, encerrando a aba")
+            on_expire()
+            return
+        logger.error(f"Prazo de {self.deadline:.0f}s por página excedido, encerrando o navegador (PID {pid})")
+        kill_process_group(pid)
+
+    @contextmanager
+    def guard(self, pid: Optional[int], on_expire: Optional[Callable[[], None]] = None) -> Iterator[None]:
+        """
+        Monitora um bloco de código; se o prazo vencer, o driver e o navegador são encerrados,
+        fazendo a chamada WebDriver bloqueada falhar.
+
+        Args:
+            pid: PID do processo do driver (None = sem monitoramento, exceto com on_expire)
+            on_expire: Ação executada no lugar de encerrar o processo (ex.: fechar apenas
+                a aba de um navegador compartilhado)
+        """
+        self.expired = False
+        if not pid and not on_expire:
+            yield
+            return
+
+        timer = threading.Timer(self.deadline, self._expire, args=(pid, on_expire))
+        timer.daemon = True
+        timer.start()
+        try:
+            yield
+        finally:
+            timer.cancel()
@@ -14,6 +14,9 @@ from PIL import Image
 from fpdf import FPDF
 from PyPDF2 import PdfMerger, PdfReader, PdfWriter
 
+from band_stitcher import StitchedImage
+from metrics import METRICS
+
 logger = logging.getLogger(__name__)
 
 class PDFGenerator:
@@ -30,21 +33,23 @@ class PDFGenerator:
     
     def image_to_pdf(
         self, 
-        image: Union[Image.Image, str], 
+        image: Union[Image.Image, StitchedImage, str], 
         output_path: str,
         dpi: Optional[int] = None,
         compress: bool = False,
-        quality: int = 95
+        quality: int = 95,
+        metric_kind: Optional[str] = "page"
     ) -> str:
         """
         Converte uma imagem em PDF de alta qualidade.
         
         Args:
-            image: Objeto PIL Image ou caminho para arquivo de imagem
+            image: Objeto PIL Image, StitchedImage (faixas em disco) ou caminho para arquivo de imagem
             output_path: Caminho para salvar o PDF resultante
             dpi: Resolução da imagem em DPI (pontos por polegada)
             compress: Se deve compactar o PDF
             quality: Qualidade da imagem (0-100) para compressão JPEG
+            metric_kind: Tipo do PDF na métrica de bytes gravados (None = arquivo temporário, não contado)
             
         Returns:
             Caminho do PDF gerado
@@ -54,6 +59,10 @@ class PDFGenerator:
             if dpi is None:
                 dpi = self.dpi
                 
+            # Imagens costuradas em faixas são escritas faixa a faixa
+            if isinstance(image, StitchedImage):
+                return self._stitched_image_to_pdf(image, output_path, dpi, compress, quality, metric_kind)
+                
             # Se for um caminho, abrir a imagem
             if isinstance(image, str):
                 image = Image.open(image)
@@ -117,6 +126,8 @@ class PDFGenerator:
             # Verificar se o PDF foi criado com sucesso
             if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
                 logger.info(f"PDF criado com sucesso: {output_path}")
+                if metric_kind:
+                    METRICS.inc("printtopdf_pdf_bytes_written_total", os.path.getsize(output_path), kind=metric_kind)
                 return output_path
             else:
                 logger.error(f"Falha ao criar PDF: {output_path}")
@@ -126,6 +137,66 @@ class PDFGenerator:
             logger.error(f"Erro ao converter imagem para PDF: {str(e)}")
             raise
     
+    def _stitched_image_to_pdf(
+        self,
+        image: StitchedImage,
+        output_path: str,
+        dpi: int,
+        compress: bool,
+        quality: int,
+        metric_kind: Optional[str] = "page"
+    ) -> str:
+        """
+        Converte uma imagem costurada em faixas em um PDF de página única.
+        
+        Cada faixa é posicionada na página em sua coordenada vertical, sem
+        montar a imagem completa em memória.
+        
+        Args:
+            image: Imagem costurada com as faixas em disco
+            output_path: Caminho para salvar o PDF resultante
+            dpi: Resolução da imagem em DPI
+            compress: Se deve compactar as faixas como JPEG
+            quality: Qualidade JPEG (0-100) quando compress=True
+            metric_kind: Tipo do PDF na métrica de bytes gravados (None = não contado)
+            
+        Returns:
+            Caminho do PDF gerado
+        """
+        width_px, height_px = image.size
+        width_pt = width_px * 72 / dpi
+        height_pt = height_px * 72 / dpi
+        
+        pdf = FPDF(unit="pt", format=[width_pt, height_pt])
+        pdf.set_auto_page_break(False)
+        pdf.add_page()
+        
+        for band_path, y_px, band_height_px in image.bands:
+            if compress:
+                # Converter apenas esta faixa para JPEG
+                jpeg_path = os.path.splitext(band_path)[0] + '.jpg'
+                with Image.open(band_path) as band:
+                    band.save(jpeg_path, format='JPEG', quality=quality, optimize=True)
+                band_path = jpeg_path
+            
+            pdf.image(band_path, 0, y_px * 72 / dpi, width_pt, band_height_px * 72 / dpi)
+        
+        # Criar diretório de saída se não existir
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+            
+        pdf.output(output_path)
+        
+        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+            logger.info(f"PDF criado com sucesso a partir de {len(image.bands)} faixas: {output_path}")
+            if metric_kind:
+                METRICS.inc("printtopdf_pdf_bytes_written_total", os.path.getsize(output_path), kind=metric_kind)
+            return output_path
+        
+        logger.error(f"Falha ao criar PDF: {output_path}")
+        return ""
+    
     def filter_valid_pdfs(self, pdf_paths: List[str]) -> List[str]:
         """
         Filtra a lista de caminhos para manter apenas PDFs válidos.
@@ -160,7 +231,8 @@ class PDFGenerator:
         self, 
         pdf_paths: List[str], 
         output_path: str,
-        add_bookmarks: bool = True
+        add_bookmarks: bool = True,
+        metric_kind: Optional[str] = "merged"
     ) -> Optional[str]:
         """
         Mescla múltiplos PDFs em um único arquivo, mantendo cada PDF como uma unidade completa.
@@ -169,6 +241,7 @@ class PDFGenerator:
             pdf_paths: Lista de caminhos para arquivos PDF
             output_path: Caminho para salvar o PDF mesclado
             add_bookmarks: Se deve adicionar marcadores para cada PDF
+            metric_kind: Tipo do PDF na métrica de bytes gravados (None = não contado)
             
         Returns:
             Caminho do PDF mesclado ou None se falhar
@@ -240,6 +313,8 @@ class PDFGenerator:
                     # Otimizar o PDF mesclado para reduzir espaços em branco
                     self._optimize_pdf(output_path)
                     
+                    if metric_kind:
+                        METRICS.inc("printtopdf_pdf_bytes_written_total", os.path.getsize(output_path), kind=metric_kind)
                     return output_path
                 else:
                     logger.error(f"Falha ao criar PDF mesclado: arquivo vazio ou não criado")
@@ -0,0 +1,202 @@
+"""
+Módulo com a verificação HTTP prévia (pre-flight) das URLs, executada antes da captura no navegador.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# User-Agent de navegador: muitos sites respondem de forma diferente a clientes HTTP genéricos
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0"
+)
+
+# Status que indicam bloqueio de robôs ou limitação temporária; o navegador
+# ainda pode conseguir carregar a página, então a URL segue para a captura
+INCONCLUSIVE_STATUS = {401, 403, 405, 406, 429, 503}
+
+# Tipos de conteúdo que o navegador renderiza como página
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+
+@dataclass
+class PreflightResult:
+    """Resultado da verificação prévia de uma URL."""
+
+    url: str
+    action: str = "capture"  # capture, reroute ou skip
+    reason: str = ""
+    status: Optional[int] = None
+    final_url: str = ""
+    content_type: str = ""
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def capture_url(self) -> Optional[str]:
+        """URL a ser capturada pelo navegador, ou None se a URL deve ser ignorada."""
+        if self.action == "skip":
+            return None
+        if self.action == "reroute":
+            return self.final_url
+        return self.url
+
+    def to_dict(self) -> Dict:
+        """Representação serializável em JSON."""
+        return asdict(self)
+
+
+def _same_site(host_a: str, host_b: str) -> bool:
+    """
+    Verifica se dois hosts pertencem ao mesmo site, ignorando o prefixo 'www.'.
+
+    Args:
+        host_a: Primeiro host
+        host_b: Segundo host
+
+    Returns:
+        True se forem o mesmo site, False caso contrário
+    """
+    def strip(host: str) -> str:
+        host = host.lower()
+        return host[4:] if host.startswith('www.') else host
+    return strip(host_a) == strip(host_b)
+
+
+class PreflightChecker:
+    """Verifica URLs com requisições HTTP leves (HEAD ou GET parcial) e conexões reutilizadas."""
+
+    def __init__(self, timeout: int = 15, max_workers: int = 16, user_agent: str = DEFAULT_USER_AGENT):
+        """
+        Inicializa o verificador.
+
+        Args:
+            timeout: Tempo limite de cada requisição em segundos
+            max_workers: Número de verificações simultâneas
+            user_agent: User-Agent enviado nas requisições
+        """
+        self.timeout = timeout
+        self.max_workers = max(1, max_workers)
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _request(self, url: str) -> requests.Response:
+        """
+        Faz a requisição leve: HEAD e, se o servidor não suportar, GET do primeiro byte.
+
+        Args:
+            url: URL a verificar
+
+        Returns:
+            Resposta HTTP (sem corpo)
+        """
+        response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+        if response.status_code >= 400:
+            # Alguns servidores não implementam HEAD ou respondem a ele de forma diferente
+            response.close()
+            response = self.session.get(
+                url,
+                timeout=self.timeout,
+                allow_redirects=True,
+                stream=True,
+                headers={"Range": "bytes=0-0"}
+            )
+            response.close()
+        return response
+
+    def check(self, url: str) -> PreflightResult:
+        """
+        Verifica uma URL e decide se ela deve ser capturada, redirecionada ou ignorada.
+
+        Args:
+            url: URL a verificar
+
+        Returns:
+            Resultado da verificação
+        """
+        result = PreflightResult(url=url)
+
+        try:
+            response = self._request(url)
+        except requests.exceptions.Timeout:
+            # Servidor lento não significa página morta; o navegador decide
+            result.reason = "timeout"
+            return result
+        except requests.RequestException as e:
+            result.action = "skip"
+            result.reason = f"erro de conexão: {type(e).__name__}"
+            return result
+
+        result.status = response.status_code
+        result.final_url = response.url
+        result.content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        result.headers = {
+            name: response.headers[name]
+            for name in ("ETag", "Last-Modified")
+            if name in response.headers
+        }
+
+        if response.status_code >= 400 and response.status_code not in INCONCLUSIVE_STATUS:
+            result.action = "skip"
+            result.reason = f"HTTP {response.status_code}"
+            return result
+
+        if not _same_site(urlparse(url).netloc, urlparse(response.url).netloc):
+            result.action = "skip"
+            result.reason = f"redirecionada para outro host: {urlparse(response.url).netloc}"
+            return result
+
+        if response.status_code < 400 and result.content_type and result.content_type not in HTML_CONTENT_TYPES:
+            result.action = "skip"
+            result.reason = f"conteúdo não HTML: {result.content_type}"
+            return result
+
+        if response.history and response.url != url:
+            result.action = "reroute"
+            result.reason = f"redirecionada (HTTP {response.history[0].status_code})"
+
+        return result
+
+    def check_many(self, urls: List[str]) -> List[PreflightResult]:
+        """
+        Verifica várias URLs em paralelo.
+
+        Args:
+            urls: URLs a verificar
+
+        Returns:
+            Resultados na mesma ordem das URLs
+        """
+        if not urls:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            results = list(executor.map(self.check, urls))
+
+        # Se nenhuma URL respondeu, o problema provavelmente é da rede local
+        # (proxy, firewall) e não do site: deixar o navegador decidir
+        if all(result.status is None and result.action == "skip" for result in results):
+            logger.warning("Nenhuma URL respondeu ao pre-flight; todas seguem para captura")
+            for result in results:
+                result.action = "capture"
+                result.reason = f"pre-flight inconclusivo ({result.reason})"
+
+        skipped = sum(1 for result in results if result.action == "skip")
+        rerouted = sum(1 for result in results if result.action == "reroute")
+        logger.info(
+            f"Pre-flight concluído: {len(results)} URLs, {skipped} ignoradas, {rerouted} redirecionadas"
+        )
+        return results
+
+    def close(self):
+        """Fecha as conexões da sessão HTTP."""
+        self.session.close()
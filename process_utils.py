@@ -0,0 +1,96 @@
+"""
+Módulo com funções utilitárias sobre os processos do sistema (existência, árvore de processos e memória).
+"""
+
+import os
+from typing import Dict, List, Optional
+
+
+def pid_alive(pid: int) -> bool:
+    """
+    Verifica se um processo existe.
+
+    Args:
+        pid: PID do processo
+
+    Returns:
+        True se o processo existe
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def read_parent_pids() -> Dict[int, int]:
+    """
+    Lê o PID do processo pai de todos os processos em /proc.
+
+    Returns:
+        Dicionário {pid: ppid}
+    """
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                stat = f.read()
+            # O nome do processo (campo 2) pode conter espaços e parênteses
+            fields = stat[stat.rindex(')') + 2:].split()
+            parents[int(entry)] = int(fields[1])
+        except (OSError, ValueError, IndexError):
+            continue
+    return parents
+
+
+def process_tree_pids(root_pid: int) -> List[int]:
+    """
+    Lista o processo informado e todos os seus descendentes.
+
+    Args:
+        root_pid: PID do processo raiz
+
+    Returns:
+        Lista de PIDs da árvore de processos
+    """
+    children: Dict[int, List[int]] = {}
+    for pid, ppid in read_parent_pids().items():
+        children.setdefault(ppid, []).append(pid)
+
+    tree = []
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        tree.append(pid)
+        pending.extend(children.get(pid, []))
+    return tree
+
+
+def process_tree_rss(root_pid: int) -> Optional[int]:
+    """
+    Soma a memória residente (RSS) de um processo e de seus descendentes.
+
+    Args:
+        root_pid: PID do processo raiz (por exemplo, o geckodriver/chromedriver)
+
+    Returns:
+        Memória residente total em bytes, ou None se /proc não estiver disponível
+    """
+    if not os.path.isdir('/proc'):
+        return None
+
+    total_kb = 0
+    for pid in process_tree_pids(root_pid):
+        try:
+            with open(f'/proc/{pid}/status', 'r') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+        except (OSError, ValueError, IndexError):
+            continue
+    return total_kb * 1024
@@ -0,0 +1,49 @@
+"""
+Módulo com a política de reciclagem do navegador, baseada em número de páginas e memória residente.
+"""
+
+import logging
+from typing import Optional
+
+from process_utils import process_tree_rss
+
+logger = logging.getLogger(__name__)
+
+
+class RecyclePolicy:
+    """Decide quando o navegador deve ser reiniciado entre páginas."""
+
+    def __init__(self, max_pages: int = 100, max_rss_mb: int = 3072):
+        """
+        Inicializa a política de reciclagem.
+
+        Args:
+            max_pages: Reiniciar após este número de páginas (0 = desativado)
+            max_rss_mb: Reiniciar quando a memória residente da árvore de processos
+                do navegador ultrapassar este valor em MB (0 = desativado)
+        """
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+
+    def should_recycle(self, pages_since_restart: int, driver_pid: Optional[int]) -> Optional[str]:
+        """
+        Verifica se o navegador deve ser reciclado.
+
+        Args:
+            pages_since_restart: Páginas processadas desde o último início do navegador
+            driver_pid: PID do processo do driver (pai do navegador)
+
+        Returns:
+            Motivo da reciclagem ou None se o navegador pode continuar
+        """
+        if self.max_pages and pages_since_restart >= self.max_pages:
+            return f"{pages_since_restart} páginas processadas"
+
+        if self.max_rss_mb and driver_pid:
+            rss = process_tree_rss(driver_pid)
+            if rss is not None:
+                rss_mb = rss / (1024 * 1024)
+                if rss_mb >= self.max_rss_mb:
+                    return f"memória residente de {rss_mb:.0f} MB"
+
+        return None
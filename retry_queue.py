@@ -0,0 +1,154 @@
+"""
+Módulo com a classificação de falhas de captura e a fila de novas tentativas adiadas.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Classes de falha
+FAILURE_TIMEOUT = "timeout"
+FAILURE_DRIVER_CRASH = "driver_crash"
+FAILURE_HTTP_ERROR = "http_error"
+FAILURE_BLANK_RENDER = "blank_render"
+FAILURE_DEADLINE = "deadline"
+FAILURE_OTHER = "other"
+
+# Número de novas tentativas permitidas por classe de falha; erros HTTP e
+# falhas desconhecidas raramente mudam de uma tentativa para outra, e uma
+# página que estourou o prazo provavelmente estouraria de novo
+DEFAULT_RETRY_BUDGETS: Dict[str, int] = {
+    FAILURE_TIMEOUT: 2,
+    FAILURE_DRIVER_CRASH: 2,
+    FAILURE_HTTP_ERROR: 1,
+    FAILURE_BLANK_RENDER: 2,
+    FAILURE_DEADLINE: 0,
+    FAILURE_OTHER: 1,
+}
+
+
+class CaptureError(Exception):
+    """Falha de captura de uma página, com a classe usada para decidir novas tentativas."""
+
+    def __init__(self, kind: str, message: str = ""):
+        """
+        Inicializa o erro.
+
+        Args:
+            kind: Classe da falha (timeout, driver_crash, http_error, blank_render, deadline ou other)
+            message: Descrição da falha
+        """
+        super().__init__(message or kind)
+        self.kind = kind
+
+
+class RetryPolicy:
+    """Define quantas novas tentativas cada classe de falha recebe e o intervalo entre elas."""
+
+    def __init__(
+        self,
+        budgets: Optional[Dict[str, int]] = None,
+        base_delay: float = 30,
+        max_delay: float = 600
+    ):
+        """
+        Inicializa a política.
+
+        Args:
+            budgets: Novas tentativas por classe de falha (padrão: DEFAULT_RETRY_BUDGETS)
+            base_delay: Intervalo antes da primeira nova tentativa em segundos (dobra a cada tentativa)
+            max_delay: Intervalo máximo entre tentativas em segundos
+        """
+        self.budgets = dict(DEFAULT_RETRY_BUDGETS)
+        if budgets:
+            self.budgets.update(budgets)
+        self.base_delay = max(0.0, base_delay)
+        self.max_delay = max(self.base_delay, max_delay)
+
+    def allows(self, kind: str, retries: int) -> bool:
+        """
+        Verifica se uma falha ainda tem tentativas disponíveis.
+
+        Args:
+            kind: Classe da falha
+            retries: Novas tentativas já realizadas
+
+        Returns:
+            True se uma nova tentativa é permitida
+        """
+        return retries < self.budgets.get(kind, 0)
+
+    def delay(self, retries: int) -> float:
+        """
+        Calcula o intervalo (backoff exponencial) antes da próxima tentativa.
+
+        Args:
+            retries: Novas tentativas já realizadas
+
+        Returns:
+            Intervalo em segundos
+        """
+        return min(self.base_delay * (2 ** retries), self.max_delay)
+
+
+class RetryQueue:
+    """
+    Fila de páginas que falharam, processada depois das páginas saudáveis.
+
+    Cada item só volta a ser tentado após o intervalo de backoff de sua classe
+    de falha, e é descartado quando o orçamento de tentativas se esgota.
+    """
+
+    def __init__(self, policy: Optional[RetryPolicy] = None):
+        """
+        Inicializa a fila.
+
+        Args:
+            policy: Política de novas tentativas
+        """
+        self.policy = policy or RetryPolicy()
+        self._pending: List[Tuple[float, int, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def push(self, item: Any, error: CaptureError, retries: int = 0) -> bool:
+        """
+        Agenda uma nova tentativa, se a classe da falha ainda tiver orçamento.
+
+        Args:
+            item: Item a tentar novamente
+            error: Falha ocorrida
+            retries: Novas tentativas já realizadas para o item
+
+        Returns:
+            True se o item foi agendado, False se as tentativas se esgotaram
+        """
+        if not self.policy.allows(error.kind, retries):
+            return False
+
+        delay = self.policy.delay(retries)
+        self._pending.append((time.monotonic() + delay, retries + 1, item))
+        logger.info(f"Nova tentativa ({error.kind}) agendada para daqui a {delay:.0f}s")
+        return True
+
+    def pop_due(self) -> List[Tuple[Any, int]]:
+        """
+        Aguarda até o próximo item vencer e retira todos os itens vencidos.
+
+        Returns:
+            Lista de (item, número da nova tentativa), vazia se a fila estiver vazia
+        """
+        if not self._pending:
+            return []
+
+        wait = min(due for due, _, _ in self._pending) - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+        now = time.monotonic()
+        due_items = [(item, retries) for due, retries, item in self._pending if due <= now]
+        self._pending = [entry for entry in self._pending if entry[0] > now]
+        return due_items
@@ -0,0 +1,216 @@
+"""
+Módulo com o manifesto da execução, um registro JSONL (só acréscimo) do resultado de cada página.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Status de página que dispensam nova captura ao retomar a execução
+COMPLETED_STATUS = ("captured", "duplicate", "cached")
+
+
+def file_sha256(path: str) -> str:
+    """
+    Calcula o SHA-256 de um arquivo.
+
+    Args:
+        path: Caminho do arquivo
+
+    Returns:
+        Hash em hexadecimal
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RunManifest:
+    """
+    Manifesto de uma execução, seguro para uso entre threads.
+
+    Cada linha é um objeto JSON gravado e sincronizado em disco assim que o
+    evento acontece, de modo que uma execução interrompida (queda do processo
+    ou da máquina) pode ser retomada a partir do último registro completo.
+
+    Cada processo grava apenas no seu arquivo: o principal ('<run_id>.jsonl')
+    ou o de uma fatia ('<run_id>-<fatia>.jsonl', com --processes ou na fila
+    distribuída). Ao abrir, os registros de todos os arquivos da execução são
+    reunidos, para que a retomada enxergue as páginas de todas as fatias.
+    """
+
+    def __init__(self, path: str, run_id: str):
+        """
+        Inicializa o manifesto, carregando os registros existentes de todos os arquivos da execução.
+
+        Args:
+            path: Caminho do arquivo JSONL
+            run_id: Identificador da execução
+        """
+        self.path = path
+        self.run_id = run_id
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        self._load()
+
+        output_dir = os.path.dirname(path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+    def _run_files(self) -> List[str]:
+        """
+        Lista os arquivos da execução (principal e fatias), do mais antigo ao mais recente.
+
+        Returns:
+            Caminhos existentes, incluindo o próprio arquivo
+        """
+        directory = os.path.dirname(self.path) or "."
+        prefix = os.path.join(glob.escape(directory), glob.escape(self.run_id))
+        paths = set(glob.glob(f"{prefix}.jsonl") + glob.glob(f"{prefix}-*.jsonl"))
+        if os.path.exists(self.path):
+            paths.add(self.path)
+        return sorted(paths, key=os.path.getmtime)
+
+    def _load(self):
+        """
+        Carrega o último registro de cada página de todos os arquivos da execução.
+
+        Uma última linha truncada é descartada do próprio arquivo; nos arquivos
+        das outras fatias (que podem estar sendo gravados agora) ela é apenas ignorada.
+        """
+        files = self._run_files()
+        for path in files:
+            if os.path.abspath(path) == os.path.abspath(self.path):
+                with open(path, 'rb+') as f:
+                    content = f.read()
+                    if content and not content.endswith(b"\n"):
+                        # Linha incompleta gravada por uma execução interrompida
+                        f.truncate(content.rfind(b"\n") + 1)
+
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get("type") == "page":
+                        self.pages[record["url"]] = record
+        if files:
+            logger.info(f"Manifesto carregado: {len(self.pages)} páginas registradas em {len(files)} arquivo(s) da execução {self.run_id}")
+
+    def _append(self, record_type: str, fields: Dict[str, Any]):
+        """
+        Acrescenta um registro ao arquivo. Deve ser chamado com o lock adquirido.
+
+        Args:
+            record_type: Tipo do registro ('run', 'resume', 'page' ou 'finish')
+            fields: Campos do registro
+        """
+        record = {
+            "type": record_type,
+            "run_id": self.run_id,
+            "timestamp": datetime.now().isoformat(timespec='seconds'),
+            **fields
+        }
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def start(self, options: Dict[str, Any], resumed: bool = False):
+        """
+        Registra o início (ou a retomada) da execução.
+
+        Args:
+            options: Configurações da execução
+            resumed: Se a execução está sendo retomada
+        """
+        with self._lock:
+            self._append("resume" if resumed else "run", {"options": options})
+
+    def record_page(
+        self,
+        domain: str,
+        url: str,
+        status: str,
+        pdf_path: Optional[str] = None,
+        duration: float = 0.0,
+        error: str = "",
+        failure_kind: str = ""
+    ):
+        """
+        Registra o resultado de uma página.
+
+        Args:
+            domain: Domínio da página
+            url: URL da página
+            status: 'captured', 'duplicate', 'cached' ou 'failed'
+            pdf_path: PDF gerado ou reaproveitado
+            duration: Tempo gasto na página em segundos
+            error: Descrição do erro, em caso de falha
+            failure_kind: Classe da falha (timeout, driver_crash, http_error, blank_render, other)
+        """
+        checksum = None
+        if pdf_path and os.path.exists(pdf_path):
+            checksum = file_sha256(pdf_path)
+
+        with self._lock:
+            attempts = self.pages.get(url, {}).get("attempts", 0)
+            if status != "cached":
+                attempts += 1
+            record = {
+                "domain": domain,
+                "url": url,
+                "status": status,
+                "attempts": attempts,
+                "duration": round(duration, 3),
+                "pdf_path": pdf_path,
+                "sha256": checksum,
+                "error": error,
+                "failure_kind": failure_kind
+            }
+            self._append("page", record)
+            self.pages[url] = record
+
+    def completed_pdf(self, url: str) -> Optional[str]:
+        """
+        Verifica se a página já foi concluída e se o PDF registrado está íntegro.
+
+        Args:
+            url: URL da página
+
+        Returns:
+            Caminho do PDF se a página não precisa ser capturada novamente, ou None
+        """
+        with self._lock:
+            record = self.pages.get(url)
+        if not record or record.get("status") not in COMPLETED_STATUS:
+            return None
+
+        pdf_path = record.get("pdf_path")
+        if not pdf_path or not os.path.exists(pdf_path):
+            return None
+        if record.get("sha256") and file_sha256(pdf_path) != record["sha256"]:
+            logger.warning(f"PDF de {url} alterado desde o registro no manifesto, recapturando")
+            return None
+        return pdf_path
+
+    def finish(self, summary: Dict[str, Any]):
+        """
+        Registra o término da execução com os totais.
+
+        Args:
+            summary: Totais da execução
+        """
+        with self._lock:
+            self._append("finish", {"totals": summary})
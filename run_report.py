@@ -0,0 +1,222 @@
+"""
+Módulo com o relatório de execução, que consolida estatísticas de uma execução do PrintToPDF.
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List
+
+from stage_timings import summarize
+
+logger = logging.getLogger(__name__)
+
+
+class RunReport:
+    """Relatório de execução com contadores por domínio, seguro para uso entre threads."""
+
+    def __init__(self):
+        """Inicializa o relatório vazio."""
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.domains: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _domain(self, domain: str) -> Dict[str, Any]:
+        """
+        Obtém (ou cria) as estatísticas de um domínio. Deve ser chamado com o lock adquirido.
+
+        Args:
+            domain: Domínio
+
+        Returns:
+            Dicionário de estatísticas do domínio
+        """
+        if domain not in self.domains:
+            self.domains[domain] = {
+                "pages": 0,
+                "network": {
+                    "blocked_requests": 0,
+                    "transferred_bytes": 0
+                },
+                "preflight": {
+                    "capture": 0,
+                    "reroute": 0,
+                    "skip": 0,
+                    "urls": []
+                },
+                "duplicates": [],
+                "cached": 0,
+                "failures": [],
+                "page_timings": [],
+                "merge_seconds": 0.0
+            }
+        return self.domains[domain]
+
+    def record_network(self, domain: str, stats: Dict[str, int]):
+        """
+        Registra as estatísticas de rede de uma página.
+
+        Args:
+            domain: Domínio da página
+            stats: Dicionário com 'blocked_requests' e 'transferred_bytes'
+        """
+        with self._lock:
+            data = self._domain(domain)
+            data["pages"] += 1
+            for key in ("blocked_requests", "transferred_bytes"):
+                data["network"][key] += int(stats.get(key, 0))
+
+    def record_preflight(self, domain: str, result: Dict[str, Any]):
+        """
+        Registra o resultado da verificação prévia (pre-flight) de uma URL.
+
+        URLs capturadas sem alteração só entram nos contadores; as redirecionadas
+        e ignoradas são listadas com status, URL final e tipo de conteúdo.
+
+        Args:
+            domain: Domínio da URL
+            result: Resultado da verificação (PreflightResult.to_dict())
+        """
+        with self._lock:
+            preflight = self._domain(domain)["preflight"]
+            action = result.get("action", "capture")
+            preflight[action] = preflight.get(action, 0) + 1
+            if action != "capture":
+                preflight["urls"].append({
+                    key: result.get(key)
+                    for key in ("url", "action", "reason", "status", "final_url", "content_type")
+                })
+
+    def record_duplicate(self, domain: str, url: str, original_pdf: str):
+        """
+        Registra uma página cujo conteúdo já havia sido capturado em outra URL.
+
+        Args:
+            domain: Domínio da página
+            url: URL da página duplicada
+            original_pdf: PDF reaproveitado
+        """
+        with self._lock:
+            self._domain(domain)["duplicates"].append({"url": url, "original_pdf": original_pdf})
+
+    def record_cached(self, domain: str, count: int):
+        """
+        Registra as páginas reaproveitadas de uma execução anterior (modo incremental).
+
+        Args:
+            domain: Domínio das páginas
+            count: Número de páginas inalteradas
+        """
+        with self._lock:
+            self._domain(domain)["cached"] += count
+
+    def record_failure(self, domain: str, url: str, kind: str, attempts: int):
+        """
+        Registra uma página que falhou depois de esgotar as novas tentativas.
+
+        Args:
+            domain: Domínio da página
+            url: URL da página
+            kind: Classe da falha
+            attempts: Número total de tentativas
+        """
+        with self._lock:
+            self._domain(domain)["failures"].append({"url": url, "kind": kind, "attempts": attempts})
+
+    def record_timings(self, domain: str, row: Dict[str, Any]):
+        """
+        Registra os tempos por etapa de uma página.
+
+        Args:
+            domain: Domínio da página
+            row: Registro da página (PageTimings.to_row)
+        """
+        with self._lock:
+            self._domain(domain)["page_timings"].append(row)
+
+    def record_merge(self, domain: str, seconds: float):
+        """
+        Registra o tempo gasto na mesclagem dos PDFs de um domínio.
+
+        Args:
+            domain: Domínio
+            seconds: Duração da mesclagem em segundos
+        """
+        with self._lock:
+            self._domain(domain)["merge_seconds"] += seconds
+
+    def page_timings(self) -> List[Dict[str, Any]]:
+        """
+        Lista os tempos por etapa de todas as páginas, agrupados por domínio.
+
+        Returns:
+            Registros das páginas (PageTimings.to_row)
+        """
+        with self._lock:
+            return [row for data in self.domains.values() for row in data["page_timings"]]
+
+    def merge_domains(self, domains: Dict[str, Dict[str, Any]]):
+        """
+        Incorpora as estatísticas por domínio de outro relatório (por exemplo, de outro processo).
+
+        Args:
+            domains: Estatísticas por domínio (RunReport.domains)
+        """
+        with self._lock:
+            self.domains.update(domains)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Gera a representação do relatório com os totais da execução.
+
+        Returns:
+            Dicionário serializável em JSON
+        """
+        with self._lock:
+            totals = {"pages": 0, "blocked_requests": 0, "transferred_bytes": 0, "preflight_skipped": 0, "duplicates": 0, "cached": 0, "failed": 0}
+            for data in self.domains.values():
+                totals["pages"] += data["pages"]
+                totals["preflight_skipped"] += data["preflight"]["skip"]
+                totals["duplicates"] += len(data["duplicates"])
+                totals["cached"] += data["cached"]
+                totals["failed"] += len(data["failures"])
+                totals["blocked_requests"] += data["network"]["blocked_requests"]
+                totals["transferred_bytes"] += data["network"]["transferred_bytes"]
+
+            # Os registros de cada página vão para o arquivo de tempos; aqui fica só o resumo
+            domains = {}
+            for domain, data in self.domains.items():
+                domains[domain] = {key: value for key, value in data.items() if key not in ("page_timings", "merge_seconds")}
+                domains[domain]["stage_timings"] = {
+                    **summarize(data["page_timings"]),
+                    "merge": round(data["merge_seconds"], 3)
+                }
+
+            return {
+                "started_at": self.started_at,
+                "finished_at": datetime.now().isoformat(timespec='seconds'),
+                "totals": totals,
+                "domains": json.loads(json.dumps(domains))
+            }
+
+    def write(self, output_path: str) -> str:
+        """
+        Salva o relatório em JSON.
+
+        Args:
+            output_path: Caminho do arquivo de saída
+
+        Returns:
+            Caminho do relatório salvo
+        """
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        with open(output_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+        logger.info(f"Relatório de execução salvo em: {output_path}")
+        return output_path
@@ -4,7 +4,7 @@ Módulo para processamento de arquivos sitemap XML e extração de URLs.
 
 import logging
 import requests
-from typing import List, Set, Optional
+from typing import Dict, List, Set, Optional
 import xml.etree.ElementTree as ET
 from urllib.parse import urlparse
 
@@ -21,6 +21,8 @@ class SitemapParser:
             timeout: Tempo limite para requisições em segundos
         """
         self.timeout = timeout
+        # Valor de <lastmod> de cada URL extraída, quando o sitemap o informa
+        self.lastmod: Dict[str, str] = {}
         
     def is_sitemap_url(self, url: str) -> bool:
         """
@@ -83,16 +85,21 @@ class SitemapParser:
                         
             else:
                 # É um sitemap regular (contém <url> tags)
-                url_elements = root.findall('.//sm:url/sm:loc', namespaces)
-                if not url_elements:
+                entries = [
+                    (entry.find('sm:loc', namespaces), entry.find('sm:lastmod', namespaces))
+                    for entry in root.findall('.//sm:url', namespaces)
+                ]
+                if not entries:
                     # Tentar sem namespace (alguns sitemaps não usam)
-                    url_elements = root.findall('.//url/loc')
+                    entries = [(entry.find('loc'), entry.find('lastmod')) for entry in root.findall('.//url')]
                 
-                # Extrair URLs
-                for url_elem in url_elements:
-                    url = url_elem.text.strip() if url_elem.text else ""
+                # Extrair URLs e a data de modificação informada
+                for url_elem, lastmod_elem in entries:
+                    url = url_elem.text.strip() if url_elem is not None and url_elem.text else ""
                     if url:
                         urls.append(url)
+                        if lastmod_elem is not None and lastmod_elem.text:
+                            self.lastmod[url] = lastmod_elem.text.strip()
                 
                 logger.info(f"Extraídas {len(urls)} URLs do sitemap")
             
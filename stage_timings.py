@@ -0,0 +1,178 @@
+"""
+Módulo com os tempos de cada etapa da captura de uma página e o resumo estatístico por domínio.
+"""
+
+import csv
+import json
+import logging
+import math
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+# Etapas medidas em cada página, na ordem em que acontecem
+STAGES = (
+    "browser_restart",  # reciclagem ou reinício do navegador antes da página
+    "navigation",       # driver.get até o documento carregar
+    "readiness",        # esperas de prontidão (rede, DOM, fontes, indicadores de carregamento)
+    "fingerprint",      # hash do conteúdo para detectar páginas duplicadas
+    "scroll",           # rolagem para carregar o conteúdo tardio
+    "pause",            # pausa de vídeos e animações, ajuste de elementos fixos
+    "screenshot",       # captura (ou impressão) no navegador e transferência da imagem
+    "png_decode",       # decodificação dos PNGs recebidos
+    "pdf_encode",       # conversão da imagem em PDF e gravação (image_to_pdf)
+)
+
+# Contadores de cada página
+COUNTERS = ("capture_bytes", "pdf_bytes", "transferred_bytes", "image_width", "image_height")
+
+# Colunas do CSV
+CSV_COLUMNS = ("domain", "url", "status", "failure_kind", "total") + STAGES + COUNTERS
+
+
+class PageTimings:
+    """
+    Tempos e contadores da captura de uma página.
+
+    As etapas podem ser aninhadas: o tempo de uma etapa interna é descontado
+    da etapa externa, de modo que a soma das etapas nunca passa do total.
+    """
+
+    def __init__(self):
+        """Inicializa a medição; o tempo total conta a partir daqui."""
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self._nested: List[float] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Mede uma etapa (o tempo é somado ao de execuções anteriores da mesma etapa).
+
+        Args:
+            name: Nome da etapa (um de STAGES)
+        """
+        start = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            inner = self._nested.pop()
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed - inner
+            if self._nested:
+                self._nested[-1] += elapsed
+
+    def add(self, name: str, value: int):
+        """
+        Soma um valor a um contador (bytes).
+
+        Args:
+            name: Nome do contador
+            value: Valor a somar
+        """
+        self.counters[name] = self.counters.get(name, 0) + int(value)
+
+    def record_max(self, name: str, value: int):
+        """
+        Guarda o maior valor de um contador (dimensões de imagem, com vários viewports).
+
+        Args:
+            name: Nome do contador
+            value: Valor observado
+        """
+        self.counters[name] = max(self.counters.get(name, 0), int(value))
+
+    def to_row(self, domain: str, url: str, status: str, failure_kind: str = "") -> Dict[str, Any]:
+        """
+        Gera o registro da página, com o tempo total medido até agora.
+
+        Args:
+            domain: Domínio da página
+            url: URL da página
+            status: 'captured', 'duplicate' ou 'failed'
+            failure_kind: Classe da falha, em caso de falha
+
+        Returns:
+            Dicionário com as colunas de CSV_COLUMNS (tempos em segundos)
+        """
+        row: Dict[str, Any] = {
+            "domain": domain,
+            "url": url,
+            "status": status,
+            "failure_kind": failure_kind,
+            "total": round(time.perf_counter() - self.started, 3)
+        }
+        for name in STAGES:
+            row[name] = round(self.stages.get(name, 0.0), 3)
+        for name in COUNTERS:
+            row[name] = self.counters.get(name, 0)
+        return row
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """
+    Calcula um percentil pelo método do posto mais próximo.
+
+    Args:
+        sorted_values: Valores em ordem crescente (não vazio)
+        fraction: Percentil entre 0 e 1
+
+    Returns:
+        Valor do percentil
+    """
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize(rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """
+    Resume os tempos de um conjunto de páginas com p50, p95 e máximo de cada etapa.
+
+    Args:
+        rows: Registros das páginas (PageTimings.to_row)
+
+    Returns:
+        Dicionário {etapa: {'p50', 'p95', 'max'}}, incluindo o total
+    """
+    summary = {}
+    if not rows:
+        return summary
+    for name in ("total",) + STAGES:
+        values = sorted(float(row.get(name, 0)) for row in rows)
+        summary[name] = {
+            "p50": round(_percentile(values, 0.5), 3),
+            "p95": round(_percentile(values, 0.95), 3),
+            "max": round(values[-1], 3)
+        }
+    return summary
+
+
+def write_timings(rows: List[Dict[str, Any]], jsonl_path: str, csv_path: str):
+    """
+    Salva os registros das páginas em JSONL e CSV.
+
+    Args:
+        rows: Registros das páginas (PageTimings.to_row)
+        jsonl_path: Caminho do arquivo JSONL
+        csv_path: Caminho do arquivo CSV
+    """
+    for path in (jsonl_path, csv_path):
+        output_dir = os.path.dirname(path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+    with open(jsonl_path, 'w') as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+
+    logger.info(f"Tempos por etapa de {len(rows)} páginas salvos em {jsonl_path} e {csv_path}")
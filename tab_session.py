@@ -0,0 +1,411 @@
+"""
+Módulo com a sessão de navegador compartilhada por várias abas, cada uma usada por um WebCrawler.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Callable, List, Optional, Tuple
+
+from selenium import webdriver
+from selenium.common.exceptions import JavascriptException, TimeoutException, WebDriverException
+
+from page_watchdog import kill_process_group
+from recycle_policy import RecyclePolicy
+
+logger = logging.getLogger(__name__)
+
+# Intervalo entre consultas à página durante navegações e scripts assíncronos (segundos);
+# entre duas consultas a sessão fica livre para as outras abas
+TAB_POLL_INTERVAL = 0.1
+
+# Espera pela sessão ao fechar uma aba que excedeu o prazo da página (segundos); se
+# um comando travado não liberar a sessão nesse intervalo, o navegador é encerrado
+TAB_ABANDON_GRACE = 30
+
+# Inicia um script assíncrono (que chama o último argumento ao terminar) sem
+# bloquear a sessão: o resultado fica guardado na página até ser consultado
+ASYNC_START_TEMPLATE = """
+var callId = arguments[0];
+var results = window.__printToPdfAsyncResults = window.__printToPdfAsyncResults || {};
+var args = Array.prototype.slice.call(arguments, 1);
+args.push(function(value) {
+    results[callId] = {value: value};
+});
+(function() {
+%s
+}).apply(window, args);
+"""
+
+# Consulta o resultado de um script assíncrono iniciado por ASYNC_START_TEMPLATE
+ASYNC_POLL_SCRIPT = """
+var results = window.__printToPdfAsyncResults;
+if (!results) {
+    return {lost: true};
+}
+var entry = results[arguments[0]];
+if (!entry) {
+    return {done: false};
+}
+delete results[arguments[0]];
+return {done: true, value: entry.value};
+"""
+
+# Marca o documento atual, para distinguir o documento novo após a navegação
+MARK_DOCUMENT_SCRIPT = "window.__printToPdfPreviousDocument = true;"
+
+NAVIGATION_STATE_SCRIPT = "return window.__printToPdfPreviousDocument ? 'previous' : document.readyState;"
+
+
+class TabDriver:
+    """
+    WebDriver de uma aba, usado pelo WebCrawler no lugar de um navegador próprio.
+
+    Cada comando adquire a sessão e ativa a aba antes de ser executado; as
+    esperas longas (navegação e scripts assíncronos) são feitas em consultas
+    curtas, liberando a sessão para as outras abas entre elas.
+    """
+
+    def __init__(self, session: "TabSession", driver: webdriver.Remote, handle: str):
+        """
+        Inicializa a aba.
+
+        Args:
+            session: Sessão dona da aba
+            driver: Navegador da sessão
+            handle: Identificador da janela (aba)
+        """
+        self._session = session
+        self._driver = driver
+        self._handle = handle
+        self._script_timeout = 30.0
+        self._abandoned = False
+
+    def _run(self, command: Callable[[], Any]) -> Any:
+        """
+        Executa um comando do WebDriver na aba, com a sessão adquirida.
+
+        Args:
+            command: Função que executa o comando no navegador
+
+        Returns:
+            Resultado do comando
+
+        Raises:
+            WebDriverException: Se o comando falhar ou o navegador não responder
+        """
+        with self._session.lock:
+            if self._abandoned:
+                raise WebDriverException("Aba encerrada pelo prazo da página")
+            if self._driver is not self._session.driver:
+                raise WebDriverException("Navegador da aba foi encerrado")
+            try:
+                self._session.activate(self._driver, self._handle)
+                return command()
+            except WebDriverException:
+                raise
+            except Exception as e:
+                # Navegador encerrado (ex.: pelo watchdog): a conexão com o driver falha
+                raise WebDriverException(f"Falha de comunicação com o navegador: {str(e)}") from e
+
+    def _call(self, name: str, *args, **kwargs) -> Any:
+        return self._run(lambda: getattr(self._driver, name)(*args, **kwargs))
+
+    def __getattr__(self, name: str) -> Any:
+        # Propriedades como current_url executam comandos e precisam da aba ativa
+        if isinstance(getattr(type(self._driver), name, None), property):
+            return self._run(lambda: getattr(self._driver, name))
+
+        attribute = getattr(self._driver, name)
+        if not callable(attribute):
+            return attribute
+        return lambda *args, **kwargs: self._call(name, *args, **kwargs)
+
+    def set_script_timeout(self, time_to_wait: float):
+        """
+        Define o prazo dos scripts assíncronos desta aba.
+
+        Args:
+            time_to_wait: Prazo em segundos
+        """
+        self._script_timeout = time_to_wait
+
+    def execute_async_script(self, script: str, *args) -> Any:
+        """
+        Executa um script assíncrono sem bloquear a sessão durante a espera.
+
+        Args:
+            script: Script que chama o último argumento com o resultado
+
+        Returns:
+            Resultado do script
+
+        Raises:
+            TimeoutException: Se o script não terminar no prazo
+            JavascriptException: Se a página for descarregada antes do resultado
+        """
+        call_id = uuid.uuid4().hex
+        deadline = time.monotonic() + self._script_timeout
+        self._call("execute_script", ASYNC_START_TEMPLATE % script, call_id, *args)
+
+        while True:
+            state = self._call("execute_script", ASYNC_POLL_SCRIPT, call_id) or {}
+            if state.get("done"):
+                return state.get("value")
+            if state.get("lost"):
+                raise JavascriptException("Página descarregada durante a execução do script assíncrono")
+            if time.monotonic() >= deadline:
+                raise TimeoutException(f"Script assíncrono excedeu o prazo de {self._script_timeout:.0f}s")
+            time.sleep(TAB_POLL_INTERVAL)
+
+    def get(self, url: str):
+        """
+        Navega até a URL e aguarda o carregamento sem bloquear a sessão.
+
+        O navegador da sessão usa a estratégia de carregamento 'none', então a
+        navegação retorna imediatamente e o carregamento é acompanhado por consultas.
+
+        Args:
+            url: URL da página
+
+        Raises:
+            TimeoutException: Se a página não carregar no prazo
+        """
+        deadline = time.monotonic() + self._session.page_load_timeout
+        try:
+            self._call("execute_script", MARK_DOCUMENT_SCRIPT)
+        except JavascriptException:
+            pass
+        self._call("get", url)
+
+        while True:
+            try:
+                if self._call("execute_script", NAVIGATION_STATE_SCRIPT) == "complete":
+                    return
+            except JavascriptException:
+                # Contexto da página trocado no meio da navegação
+                pass
+            if time.monotonic() >= deadline:
+                raise TimeoutException(f"Timeout de {self._session.page_load_timeout}s ao carregar {url}")
+            time.sleep(TAB_POLL_INTERVAL)
+
+    @property
+    def stale(self) -> bool:
+        """Se a aba foi encerrada ou o seu navegador foi substituído (reciclagem ou reinício da sessão)."""
+        return self._abandoned or self._driver is not self._session.driver
+
+    def abandon(self):
+        """
+        Fecha a aba no meio da página em andamento (prazo da página excedido).
+
+        Chamado por outra thread (o watchdog); os comandos seguintes da aba falham,
+        enquanto as outras abas continuam no mesmo navegador.
+        """
+        self._abandoned = True
+        self._session.abandon_tab(self._driver, self._handle)
+
+    def quit(self):
+        """Fecha a aba (o navegador da sessão continua aberto para as outras abas)."""
+        if not self._abandoned:
+            self._session.close_tab(self._driver, self._handle)
+
+
+class TabSession:
+    """
+    Navegador compartilhado por várias abas.
+
+    Os comandos do WebDriver de uma sessão são executados um de cada vez, na
+    aba ativa; a sessão serializa os comandos e troca de aba quando necessário,
+    enquanto as esperas de cada aba acontecem fora dela. Se o navegador morrer,
+    ele é reiniciado na abertura da próxima aba.
+
+    A reciclagem por número de páginas e memória vale para o navegador inteiro:
+    quando a política pede um reinício, novas páginas aguardam as abas
+    terminarem as páginas em andamento e o navegador é reiniciado uma única vez.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], webdriver.Remote],
+        page_load_timeout: float,
+        profile_path: Optional[str] = None
+    ):
+        """
+        Inicializa a sessão (o navegador é iniciado na abertura da primeira aba).
+
+        Args:
+            factory: Função que cria o navegador (com a estratégia de carregamento 'none')
+            page_load_timeout: Timeout de carregamento de página em segundos
+            profile_path: Perfil persistente usado pelo navegador da sessão (None = temporário)
+        """
+        self.factory = factory
+        self.page_load_timeout = page_load_timeout
+        self.profile_path = profile_path
+        self.lock = threading.RLock()
+        self.driver: Optional[webdriver.Remote] = None
+        self.tab_count = 0
+        self._free_handles: List[str] = []
+        self._active: Optional[Tuple[int, str]] = None
+        self._idle = threading.Condition(self.lock)
+        self._pages_in_progress = 0
+        self._recycle_reason: Optional[str] = None
+        self.pages_since_restart = 0
+
+    def activate(self, driver: webdriver.Remote, handle: str):
+        """
+        Torna a aba ativa, se ainda não for. Deve ser chamado com o lock adquirido.
+
+        Args:
+            driver: Navegador da sessão
+            handle: Identificador da aba
+        """
+        if self._active != (id(driver), handle):
+            driver.switch_to.window(handle)
+            self._active = (id(driver), handle)
+
+    def _live_driver(self) -> webdriver.Remote:
+        """
+        Obtém o navegador da sessão, iniciando um novo se ele não responder.
+
+        Returns:
+            Navegador da sessão
+        """
+        if self.driver is not None:
+            try:
+                self.driver.window_handles
+                return self.driver
+            except Exception as e:
+                logger.warning(f"Navegador compartilhado não responde, reiniciando: {str(e)}")
+                try:
+                    self.driver.quit()
+                except Exception:
+                    pass
+
+        self.driver = self.factory()
+        self._free_handles = list(self.driver.window_handles)
+        self._active = None
+        self.tab_count = 0
+        self.pages_since_restart = 0
+        return self.driver
+
+    def _driver_pid(self) -> Optional[int]:
+        try:
+            return self.driver.service.process.pid
+        except AttributeError:
+            return None
+
+    def begin_page(self, recycle_policy: Optional[RecyclePolicy]) -> Optional[str]:
+        """
+        Registra o início de uma página em uma aba, reciclando o navegador se necessário.
+
+        Se a política pedir a reciclagem, aguarda as outras abas terminarem as
+        páginas em andamento e encerra o navegador; as abas abertas nele ficam
+        obsoletas (TabDriver.stale) e precisam ser reabertas. Cada chamada deve
+        ser seguida de end_page() quando a página terminar.
+
+        Args:
+            recycle_policy: Política de reciclagem (None = desativada)
+
+        Returns:
+            Motivo da reciclagem, se esta chamada encerrou o navegador, ou None
+        """
+        with self._idle:
+            if recycle_policy and self.driver is not None and not self._recycle_reason:
+                self._recycle_reason = recycle_policy.should_recycle(self.pages_since_restart, self._driver_pid())
+
+            reason = None
+            if self._recycle_reason:
+                self._idle.wait_for(lambda: self._pages_in_progress == 0 or not self._recycle_reason)
+                reason, self._recycle_reason = self._recycle_reason, None
+                self._idle.notify_all()
+                if reason:
+                    logger.info(f"Reciclando o navegador compartilhado por {self.tab_count} abas: {reason}")
+                    self.close()
+
+            self._pages_in_progress += 1
+            self.pages_since_restart += 1
+            return reason
+
+    def end_page(self):
+        """Registra o fim de uma página iniciada com begin_page()."""
+        with self._idle:
+            self._pages_in_progress -= 1
+            self._idle.notify_all()
+
+    def open_tab(self) -> TabDriver:
+        """
+        Abre uma nova aba no navegador da sessão.
+
+        Returns:
+            WebDriver da aba
+        """
+        with self.lock:
+            driver = self._live_driver()
+            if self._free_handles:
+                handle = self._free_handles.pop(0)
+                self.activate(driver, handle)
+            else:
+                driver.switch_to.new_window('tab')
+                handle = driver.current_window_handle
+                self._active = (id(driver), handle)
+            self.tab_count += 1
+            logger.debug(f"Aba {handle} aberta ({self.tab_count} abas no navegador)")
+            return TabDriver(self, driver, handle)
+
+    def close_tab(self, driver: webdriver.Remote, handle: str):
+        """
+        Fecha uma aba. A última aba fica aberta (em branco) para manter a sessão viva.
+
+        Args:
+            driver: Navegador da aba
+            handle: Identificador da aba
+        """
+        with self.lock:
+            if driver is not self.driver:
+                # Aba de um navegador já substituído
+                return
+            self.tab_count -= 1
+            try:
+                self.activate(driver, handle)
+                if len(driver.window_handles) > 1:
+                    driver.close()
+                    self._active = None
+                else:
+                    driver.get("about:blank")
+                    self._free_handles.append(handle)
+            except Exception as e:
+                logger.warning(f"Erro ao fechar a aba: {str(e)}")
+
+    def abandon_tab(self, driver: webdriver.Remote, handle: str):
+        """
+        Fecha uma aba cuja página excedeu o prazo, sem afetar as outras abas.
+
+        Se um comando travado no navegador não liberar a sessão em
+        TAB_ABANDON_GRACE segundos, o navegador inteiro é encerrado à força;
+        as abas obsoletas são reabertas em um novo navegador.
+
+        Args:
+            driver: Navegador da aba
+            handle: Identificador da aba
+        """
+        if not self.lock.acquire(timeout=TAB_ABANDON_GRACE):
+            pid = self._driver_pid() if driver is self.driver else None
+            logger.error(f"Navegador compartilhado não libera a sessão, encerrando-o (PID {pid})")
+            if pid:
+                kill_process_group(pid)
+            return
+        try:
+            self.close_tab(driver, handle)
+        finally:
+            self.lock.release()
+
+    def close(self):
+        """Encerra o navegador da sessão."""
+        with self.lock:
+            if self.driver is not None:
+                try:
+                    self.driver.quit()
+                except Exception as e:
+                    logger.warning(f"Erro ao fechar o navegador: {str(e)}")
+                self.driver = None
@@ -0,0 +1,53 @@
+"""
+Testes do costurador de faixas (BandStitcher).
+"""
+
+import os
+
+from PIL import Image
+
+from band_stitcher import BandStitcher
+
+
+def _tile(width, height, color):
+    return Image.new('RGB', (width, height), color=color)
+
+
+def test_add_writes_only_new_rows(tmp_path):
+    stitcher = BandStitcher(100, 250, temp_dir=str(tmp_path))
+
+    assert stitcher.add(_tile(100, 100, 'red'), 0) == 100
+    # Tile sobreposto: apenas as linhas 100-149 são novas
+    assert stitcher.add(_tile(100, 100, 'green'), 50) == 50
+    # Tile totalmente coberto pelas faixas já gravadas
+    assert stitcher.add(_tile(100, 100, 'blue'), 0) == 0
+
+    assert [(start, height) for _, start, height in stitcher.bands] == [(0, 100), (100, 50)]
+    with Image.open(stitcher.bands[1][0]) as band:
+        assert band.size == (100, 50)
+        assert band.getpixel((0, 0)) == (0, 128, 0)
+    stitcher.abort()
+
+
+def test_add_clips_to_page_height_and_width(tmp_path):
+    stitcher = BandStitcher(80, 120, temp_dir=str(tmp_path))
+
+    assert stitcher.add(_tile(100, 100, 'red'), 0) == 100
+    assert stitcher.add(_tile(100, 100, 'red'), 100) == 20
+
+    with Image.open(stitcher.bands[-1][0]) as band:
+        assert band.size == (80, 20)
+
+    image = stitcher.finish()
+    assert image.size == (80, 120)
+    image.close()
+
+
+def test_add_converts_to_rgb(tmp_path):
+    stitcher = BandStitcher(10, 10, temp_dir=str(tmp_path))
+    stitcher.add(Image.new('RGBA', (10, 10), color=(255, 0, 0, 128)), 0)
+
+    with Image.open(stitcher.bands[0][0]) as band:
+        assert band.mode == 'RGB'
+    stitcher.abort()
+    assert not os.path.exists(stitcher.temp_dir)
@@ -0,0 +1,53 @@
+"""
+Testes das reservas dos perfis persistentes do navegador.
+"""
+
+import os
+import subprocess
+import sys
+from unittest import mock
+
+import browser_profile
+from browser_profile import LOCK_SUFFIX, ProfileStore
+
+
+def _dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", ""])
+    process.wait()
+    return process.pid
+
+
+def test_abandoned_lock_is_reclaimed(tmp_path):
+    store = ProfileStore(str(tmp_path), "chrome")
+    profile_path = os.path.join(store.root_dir, "site.com", "0")
+    os.makedirs(os.path.dirname(profile_path))
+    with open(profile_path + LOCK_SUFFIX, 'w') as f:
+        f.write(str(_dead_pid()))
+
+    assert store.acquire("site.com") == profile_path
+    with open(profile_path + LOCK_SUFFIX) as f:
+        assert f.read() == str(os.getpid())
+
+
+def test_lock_reclaimed_by_another_process_is_kept(tmp_path):
+    store = ProfileStore(str(tmp_path), "chrome")
+    profile_path = str(tmp_path / "perfil")
+    lock_path = profile_path + LOCK_SUFFIX
+    with open(lock_path, 'w') as f:
+        f.write(str(_dead_pid()))
+
+    # Outro processo retoma a reserva entre a leitura e a renomeação
+    read_lock = browser_profile._read_lock
+
+    def reclaimed_meanwhile(path):
+        owner = read_lock(path)
+        if path == lock_path:
+            with open(lock_path, 'w') as f:
+                f.write(str(os.getppid()))
+        return owner
+
+    with mock.patch("browser_profile._read_lock", side_effect=reclaimed_meanwhile):
+        assert not store._try_lock(profile_path)
+    with open(lock_path) as f:
+        assert f.read() == str(os.getppid())
+    assert sorted(os.listdir(tmp_path)) == ["chrome", "perfil.lock"]
@@ -0,0 +1,65 @@
+"""
+Testes da validade das respostas no proxy de cache (freshness_lifetime).
+"""
+
+from email.utils import formatdate
+
+import pytest
+
+from caching_proxy import MAX_HEURISTIC_LIFETIME, freshness_lifetime
+
+DATE = 1_700_000_000
+PAGE = "https://site.com/pagina"
+
+
+def _http_date(timestamp):
+    return formatdate(timestamp, usegmt=True)
+
+
+@pytest.mark.parametrize("cache_control", ["no-store", "private, max-age=600", "public, no-store"])
+def test_not_stored(cache_control):
+    assert freshness_lifetime({"cache-control": cache_control}, PAGE) is None
+
+
+def test_vary_other_than_accept_encoding_is_not_stored():
+    headers = {"cache-control": "max-age=600"}
+    assert freshness_lifetime({**headers, "vary": "Cookie"}, PAGE) is None
+    assert freshness_lifetime({**headers, "vary": "Accept-Encoding, User-Agent"}, PAGE) is None
+    assert freshness_lifetime({**headers, "vary": "Accept-Encoding"}, PAGE) == 600
+
+
+def test_max_age_minus_age():
+    assert freshness_lifetime({"cache-control": "max-age=600", "age": "100"}, PAGE) == 500
+    assert freshness_lifetime({"cache-control": "max-age=60", "age": "100"}, PAGE) == 0
+    assert freshness_lifetime({"cache-control": "s-maxage=300, max-age=600"}, PAGE) == 300
+
+
+def test_no_cache_requires_validators():
+    assert freshness_lifetime({"cache-control": "no-cache", "etag": '"v1"'}, PAGE) == 0
+    assert freshness_lifetime({"cache-control": "no-cache"}, PAGE) is None
+
+
+def test_expires_relative_to_date():
+    headers = {"date": _http_date(DATE), "expires": _http_date(DATE + 3600)}
+    assert freshness_lifetime(headers, PAGE) == 3600
+    assert freshness_lifetime({**headers, "expires": "0"}, PAGE) == 0
+
+
+def test_last_modified_heuristic_is_capped():
+    recent = {"date": _http_date(DATE), "last-modified": _http_date(DATE - 10_000)}
+    assert freshness_lifetime(recent, PAGE) == 1_000
+
+    old = {"date": _http_date(DATE), "last-modified": _http_date(DATE - 365 * 24 * 3600)}
+    assert freshness_lifetime(old, PAGE) == MAX_HEURISTIC_LIFETIME
+
+
+def test_without_freshness_information():
+    assert freshness_lifetime({"etag": '"v1"'}, PAGE) == 0
+    assert freshness_lifetime({}, PAGE) is None
+
+
+def test_static_ttl_overrides_static_assets_only():
+    headers = {"cache-control": "max-age=60"}
+    assert freshness_lifetime(headers, "https://site.com/estilo.css", static_ttl=3600) == 3600
+    assert freshness_lifetime(headers, PAGE, static_ttl=3600) == 60
+    assert freshness_lifetime({"cache-control": "no-store"}, "https://site.com/estilo.css", static_ttl=3600) is None
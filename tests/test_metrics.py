@@ -0,0 +1,83 @@
+"""
+Testes da exposição das métricas no formato de texto do Prometheus.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from metrics import MetricsRegistry
+
+
+def _registry():
+    registry = MetricsRegistry(buckets=(1, 5))
+    registry._collectors = []
+    return registry
+
+
+def _snapshot_file(directory, name, pid, counters=(), gauges=()):
+    with open(os.path.join(directory, name), 'w') as f:
+        json.dump({
+            "pid": pid,
+            "buckets": [1, 5],
+            "counters": [list(series) for series in counters],
+            "gauges": [list(series) for series in gauges],
+            "histograms": [],
+        }, f)
+
+
+def _dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", ""])
+    process.wait()
+    return process.pid
+
+
+def test_render_counters_gauges_and_labels():
+    registry = _registry()
+    registry.inc("printtopdf_pages_total", status="captured")
+    registry.inc("printtopdf_pages_total", 2, status="captured")
+    registry.set("printtopdf_current_domain", 1, domain='si"te\\.com')
+    lines = registry.render().splitlines()
+
+    assert "# HELP printtopdf_pages_total Páginas processadas, por status" in lines
+    assert "# TYPE printtopdf_pages_total counter" in lines
+    assert "# TYPE printtopdf_stage_seconds histogram" in lines
+    assert 'printtopdf_pages_total{status="captured"} 3' in lines
+    assert 'printtopdf_current_domain{domain="si\\"te\\\\.com"} 1' in lines
+
+
+def test_render_cumulative_histogram():
+    registry = _registry()
+    for value in (0.5, 2, 3, 60):
+        registry.observe("printtopdf_stage_seconds", value, stage="navigation")
+    lines = registry.render().splitlines()
+
+    assert 'printtopdf_stage_seconds_bucket{stage="navigation",le="1"} 1' in lines
+    assert 'printtopdf_stage_seconds_bucket{stage="navigation",le="5"} 3' in lines
+    assert 'printtopdf_stage_seconds_bucket{stage="navigation",le="+Inf"} 4' in lines
+    assert 'printtopdf_stage_seconds_sum{stage="navigation"} 65.5' in lines
+    assert 'printtopdf_stage_seconds_count{stage="navigation"} 4' in lines
+
+
+def test_render_merges_process_snapshots(tmp_path):
+    registry = _registry()
+    registry.inc("printtopdf_pages_total", status="captured")
+    registry.set("printtopdf_queue_depth", 2)
+    registry.set("printtopdf_last_page_timestamp_seconds", 100)
+
+    pages = ["printtopdf_pages_total", [["status", "captured"]], 4]
+    _snapshot_file(tmp_path, "vivo.json", os.getppid(), counters=[pages], gauges=[
+        ["printtopdf_queue_depth", [], 3],
+        ["printtopdf_last_page_timestamp_seconds", [], 250],
+    ])
+    # Processo encerrado: os contadores continuam valendo, os gauges não
+    _snapshot_file(tmp_path, "encerrado.json", _dead_pid(), counters=[pages], gauges=[
+        ["printtopdf_queue_depth", [], 7],
+    ])
+    lines = registry.render(str(tmp_path)).splitlines()
+
+    assert 'printtopdf_pages_total{status="captured"} 9' in lines
+    assert "printtopdf_queue_depth 5" in lines
+    # Gauges combinados pelo máximo entre processos
+    assert "printtopdf_last_page_timestamp_seconds 250" in lines
@@ -0,0 +1,68 @@
+"""
+Testes do manifesto da execução (RunManifest): carga, retomada e fatias.
+"""
+
+import json
+
+from run_manifest import RunManifest
+
+
+def _manifest(tmp_path, name="r1.jsonl"):
+    return RunManifest(str(tmp_path / "execucoes" / name), "r1")
+
+
+def test_resume_skips_completed_pages(tmp_path):
+    pdf = tmp_path / "pagina.pdf"
+    pdf.write_bytes(b"%PDF-1.4 conteudo")
+
+    manifest = _manifest(tmp_path)
+    manifest.start({"workers": 1})
+    manifest.record_page("site.com", "https://site.com/a", "captured", str(pdf))
+    manifest.record_page("site.com", "https://site.com/b", "failed", error="timeout", failure_kind="timeout")
+
+    resumed = _manifest(tmp_path)
+    assert resumed.completed_pdf("https://site.com/a") == str(pdf)
+    assert resumed.completed_pdf("https://site.com/b") is None
+    assert resumed.pages["https://site.com/b"]["attempts"] == 1
+
+
+def test_resume_recaptures_changed_or_missing_pdf(tmp_path):
+    pdf = tmp_path / "pagina.pdf"
+    pdf.write_bytes(b"original")
+    manifest = _manifest(tmp_path)
+    manifest.record_page("site.com", "https://site.com/a", "captured", str(pdf))
+
+    pdf.write_bytes(b"alterado")
+    assert _manifest(tmp_path).completed_pdf("https://site.com/a") is None
+
+    pdf.unlink()
+    assert _manifest(tmp_path).completed_pdf("https://site.com/a") is None
+
+
+def test_load_truncates_partial_last_line(tmp_path):
+    manifest = _manifest(tmp_path)
+    manifest.record_page("site.com", "https://site.com/a", "failed")
+    with open(manifest.path, 'a') as f:
+        f.write('{"type": "page", "url": "https://site.com/b"')
+
+    resumed = _manifest(tmp_path)
+    assert list(resumed.pages) == ["https://site.com/a"]
+    with open(manifest.path) as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 1 and json.loads(lines[0])["url"] == "https://site.com/a"
+
+
+def test_load_merges_shard_files(tmp_path):
+    main = _manifest(tmp_path)
+    main.start({})
+    _manifest(tmp_path, "r1-processo1.jsonl").record_page("a.com", "https://a.com/", "failed")
+    shard = _manifest(tmp_path, "r1-processo2.jsonl")
+    shard.record_page("b.com", "https://b.com/", "failed")
+    # Linha incompleta de outra fatia ainda em gravação: ignorada, mas preservada
+    with open(shard.path, 'a') as f:
+        f.write('{"type": "page"')
+
+    resumed = _manifest(tmp_path)
+    assert set(resumed.pages) == {"https://a.com/", "https://b.com/"}
+    with open(shard.path) as f:
+        assert f.read().endswith('{"type": "page"')
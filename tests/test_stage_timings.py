@@ -0,0 +1,42 @@
+"""
+Testes dos tempos por etapa e do resumo estatístico por domínio.
+"""
+
+import time
+
+from stage_timings import STAGES, PageTimings, _percentile, summarize
+
+
+def test_percentile_nearest_rank():
+    values = [float(value) for value in range(1, 11)]
+    assert _percentile(values, 0.5) == 5
+    assert _percentile(values, 0.95) == 10
+    assert _percentile(values, 0) == 1
+    assert _percentile([7.0], 0.95) == 7
+
+
+def test_summarize_empty():
+    assert summarize([]) == {}
+
+
+def test_summarize_stages():
+    rows = [{"total": float(value), "navigation": value / 10} for value in range(1, 11)]
+    summary = summarize(rows)
+
+    assert set(summary) == {"total", *STAGES}
+    assert summary["total"] == {"p50": 5.0, "p95": 10.0, "max": 10.0}
+    assert summary["navigation"] == {"p50": 0.5, "p95": 1.0, "max": 1.0}
+    # Etapas ausentes nos registros contam como zero
+    assert summary["scroll"] == {"p50": 0.0, "p95": 0.0, "max": 0.0}
+
+
+def test_nested_stage_is_excluded_from_outer():
+    timings = PageTimings()
+    with timings.stage("screenshot"):
+        time.sleep(0.02)
+        with timings.stage("png_decode"):
+            time.sleep(0.05)
+
+    assert timings.stages["png_decode"] >= 0.05
+    assert timings.stages["screenshot"] < 0.05
+    assert sum(timings.stages.values()) <= time.perf_counter() - timings.started
@@ -0,0 +1,63 @@
+"""
+Testes da sessão de navegador compartilhada por várias abas.
+"""
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from tab_session import TabSession
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def window(self, handle):
+        self._driver.current_window_handle = handle
+
+    def new_window(self, kind):
+        handle = f"aba{len(self._driver.window_handles)}"
+        self._driver.window_handles.append(handle)
+        self._driver.current_window_handle = handle
+
+
+class FakeDriver:
+    """Navegador mínimo: janelas, navegação e scripts."""
+
+    def __init__(self):
+        self.window_handles = ["aba0"]
+        self.current_window_handle = "aba0"
+        self.switch_to = FakeSwitchTo(self)
+        self.visited = []
+        self.quit_calls = 0
+
+    def get(self, url):
+        self.visited.append((self.current_window_handle, url))
+
+    def execute_script(self, script, *args):
+        return "complete"
+
+    def close(self):
+        self.window_handles.remove(self.current_window_handle)
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+def test_abandon_closes_only_the_timed_out_tab():
+    session = TabSession(FakeDriver, page_load_timeout=5)
+    first, second = session.open_tab(), session.open_tab()
+    browser = session.driver
+
+    first.abandon()
+
+    assert first.stale and not second.stale
+    assert browser.window_handles == ["aba1"]
+    with pytest.raises(WebDriverException):
+        first.get("https://site.com/a")
+    second.get("https://site.com/b")
+    assert browser.visited[-1] == ("aba1", "https://site.com/b")
+
+    # Fechar a aba abandonada não fecha outra vez nem encerra o navegador
+    first.quit()
+    assert session.tab_count == 1 and browser.quit_calls == 0
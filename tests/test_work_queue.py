@@ -0,0 +1,103 @@
+"""
+Testes das concessões (leases) da fila de trabalho distribuída.
+"""
+
+import json
+import time
+from unittest import mock
+
+import work_queue
+from work_queue import WorkQueue
+
+
+def _queue(tmp_path, *task_ids):
+    queue = WorkQueue(str(tmp_path / "fila"))
+    queue.create_job({"run_id": "r1"}, [{"id": task_id, "url": f"https://{task_id}"} for task_id in task_ids])
+    return queue
+
+
+def test_lease_is_exclusive(tmp_path):
+    queue = _queue(tmp_path, "a.com--0001")
+
+    assert queue.lease("w1", ttl=60)["id"] == "a.com--0001"
+    assert queue.lease("w2", ttl=60) is None
+    assert queue.progress() == (0, 1)
+
+
+def test_renew_only_by_owner(tmp_path):
+    queue = _queue(tmp_path, "a.com--0001")
+    queue.lease("w1", ttl=60)
+
+    assert queue.renew("a.com--0001", "w1", ttl=60)
+    assert not queue.renew("a.com--0001", "w2", ttl=60)
+    assert not queue.renew("b.com--0001", "w1", ttl=60)
+
+
+def test_expired_lease_is_taken_over(tmp_path):
+    queue = _queue(tmp_path, "a.com--0001")
+    queue.lease("w1", ttl=60)
+    with open(queue._lease_path("a.com--0001"), 'w') as f:
+        json.dump({"worker": "w1", "expires_at": time.time() - 1}, f)
+
+    assert queue.lease("w2", ttl=60)["id"] == "a.com--0001"
+    # O worker antigo perdeu a concessão e não consegue renová-la
+    assert not queue.renew("a.com--0001", "w1", ttl=60)
+
+
+def test_complete_removes_task_from_pending(tmp_path):
+    queue = _queue(tmp_path, "a.com--0001", "a.com--0002")
+    task = queue.lease("w1", ttl=60)
+    queue.complete(task["id"], "w1", {"status": "captured"})
+
+    assert queue.results() == {task["id"]: {"status": "captured", "worker": "w1"}}
+    assert queue.lease("w1", ttl=60)["id"] == "a.com--0002"
+    assert queue.progress() == (1, 2)
+
+
+def test_lease_prefers_domain(tmp_path):
+    queue = _queue(tmp_path, "a.com--0001", "b.com--0001")
+
+    assert queue.lease("w1", ttl=60, prefer="b.com")["id"] == "b.com--0001"
+
+
+def test_release_with_backoff_delays_retry(tmp_path):
+    queue = _queue(tmp_path, "a.com--0001")
+    queue.lease("w1", ttl=60)
+    queue.release("a.com--0001", "w1", "timeout", retry_after=60)
+
+    assert queue.lease("w2", ttl=60) is None
+    assert [attempt["failure_kind"] for attempt in queue.attempts("a.com--0001")] == ["timeout"]
+
+    queue.release("a.com--0001", "w1", "timeout")
+    assert queue.lease("w2", ttl=60)["id"] == "a.com--0001"
+    assert len(queue.attempts("a.com--0001")) == 2
+
+
+def test_takeover_keeps_lease_renewed_by_another_worker(tmp_path):
+    queue = _queue(tmp_path, "a.com--0001")
+    queue.lease("w1", ttl=60)
+    lease_path = queue._lease_path("a.com--0001")
+    with open(lease_path, 'w') as f:
+        json.dump({"worker": "w1", "expires_at": time.time() - 1}, f)
+
+    # w2 lê a concessão expirada, mas w3 a retoma antes da renomeação de w2
+    expired = work_queue._read_json(lease_path)
+    assert queue.lease("w3", ttl=60)["id"] == "a.com--0001"
+
+    reads = iter([expired])
+    read_json = work_queue._read_json
+    with mock.patch("work_queue._read_json", side_effect=lambda path: next(reads, None) or read_json(path)):
+        assert not queue._try_lease("a.com--0001", "w2", ttl=60)
+    assert queue.renew("a.com--0001", "w3", ttl=60)
+
+
+def test_lease_does_not_relist_the_queue(tmp_path):
+    queue = _queue(tmp_path, "a.com--0001", "a.com--0002", "b.com--0001")
+    other = WorkQueue(queue.queue_dir)
+    task = other.lease("w2", ttl=60)
+    other.complete(task["id"], "w2", {"status": "captured"})
+
+    assert queue.lease("w1", ttl=60)["id"] == "a.com--0002"
+    with mock.patch("os.listdir", side_effect=AssertionError("diretório relido")):
+        assert queue.lease("w1", ttl=60)["id"] == "b.com--0001"
+        assert queue.lease("w1", ttl=60) is None
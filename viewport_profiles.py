@@ -0,0 +1,170 @@
+"""
+Módulo com os perfis de viewport (desktop, tablet, celular) e a detecção dos breakpoints que exigem recarregar a página.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ViewportProfile:
+    """Viewport em que a página é capturada."""
+
+    name: str
+    width: int
+    height: int
+    mobile: bool = False
+
+
+# Perfis disponíveis pelo nome na opção --viewports
+BUILTIN_VIEWPORT_PROFILES: Dict[str, ViewportProfile] = {
+    "desktop": ViewportProfile("desktop", 1920, 1080),
+    "tablet": ViewportProfile("tablet", 768, 1024, mobile=True),
+    "mobile": ViewportProfile("mobile", 390, 844, mobile=True),
+}
+
+# Instala, antes dos scripts da página, o registro das media queries consultadas
+# via matchMedia e de quais delas a página acompanha (listener de 'change')
+MEDIA_QUERY_PROBE_SCRIPT = """
+(function() {
+    if (window.__printToPdfMediaQueries || !window.matchMedia) {
+        return;
+    }
+    var queries = window.__printToPdfMediaQueries = {};
+    var originalMatchMedia = window.matchMedia;
+    window.matchMedia = function(query) {
+        var list = originalMatchMedia.call(window, query);
+        var entry = queries[query] || (queries[query] = {listened: false});
+        ['addListener', 'addEventListener'].forEach(function(method) {
+            var original = list[method];
+            if (typeof original === 'function') {
+                list[method] = function() {
+                    entry.listened = true;
+                    return original.apply(list, arguments);
+                };
+            }
+        });
+        return list;
+    };
+})();
+"""
+
+# Media queries avaliadas pelos scripts só no carregamento (sem acompanhar mudanças)
+LOAD_TIME_QUERIES_SCRIPT = """
+var queries = window.__printToPdfMediaQueries || {};
+return Object.keys(queries).filter(function(query) {
+    return !queries[query].listened;
+});
+"""
+
+# Tamanho de referência das unidades em/rem nas media queries
+_EM_PX = 16
+
+_PROFILE_PATTERN = re.compile(r'^(?P<name>[\w-]+):(?P<width>\d+)x(?P<height>\d+)(?P<mobile>:mobile)?$')
+_WIDTH_FEATURE_PATTERN = re.compile(r'\(\s*(min|max)-width\s*:\s*([\d.]+)\s*(px|em|rem)?\s*\)')
+_ORIENTATION_PATTERN = re.compile(r'\(\s*orientation\s*:\s*(portrait|landscape)\s*\)')
+
+
+def parse_viewport_profiles(spec: str) -> List[ViewportProfile]:
+    """
+    Interpreta a lista de perfis da opção --viewports.
+
+    Cada item é o nome de um perfil embutido (desktop, tablet, mobile) ou um
+    perfil próprio no formato 'nome:LARGURAxALTURA', com o sufixo ':mobile'
+    opcional para emular um dispositivo móvel (toque e viewport móvel).
+
+    Args:
+        spec: Perfis separados por vírgula, na ordem de captura
+
+    Returns:
+        Lista de perfis
+
+    Raises:
+        ValueError: Se algum perfil for inválido ou repetido
+    """
+    profiles = []
+    for item in (part.strip() for part in spec.split(',')):
+        if not item:
+            continue
+        if item in BUILTIN_VIEWPORT_PROFILES:
+            profile = BUILTIN_VIEWPORT_PROFILES[item]
+        else:
+            match = _PROFILE_PATTERN.match(item)
+            if not match:
+                raise ValueError(f"Perfil de viewport inválido: {item}")
+            profile = ViewportProfile(
+                name=match.group('name'),
+                width=int(match.group('width')),
+                height=int(match.group('height')),
+                mobile=bool(match.group('mobile'))
+            )
+            if profile.width <= 0 or profile.height <= 0:
+                raise ValueError(f"Perfil de viewport inválido: {item}")
+
+        if any(existing.name == profile.name for existing in profiles):
+            raise ValueError(f"Perfil de viewport repetido: {profile.name}")
+        profiles.append(profile)
+
+    if not profiles:
+        raise ValueError("Nenhum perfil de viewport informado")
+    return profiles
+
+
+def media_query_matches(query: str, profile: ViewportProfile) -> Optional[bool]:
+    """
+    Avalia as condições de largura e orientação de uma media query para um viewport.
+
+    Args:
+        query: Media query (ex.: '(max-width: 767px)')
+        profile: Viewport
+
+    Returns:
+        Se a media query se aplica ao viewport, ou None se ela não depende do tamanho
+    """
+    result = None
+    for part in query.lower().split(','):
+        widths = _WIDTH_FEATURE_PATTERN.findall(part)
+        orientations = _ORIENTATION_PATTERN.findall(part)
+        if not widths and not orientations:
+            continue
+
+        matches = True
+        for feature, value, unit in widths:
+            limit = float(value) * (_EM_PX if unit in ('em', 'rem') else 1)
+            matches = matches and (profile.width >= limit if feature == 'min' else profile.width <= limit)
+        for orientation in orientations:
+            portrait = profile.height >= profile.width
+            matches = matches and (portrait if orientation == 'portrait' else not portrait)
+
+        if part.strip().startswith('not '):
+            matches = not matches
+        result = bool(result) or matches
+
+    return result
+
+
+def breakpoint_crossed(queries: List[str], previous: ViewportProfile, profile: ViewportProfile) -> Optional[str]:
+    """
+    Procura uma media query avaliada no carregamento cujo resultado muda entre dois viewports.
+
+    Media queries de CSS e imagens responsivas se reajustam sozinhas ao
+    redimensionar a janela; só as avaliadas por scripts no carregamento, sem
+    acompanhar mudanças, exigem recarregar a página.
+
+    Args:
+        queries: Media queries avaliadas no carregamento
+        previous: Viewport em que a página foi carregada ou capturada
+        profile: Próximo viewport
+
+    Returns:
+        A primeira media query cujo resultado muda, ou None
+    """
+    for query in queries:
+        before = media_query_matches(query, previous)
+        if before is not None and before != media_query_matches(query, profile):
+            return query
+    return None
@@ -0,0 +1,381 @@
+"""
+Módulo com a fila de trabalho distribuída, baseada apenas em arquivos em um diretório compartilhado.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Arquivo com a descrição do trabalho; sua presença indica que as tarefas estão prontas
+JOB_FILENAME = "job.json"
+
+
+def _write_json_atomic(path: str, data: Dict[str, Any]):
+    """
+    Grava um JSON de forma atômica (arquivo temporário + rename).
+
+    Args:
+        path: Caminho final do arquivo
+        data: Conteúdo
+    """
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Lê um JSON, devolvendo None se o arquivo não existir ou estiver incompleto.
+
+    Args:
+        path: Caminho do arquivo
+
+    Returns:
+        Conteúdo do arquivo ou None
+    """
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class WorkQueue:
+    """
+    Fila de tarefas com concessões (leases) em um diretório compartilhado (NFS, SMB etc.).
+
+    Estrutura do diretório:
+        job.json                 descrição do trabalho (gravado por último pelo coordenador)
+        tasks/<id>.json          uma tarefa por URL
+        leases/<id>.lease        concessão ativa: worker e instante de expiração
+        attempts/<id>.json       tentativas que falharam e foram devolvidas à fila
+        done/<id>.json           resultado final da tarefa
+
+    A exclusão mútua depende apenas da criação exclusiva de arquivos (O_EXCL) e
+    de renomeações atômicas, sem banco de dados nem broker. As concessões usam o
+    relógio de parede, então os nós devem estar sincronizados (NTP).
+
+    Cada instância lista o diretório de tarefas uma única vez e mantém em memória
+    as tarefas pendentes por domínio, descartando as concluídas à medida que as
+    encontra; assim, obter uma tarefa não relê o diretório compartilhado inteiro.
+    """
+
+    def __init__(self, queue_dir: str):
+        """
+        Inicializa a fila, criando a estrutura de diretórios se necessário.
+
+        Args:
+            queue_dir: Diretório compartilhado da fila
+        """
+        self.queue_dir = queue_dir
+        self.tasks_dir = os.path.join(queue_dir, "tasks")
+        self.leases_dir = os.path.join(queue_dir, "leases")
+        self.attempts_dir = os.path.join(queue_dir, "attempts")
+        self.done_dir = os.path.join(queue_dir, "done")
+        for directory in (self.tasks_dir, self.leases_dir, self.attempts_dir, self.done_dir):
+            os.makedirs(directory, exist_ok=True)
+        self._pending: Optional[Dict[str, List[str]]] = None
+        self._pending_lock = threading.Lock()
+
+    def _lease_path(self, task_id: str) -> str:
+        return os.path.join(self.leases_dir, f"{task_id}.lease")
+
+    def _done_path(self, task_id: str) -> str:
+        return os.path.join(self.done_dir, f"{task_id}.json")
+
+    def _pending_index(self) -> Dict[str, List[str]]:
+        """
+        Obtém as tarefas pendentes agrupadas por domínio, listando o diretório apenas na primeira vez.
+
+        Deve ser chamado com _pending_lock adquirido.
+
+        Returns:
+            Dicionário {chave do domínio: tarefas em ordem}, na ordem dos domínios
+        """
+        if self._pending is None:
+            done = set(self.done_ids())
+            self._pending = {}
+            for task_id in self.task_ids():
+                if task_id not in done:
+                    self._pending.setdefault(task_id.rsplit('--', 1)[0], []).append(task_id)
+        return self._pending
+
+    def create_job(self, job: Dict[str, Any], tasks: List[Dict[str, Any]]):
+        """
+        Publica um trabalho: grava as tarefas e, por último, a descrição do trabalho.
+
+        Args:
+            job: Descrição do trabalho (configurações, domínios na ordem original etc.)
+            tasks: Tarefas; cada uma precisa de um campo 'id' único e seguro para nome de arquivo
+        """
+        for task in tasks:
+            _write_json_atomic(os.path.join(self.tasks_dir, f"{task['id']}.json"), task)
+        _write_json_atomic(os.path.join(self.queue_dir, JOB_FILENAME), {**job, "total_tasks": len(tasks)})
+        logger.info(f"Trabalho publicado com {len(tasks)} tarefas em {self.queue_dir}")
+
+    def load_job(self) -> Optional[Dict[str, Any]]:
+        """
+        Lê a descrição do trabalho.
+
+        Returns:
+            Descrição do trabalho, ou None se ainda não foi publicado
+        """
+        return _read_json(os.path.join(self.queue_dir, JOB_FILENAME))
+
+    def task_ids(self) -> List[str]:
+        """Lista os identificadores de todas as tarefas, em ordem."""
+        return sorted(name[:-5] for name in os.listdir(self.tasks_dir) if name.endswith(".json"))
+
+    def done_ids(self) -> List[str]:
+        """Lista os identificadores das tarefas concluídas."""
+        return [name[:-5] for name in os.listdir(self.done_dir) if name.endswith(".json")]
+
+    def _try_lease(self, task_id: str, worker_id: str, ttl: float) -> bool:
+        """
+        Tenta obter a concessão de uma tarefa, tomando concessões expiradas.
+
+        Args:
+            task_id: Tarefa
+            worker_id: Identificador do worker
+            ttl: Duração da concessão em segundos
+
+        Returns:
+            True se a concessão foi obtida
+        """
+        lease_path = self._lease_path(task_id)
+        lease = _read_json(lease_path)
+        if lease is not None:
+            if lease.get("expires_at", 0) > time.time():
+                return False
+            # Concessão expirada (worker morto ou travado): só quem conseguir
+            # renomear o arquivo a remove
+            stale_path = f"{lease_path}.{worker_id}.{uuid.uuid4().hex}.expired"
+            try:
+                os.rename(lease_path, stale_path)
+            except OSError:
+                return False
+            # Entre a leitura e a renomeação, outro worker pode ter retomado a
+            # concessão e criado uma nova: nesse caso ela é devolvida intacta
+            renamed = _read_json(stale_path)
+            if renamed is None or (renamed.get("worker"), renamed.get("expires_at")) != (lease.get("worker"), lease.get("expires_at")):
+                try:
+                    os.rename(stale_path, lease_path)
+                except OSError:
+                    pass
+                return False
+            logger.warning(f"Concessão expirada de {lease.get('worker')} na tarefa {task_id}, retomando")
+            try:
+                os.remove(stale_path)
+            except OSError:
+                pass
+
+        try:
+            fd = os.open(lease_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'w') as f:
+            json.dump({"worker": worker_id, "expires_at": time.time() + ttl}, f)
+
+        # A tarefa pode ter sido concluída entre a listagem e a concessão
+        if os.path.exists(self._done_path(task_id)):
+            self._remove_lease(task_id, worker_id)
+            return False
+        return True
+
+    def lease(
+        self,
+        worker_id: str,
+        ttl: float,
+        prefer: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Obtém a próxima tarefa disponível.
+
+        Args:
+            worker_id: Identificador do worker
+            ttl: Duração da concessão em segundos
+            prefer: Domínio preferido (o do navegador já aberto pelo worker)
+
+        Returns:
+            Tarefa com concessão obtida, ou None se não há tarefa disponível no momento
+        """
+        with self._pending_lock:
+            pending = self._pending_index()
+
+            # Tarefas do domínio preferido primeiro, mantendo a ordem original
+            domains = [prefer] if prefer in pending else []
+            domains.extend(domain for domain in pending if domain != prefer)
+
+            for domain in domains:
+                task_ids = pending[domain]
+                # Só as primeiras tarefas de cada domínio (com concessão de outro
+                # worker ou aguardando o backoff) são consultadas a cada chamada
+                index = 0
+                while index < len(task_ids):
+                    task_id = task_ids[index]
+                    if os.path.exists(self._done_path(task_id)):
+                        del task_ids[index]
+                        continue
+                    index += 1
+                    if self._try_lease(task_id, worker_id, ttl):
+                        task = _read_json(os.path.join(self.tasks_dir, f"{task_id}.json"))
+                        if task is not None:
+                            return task
+                        self._remove_lease(task_id, worker_id)
+                if not task_ids:
+                    del pending[domain]
+        return None
+
+    def renew(self, task_id: str, worker_id: str, ttl: float) -> bool:
+        """
+        Renova a concessão de uma tarefa em andamento.
+
+        Args:
+            task_id: Tarefa
+            worker_id: Identificador do worker
+            ttl: Nova duração da concessão em segundos
+
+        Returns:
+            True se a concessão ainda pertence ao worker e foi renovada
+        """
+        lease = _read_json(self._lease_path(task_id))
+        if not lease or lease.get("worker") != worker_id:
+            return False
+        _write_json_atomic(self._lease_path(task_id), {"worker": worker_id, "expires_at": time.time() + ttl})
+        return True
+
+    def _remove_lease(self, task_id: str, worker_id: str):
+        """
+        Remove a concessão, se ela pertencer ao worker.
+
+        Args:
+            task_id: Tarefa
+            worker_id: Identificador do worker
+        """
+        lease = _read_json(self._lease_path(task_id))
+        if lease and lease.get("worker") == worker_id:
+            try:
+                os.remove(self._lease_path(task_id))
+            except OSError:
+                pass
+
+    def attempts(self, task_id: str) -> List[Dict[str, Any]]:
+        """
+        Lista as tentativas anteriores que falharam.
+
+        Args:
+            task_id: Tarefa
+
+        Returns:
+            Lista de tentativas (worker, classe da falha, instante)
+        """
+        data = _read_json(os.path.join(self.attempts_dir, f"{task_id}.json"))
+        return data.get("attempts", []) if data else []
+
+    def release(self, task_id: str, worker_id: str, failure_kind: str, retry_after: float = 0):
+        """
+        Devolve uma tarefa que falhou à fila, para uma nova tentativa (por qualquer worker).
+
+        Args:
+            task_id: Tarefa
+            worker_id: Identificador do worker
+            failure_kind: Classe da falha
+            retry_after: Intervalo mínimo antes da nova tentativa em segundos (backoff)
+        """
+        attempts = self.attempts(task_id)
+        attempts.append({"worker": worker_id, "failure_kind": failure_kind, "at": time.time()})
+        _write_json_atomic(os.path.join(self.attempts_dir, f"{task_id}.json"), {"attempts": attempts})
+
+        if retry_after > 0:
+            # A concessão passa a expirar no fim do backoff, adiando a nova tentativa
+            _write_json_atomic(self._lease_path(task_id), {"worker": worker_id, "expires_at": time.time() + retry_after})
+        else:
+            self._remove_lease(task_id, worker_id)
+
+    def complete(self, task_id: str, worker_id: str, result: Dict[str, Any]):
+        """
+        Registra o resultado final de uma tarefa e libera a concessão.
+
+        Args:
+            task_id: Tarefa
+            worker_id: Identificador do worker
+            result: Resultado (status, PDF, estatísticas)
+        """
+        _write_json_atomic(self._done_path(task_id), {**result, "worker": worker_id})
+        self._remove_lease(task_id, worker_id)
+
+        with self._pending_lock:
+            task_ids = (self._pending or {}).get(task_id.rsplit('--', 1)[0], [])
+            if task_id in task_ids:
+                task_ids.remove(task_id)
+
+    def results(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Lê os resultados de todas as tarefas concluídas.
+
+        Returns:
+            Dicionário {id da tarefa: resultado}
+        """
+        results = {}
+        for task_id in self.done_ids():
+            result = _read_json(self._done_path(task_id))
+            if result is not None:
+                results[task_id] = result
+        return results
+
+    def progress(self) -> Tuple[int, int]:
+        """
+        Informa o andamento do trabalho.
+
+        Returns:
+            Tupla (tarefas concluídas, total de tarefas)
+        """
+        job = self.load_job() or {}
+        return len(self.done_ids()), job.get("total_tasks", len(self.task_ids()))
+
+
+class LeaseKeeper:
+    """Renova em segundo plano a concessão da tarefa em andamento."""
+
+    def __init__(self, queue: WorkQueue, task_id: str, worker_id: str, ttl: float):
+        """
+        Inicializa e inicia a renovação periódica (a cada terço da duração da concessão).
+
+        Args:
+            queue: Fila de trabalho
+            task_id: Tarefa
+            worker_id: Identificador do worker
+            ttl: Duração da concessão em segundos
+        """
+        self.queue = queue
+        self.task_id = task_id
+        self.worker_id = worker_id
+        self.ttl = ttl
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lease-{task_id}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.ttl / 3):
+            try:
+                if not self.queue.renew(self.task_id, self.worker_id, self.ttl):
+                    self.lost = True
+                    logger.warning(f"Concessão da tarefa {self.task_id} perdida")
+                    return
+            except OSError as e:
+                logger.warning(f"Erro ao renovar a concessão da tarefa {self.task_id}: {str(e)}")
+
+    def stop(self):
+        """Interrompe a renovação."""
+        self._stop.set()
+        self._thread.join()